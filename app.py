@@ -3,14 +3,19 @@ Main Streamlit application - articulAIte
 AI-Powered Career Development Assistant using LangChain and Groq
 """
 
+import threading
+import logging
 import streamlit as st
-import os
 from dotenv import load_dotenv
+from utils.llm import get_api_key
+from utils.warmup import warm_up, format_report
+from utils.diagnostics import run_sampler, is_admin, diagnostics_panel
+from config import WARMUP_ON_START, WARMUP_PROBE_MODELS, DIAGNOSTICS_INTERVAL
 
 # Load environment variables
 load_dotenv()
 
-# Import tab modules
+# Import tab modules (LangChain and file parsers load on first use)
 from tabs.cv_interview import cv_interview_tab
 from tabs.code_explainer import code_explainer_tab
 from tabs.article_generator import article_generator_tab
@@ -42,7 +47,7 @@ st.markdown("""
 
 # Check API Key
 def check_api_key():
-    api_key = os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
+    api_key = get_api_key()
     if not api_key:
         st.error(
             "🔑 GROQ_API_KEY not found!\n\n"
@@ -52,6 +57,24 @@ def check_api_key():
         return False
     return True
 
+# Server warm-up: runs once per server process, in the background
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    def run():
+        report = warm_up(probe=WARMUP_PROBE_MODELS)
+        logging.getLogger(__name__).info(format_report(report))
+
+    thread = threading.Thread(target=run, name="articulaite-warmup", daemon=True)
+    thread.start()
+    return thread
+
+# Memory diagnostics sampler: runs once per server process when an interval is set
+@st.cache_resource(show_spinner=False)
+def start_diagnostics_sampler():
+    thread = threading.Thread(target=run_sampler, args=(DIAGNOSTICS_INTERVAL,), name="articulaite-diagnostics", daemon=True)
+    thread.start()
+    return thread
+
 # Main App
 def main():
     # Header
@@ -83,6 +106,12 @@ def main():
     # Check API Key
     if not check_api_key():
         st.stop()
+
+    if WARMUP_ON_START:
+        start_warm_up()
+
+    if DIAGNOSTICS_INTERVAL:
+        start_diagnostics_sampler()
     
     # Sidebar
     # st.sidebar.title("📋 Navigation")
@@ -125,6 +154,9 @@ def main():
     with tab4:
         study_plan_tab()
 
+    if is_admin():
+        diagnostics_panel()
+
     st.markdown("---")
     st.markdown("""
     <div style='padding:20px 0 0 0; color:#358; font-size: 1.04em; text-align: center;'>
@@ -2,6 +2,8 @@
 Configuration and constants for articulAIte application
 """
 
+import os
+
 # Groq Models Configuration
 CV_INTERVIEW_MODELS = {
     "Groq Compound (Best)": "groq/compound",
@@ -44,6 +46,35 @@ DEFAULT_STUDY_MODEL = "llama-3.3-70b-versatile"
 # File Upload Configuration
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_FILE_TYPES = ["pdf", "docx", "txt"]
+MAX_PDF_PAGES = 50
+MAX_DOCX_UNCOMPRESSED_SIZE = 50 * 1024 * 1024  # 50MB across all zip parts
+MAX_DOCX_COMPRESSION_RATIO = 100  # Higher ratios indicate a zip bomb
+PDF_EDGE_LINES = 3  # Lines at the top and bottom of a page checked for running headers/footers
+PDF_REPEAT_MIN_RATIO = 0.5  # Share of pages an edge line must repeat on to be dropped
+
+# Resume Profile (structured extraction, cached by content hash)
+RESUME_PROFILE_MODEL = "llama-3.3-70b-versatile"
+RESUME_PROFILE_CACHE_DIR = ".cache/resume_profiles"
+
+# Bulk CV Screening (many resumes against one job description)
+BULK_MAX_FILES = 200  # Resumes per batch, after unpacking zip archives
+BULK_MAX_ARCHIVE_SIZE = 200 * 1024 * 1024  # Uncompressed bytes of resumes read from one zip
+BULK_EXTRACT_WORKERS = 4  # Extraction processes
+BULK_LLM_WORKERS = 4  # Concurrent analyses, paced to RATE_LIMIT_CALLS per RATE_LIMIT_WINDOW
+BULK_MAX_RESUME_CHARS = 12000  # Resume text sent per analysis
+BULK_STATE_DIR = ".cache/bulk"  # Finished results per batch, for resuming
+BULK_REFRESH_INTERVAL = 0.5  # seconds between results table updates
+BULK_LLM_TOP_N = 25  # CVs analysed by the LLM, best local skill match first
+
+# Skill Match (local TF-IDF scoring of a resume against the job description)
+SKILL_MATCH_KEYWORDS = 25  # Job description keywords scored for coverage
+SKILL_MATCH_SKILL_BOOST = 2.0  # Weight multiplier for known skills
+
+# Code Explainer Settings
+CODE_CHUNK_MIN_LINES = 40  # Shorter pastes are analysed as a single unit
+CODE_UNIT_MIN_LINES = 5  # Smaller units are merged with their neighbours
+CODE_UNIT_WORKERS = 4
+CODE_DIFF_MAX_RATIO = 0.4  # Larger rewrites are re-analysed in full
 
 # Article Generation Settings
 ARTICLE_MIN_WORDS = 100
@@ -64,6 +95,15 @@ CREATIVITY_LEVELS = ["Low", "Medium", "High"]
 # Study Plan Settings
 STUDY_MIN_WEEKS = 1
 STUDY_MAX_WEEKS = 52
+STUDY_LONG_PLAN_WEEKS = 8  # Longer plans are generated outline-first, week by week
+STUDY_WEEK_WORKERS = 4
+STUDY_DAYS_PER_WEEK = 7  # Weekly hour budget is daily hours times this
+STUDY_HOURS_STEP = 0.5  # Topic hour estimates are rounded to this step
+
+# Export (rendered HTML and downloads, cached by content hash)
+EXPORT_CACHE_SIZE = 32
+EXPORT_WORKERS = 2
+EXPORT_TIMEOUT = 30  # seconds
 
 # Chat Configuration
 CHAT_MAX_HISTORY = 50
@@ -71,7 +111,14 @@ CHAT_MESSAGE_MAX_LENGTH = 4000
 
 # Timeout Configuration (seconds)
 API_TIMEOUT = 60
+STREAM_WAIT_INTERVAL = 0.5  # seconds between page updates while waiting for output, so Stop can interrupt
 FILE_UPLOAD_TIMEOUT = 30
+FILE_EXTRACT_WORKERS = 4  # Uploads read at once; more are turned away until one finishes
+
+# Server Warm-up
+GROQ_API_BASE_URL = "https://api.groq.com/openai/v1"
+WARMUP_ON_START = True
+WARMUP_PROBE_MODELS = False  # Send a 1-token probe call per model
 
 # System Prompts
 SYSTEM_PROMPTS = {
@@ -116,15 +163,62 @@ Your role is to:
 Be encouraging and create realistic, achievable plans."""
 }
 
-# Rate Limiting
+# Model Comparison
+COMPARE_MAX_MODELS = 4
+COMPARE_LOG_PATH = ".cache/model_compare.jsonl"  # None disables the run log
+
+# Predictive Prefetch (the likely next action starts in the background once its inputs are ready)
+PREFETCH_ENABLED = os.getenv("ARTICULAITE_PREFETCH", "") == "1"  # Opt-in: a wrong prediction costs tokens
+PREFETCH_WORKERS = 2  # Background threads, at lowered OS priority
+PREFETCH_NICE = 10  # Added to the prefetch threads' niceness (Linux), so user-triggered work goes first
+PREFETCH_MAX_PENDING = 8  # New prefetches are skipped while this many are queued or running
+PREFETCH_TTL = 30 * 60  # seconds a prefetched result waits for its click
+PREFETCH_DEBOUNCE = 4  # seconds a tab's inputs must stay unchanged before a prefetch starts
+
+# Speculative Chat (fast draft first, replaced by the selected model's answer)
+SPECULATIVE_DRAFT_MODEL = "groq/compound-mini"
+
+# LLM Backend ("stub" serves canned replies for load tests and offline runs)
+LLM_BACKEND = os.getenv("ARTICULAITE_LLM_BACKEND", "groq")
+STUB_LLM_TTFT_MS = 300
+STUB_LLM_TOKENS_PER_SEC = 400
+
+# LLM Cassettes (record calls to files, replay them offline with original or compressed timing)
+LLM_CASSETTE_MODE = os.getenv("ARTICULAITE_CASSETTE_MODE", "")  # "record", "replay" or "" (off)
+LLM_CASSETTE_DIR = os.getenv("ARTICULAITE_CASSETTE_DIR", ".cache/cassettes")
+LLM_CASSETTE_SPEED = float(os.getenv("ARTICULAITE_CASSETTE_SPEED", "1"))  # Replay speed-up, 0 for no delays
+
+# Memory Diagnostics (admin view at ?admin=<token>; periodic JSONL reports when an interval is set)
+DIAGNOSTICS_ADMIN_TOKEN = os.getenv("ARTICULAITE_ADMIN_TOKEN")
+DIAGNOSTICS_INTERVAL = int(os.getenv("ARTICULAITE_DIAGNOSTICS_INTERVAL", "0"))  # seconds, 0 disables
+DIAGNOSTICS_PATH = ".cache/diagnostics.jsonl"
+DIAGNOSTICS_TOP = 15  # Allocation sites listed per diff
+DIAGNOSTICS_TRACE_FRAMES = 25  # Deep enough to reach app code from library allocations
+DIAGNOSTICS_MAX_SNAPSHOTS = 2  # Snapshots are large; only the last two are diffed
+
+# Rate Limiting (bulk screening LLM calls, shared by all batches and, with a shared state server, all replicas)
 RATE_LIMIT_CALLS = 10
 RATE_LIMIT_WINDOW = 60  # seconds
 
+# Shared State (caches, counters and rate limits; set a URL to share them across replicas)
+SHARED_STATE_URL = os.getenv("ARTICULAITE_SHARED_STATE_URL", "")  # "redis://host:6379/0", or "" for in-process
+SHARED_STATE_PREFIX = os.getenv("ARTICULAITE_SHARED_STATE_PREFIX", "articulaite:")
+SHARED_STATE_TIMEOUT = 2  # seconds per command before the backend counts as unavailable
+SHARED_STATE_RETRY_AFTER = 5  # seconds an unavailable backend is skipped before it is tried again
+SHARED_STATE_MEMORY_MAX_KEYS = 2000  # In-process backend: least recently used keys are evicted beyond this
+SHARED_CACHE_TTL = 7 * 24 * 3600  # seconds a cached LLM result or export stays in shared state
+
 # Error Messages
 ERROR_MESSAGES = {
     "api_key_missing": "GROQ_API_KEY not configured.",
     "file_too_large": "File exceeds maximum size limit (10MB).",
     "invalid_file_type": "Invalid file type. Supported: PDF, DOCX, TXT",
+    "file_content_mismatch": "File content does not match its extension.",
+    "file_corrupt": "File is corrupted or not a valid document.",
+    "file_encrypted": "Password-protected files are not supported.",
+    "too_many_pages": f"File exceeds maximum page limit ({MAX_PDF_PAGES} pages).",
+    "extraction_timeout": "Reading the file took too long. Try a smaller file.",
+    "extraction_busy": "The server is busy reading other files. Try again in a moment.",
     "api_error": "An error occurred with the API.",
     "timeout": "Request timed out.",
     "rate_limit": "Rate limit exceeded."
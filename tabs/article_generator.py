@@ -3,11 +3,45 @@ Article Generator Tab
 """
 
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
 from utils.chat_history import initialize_chat_history, add_message, display_chat_history, format_chat_history_for_llm
-from config import ARTICLE_GENERATOR_MODELS, SYSTEM_PROMPTS, WRITING_STYLES, ARTICLE_MAX_WORDS, ARTICLE_MIN_WORDS, ARTICLE_DEFAULT_WORDS
-import os
+from utils.llm import stream_text
+from utils.compare import compare_panel
+from utils.speculative import speculative_chat_turn
+from utils.streaming_markdown import stream_markdown, stream_chat_turn, stop_button, TRUNCATED_NOTE
+from utils.prefetch import prefetch, take_prefetched, output_tokens
+from utils.prompts import build_messages, build_chat_messages
+from utils.export import render_html, prepare_exports, export_buttons
+from config import ARTICLE_GENERATOR_MODELS, WRITING_STYLES, ARTICLE_MAX_WORDS, ARTICLE_MIN_WORDS, ARTICLE_DEFAULT_WORDS, SPECULATIVE_DRAFT_MODEL
+
+def article_messages(article_topic, word_count, writing_style, temperature, include_sources, include_toc):
+    """Prompt messages for generating an article"""
+    content = f"""Topic: {article_topic}
+Word Count: {word_count} words
+Style: {writing_style}
+Creativity: {temperature} (0=factual, 1=creative)
+{'Include: References' if include_sources else 'No external references'}
+{'Include: Table of contents' if include_toc else ''}
+
+Write now:"""
+    return build_messages("article_generator.generate", content)
+
+def keep_stopped_article(tab_key, article_topic, partial):
+    """Keep a stopped article's text so far, marked as truncated"""
+    article_content = partial + TRUNCATED_NOTE
+    st.session_state['generated_article'] = article_content
+    st.session_state['generated_article_topic'] = article_topic
+    prepare_exports(article_topic, article_content)
+    add_message(tab_key, "assistant", "Article generation was stopped; the part written so far is kept above.")
+
+def prefetch_article(messages, model, temperature):
+    """Start writing the article in the background once a topic is entered"""
+    def job():
+        stats = {}
+        article = "".join(stream_text(model, temperature, messages, stats))
+        return article, output_tokens(article, stats)
+
+    prefetch("article_generate", [model, temperature, [message.content for message in messages]], job,
+             st.session_state.setdefault("article_prefetch", {}))
 
 def article_generator_tab():
     """Article Generator Tab"""
@@ -80,49 +114,47 @@ def article_generator_tab():
 
     
     
+    if article_topic:
+        messages = article_messages(article_topic, word_count, writing_style, temperature, include_sources, include_toc)
+        prefetch_article(messages, selected_model, temperature)
+
     # Generate Button
     if st.button("Generate Article", key="article_generate"):
         if not article_topic:
             st.error("Enter article topic!")
         else:
-            with st.spinner("Generating article..."):
-                try:
-                    llm = ChatGroq(
-                        model=selected_model,
-                        temperature=temperature,
-                        groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                    )
-                    prompt_text = f"""Write a comprehensive article on:
-
-Topic: {article_topic}
-Word Count: {word_count} words
-Style: {writing_style}
-Creativity: {temperature} (0=factual, 1=creative)
-{f'Include: References' if include_sources else 'No external references'}
-{f'Include: Table of contents' if include_toc else ''}
-
-Requirements:
-- Well-researched and accurate
-- Engaging and well-structured
-- Clear headings
-- Professional formatting
-- Publication-ready
-
-Write now:"""
-                    response = llm.invoke(prompt_text)
-                    article_content = response.content
-                    st.session_state['generated_article'] = article_content
-                    # REMOVE this line:
-                    # st.session_state['article_topic'] = article_topic
-                    
-                    add_message(tab_key, "assistant", "Let's discuss more on the above article. What would you like to refine, expand, or ask about?")
-                    st.success("Generated!")
-                    
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
+            try:
+                # A prefetch still writing this article is attached to, not restarted: identical streams are shared
+                article_content = take_prefetched(
+                    "article_generate", [selected_model, temperature, [message.content for message in messages]], wait=False
+                )
+                if article_content is None:
+                    # Stream the article as it is written; the styled version below replaces it
+                    progress = st.empty()
+                    with progress.container():
+                        st.caption("Generating article...")
+                        stop_button(f"{tab_key}_generate_stop")
+                        article_content = stream_markdown(
+                            selected_model, temperature, messages,
+                            on_stop=lambda partial: keep_stopped_article(tab_key, article_topic, partial)
+                        )
+                    progress.empty()
+                st.session_state['generated_article'] = article_content
+                # The topic it was written for, which the topic box may no longer show
+                st.session_state['generated_article_topic'] = article_topic
+                prepare_exports(article_topic, article_content)
+                # REMOVE this line:
+                # st.session_state['article_topic'] = article_topic
+                
+                add_message(tab_key, "assistant", "Let's discuss more on the above article. What would you like to refine, expand, or ask about?")
+                st.success("Generated!")
+                
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
     
     # Display Generated Article
     if 'generated_article' in st.session_state:
+        generated_topic = st.session_state.get('generated_article_topic') or "article"
         st.markdown("---")
         st.markdown("""
         <h4 style='text-align: left; color: #33FF33;'>
@@ -134,10 +166,18 @@ Write now:"""
         col1, col2 = st.columns([4, 1])
         with col1:
             # Just READ the value
-            st.markdown(f"**Topic:** {article_topic}")
+            st.markdown(f"**Topic:** {generated_topic}")
+        
+        with col2:
+            export_buttons(generated_topic, st.session_state['generated_article'], "article")
         
         st.markdown("---")
-        st.markdown(st.session_state['generated_article'])
+        st.markdown(render_html(st.session_state['generated_article']), unsafe_allow_html=True)
+    
+    # Compare Models
+    context = f"""Article being edited:
+{st.session_state.get('generated_article', 'Not yet generated')}"""
+    compare_panel(tab_key, ARTICLE_GENERATOR_MODELS, temperature, context)
     
     # Chat Interface
     st.markdown("---")
@@ -150,6 +190,9 @@ Write now:"""
     unsafe_allow_html=True)
     # st.markdown("Refine, expand, or modify sections!")
     
+    fast_draft = st.checkbox("⚡ Fast draft first",value=False,key="article_fast_draft",
+        help=f"Show a quick draft from {SPECULATIVE_DRAFT_MODEL} while the selected model finishes its answer")
+    
     display_chat_history(tab_key)
     
     user_input = st.chat_input(
@@ -160,29 +203,17 @@ Write now:"""
     if user_input:
         add_message(tab_key, "user", user_input)
         
-        with st.spinner("Editor is working..."):
-            try:
-                llm = ChatGroq(
-                    model=selected_model,
-                    temperature=temperature,
-                    groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                )
-                
-                context = f"""{SYSTEM_PROMPTS['article_generator']}
-
-Article being edited:
-{st.session_state.get('generated_article', 'Not yet generated')}"""
-                chat_history = format_chat_history_for_llm(tab_key)
-                prompt = ChatPromptTemplate.from_messages([
-                    ("system", context),
-                    *[(msg["role"], msg["content"]) for msg in chat_history]
-                ])
-                
-                response = llm.invoke(prompt.format_prompt().to_messages())
-                assistant_response = response.content
-                
-                add_message(tab_key, "assistant", assistant_response)
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+        try:
+            chat_history = format_chat_history_for_llm(tab_key)
+            messages = build_chat_messages(tab_key, context, chat_history)
+            
+            if fast_draft:
+                assistant_response = speculative_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            else:
+                assistant_response = stream_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            
+            add_message(tab_key, "assistant", assistant_response)
+            st.rerun()
+            
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
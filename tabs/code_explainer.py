@@ -3,11 +3,36 @@ Code Explainer & Problem Solver Tab
 """
 
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
 from utils.chat_history import initialize_chat_history, add_message, display_chat_history, format_chat_history_for_llm
-from config import CODE_EXPLAINER_MODELS, DEFAULT_CODE_MODEL, SYSTEM_PROMPTS
-import os
+from utils.llm import complete_text
+from utils.compare import compare_panel
+from utils.speculative import speculative_chat_turn
+from utils.streaming_markdown import stream_chat_turn, stop_controls
+from utils.prompts import build_messages, build_chat_messages
+from utils.code_units import analyse_code
+from utils.prefetch import prefetch, take_prefetched, output_tokens
+from utils.code_analysis import pre_analyse, format_syntax_error, build_findings_content, diff_code, build_diff_content
+from config import CODE_EXPLAINER_MODELS, DEFAULT_CODE_MODEL, SPECULATIVE_DRAFT_MODEL, CODE_DIFF_MAX_RATIO
+
+def unit_summary(unit_stats):
+    """Short note on how many code units were sent to the model"""
+    if unit_stats["units"] == 1:
+        return ""
+    summary = f"{unit_stats['analysed']} of {unit_stats['units']} units analysed, {unit_stats['cached']} from cache"
+    if unit_stats.get("failed"):
+        summary += f", {unit_stats['failed']} failed"
+    return f"({summary})"
+
+def prefetch_explanation(code, model, temperature):
+    """Start explaining pasted code in the background, the usual next click after a paste"""
+    def job():
+        explanation, unit_stats = analyse_code("explain", code, model, temperature)
+        if unit_stats["failed"]:
+            # Not kept as a prediction; the click retries the failed units (the rest are cached)
+            raise RuntimeError(f"{unit_stats['failed']} code units failed")
+        return [explanation, unit_stats], output_tokens(explanation)
+
+    prefetch("code_explain", [model, temperature, code], job, st.session_state.setdefault("code_prefetch", {}))
 
 def code_explainer_tab():
     """Code Explainer & Problem Solver Tab"""
@@ -68,6 +93,9 @@ def code_explainer_tab():
             unsafe_allow_html=True
         )
 
+    if st.session_state.get('current_code'):
+        prefetch_explanation(st.session_state['current_code'], selected_model, temperature)
+
     # Action Buttons
     exp_col, debug_col, opt_col = st.columns(3)
     
@@ -76,28 +104,20 @@ def code_explainer_tab():
             if 'current_code' not in st.session_state or not st.session_state['current_code']:
                 st.error("Paste code first!")
             else:
-                with st.spinner("Analyzing..."):
+                with stop_controls("code_explain_stop", "Analyzing") as on_wait, st.spinner("Analyzing..."):
                     try:
-                        llm = ChatGroq(
-                            model=selected_model,
-                            temperature=temperature,
-                            groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                        )
-                        
-                        prompt_text = f"""Provide detailed line-by-line explanation of this code.
-
-CODE:
-```
-{st.session_state['current_code']}
-```
-
-Explain what each part does and why it's written that way."""
-                        
-                        response = llm.invoke(prompt_text)
-                        explanation = response.content
+                        code = st.session_state['current_code']
+                        # A prefetch still running is attached to through its unit streams and cache
+                        prefetched = take_prefetched("code_explain", [selected_model, temperature, code], wait=False)
+                        if prefetched is not None:
+                            explanation, unit_stats = prefetched
+                            status = "Ready! (prefetched)"
+                        else:
+                            explanation, unit_stats = analyse_code("explain", code, selected_model, temperature, on_wait=on_wait)
+                            status = f"Ready! {unit_summary(unit_stats)}"
                         
                         add_message(tab_key, "assistant", f"**Code Explanation:**\n\n{explanation}")
-                        st.success("Ready!")
+                        st.success(status)
                         
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
@@ -107,28 +127,41 @@ Explain what each part does and why it's written that way."""
             if 'current_code' not in st.session_state or not st.session_state['current_code']:
                 st.error("Paste code first!")
             else:
-                with st.spinner("Debugging..."):
+                with stop_controls("code_debug_stop", "Debugging") as on_wait, st.spinner("Debugging..."):
                     try:
-                        llm = ChatGroq(
-                            model=selected_model,
-                            temperature=temperature,
-                            groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                        )
+                        code = st.session_state['current_code']
+                        analysis = pre_analyse(code)
+                        last_debug = st.session_state.get('code_last_debug')
+                        if last_debug and last_debug["model"] != selected_model:
+                            last_debug = None
+                        diff, changed_ratio = diff_code(last_debug["code"], code) if last_debug else (None, 1.0)
                         
-                        prompt_text = f"""Find errors and issues in this code:
-
-CODE:
-```
-{st.session_state['current_code']}
-```
-
-For each issue: identify it, explain why, provide fix, explain the fix."""
+                        if analysis and analysis["syntax_error"]:
+                            # Pure syntax errors are answered locally, without an LLM call
+                            debug_info = format_syntax_error(code, analysis["syntax_error"])
+                            status = "Done! (answered locally)"
+                        elif last_debug and last_debug["code"] == code:
+                            debug_info = last_debug["report"]
+                            status = "Done! (code unchanged since the last analysis)"
+                        elif last_debug and changed_ratio <= CODE_DIFF_MAX_RATIO:
+                            # Review only the changed hunks against the prior findings
+                            content = build_diff_content(diff, last_debug["report"], analysis["diagnostics"] if analysis else None)
+                            debug_info = complete_text(selected_model, temperature, build_messages("code_explainer.debug_diff", content), on_wait=on_wait)
+                            status = f"Done! (changes reviewed, {changed_ratio:.0%} of lines changed)"
+                        elif analysis and analysis["diagnostics"]:
+                            # Send the findings and their line windows instead of the full file
+                            content = build_findings_content(code, analysis["diagnostics"])
+                            debug_info = complete_text(selected_model, temperature, build_messages("code_explainer.debug_findings", content), on_wait=on_wait)
+                            status = f"Done! ({len(analysis['diagnostics'])} local findings reviewed)"
+                        else:
+                            debug_info, unit_stats = analyse_code("debug", code, selected_model, temperature, on_wait=on_wait)
+                            status = f"Done! {unit_summary(unit_stats)}"
                         
-                        response = llm.invoke(prompt_text)
-                        debug_info = response.content
+                        if not (analysis and analysis["syntax_error"]):
+                            st.session_state['code_last_debug'] = {"code": code, "report": debug_info, "model": selected_model}
                         
                         add_message(tab_key, "assistant", f"**Error Analysis:**\n\n{debug_info}")
-                        st.success("Done!")
+                        st.success(status)
                         
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
@@ -138,32 +171,24 @@ For each issue: identify it, explain why, provide fix, explain the fix."""
             if 'current_code' not in st.session_state or not st.session_state['current_code']:
                 st.error("Paste code first!")
             else:
-                with st.spinner("Optimizing..."):
+                with stop_controls("code_optimize_stop", "Optimizing") as on_wait, st.spinner("Optimizing..."):
                     try:
-                        llm = ChatGroq(
-                            model=selected_model,
-                            temperature=temperature,
-                            groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                        )
-                        
-                        prompt_text = f"""Provide optimization suggestions for this code:
-
-CODE:
-```
-{st.session_state['current_code']}
-```
-
-Consider: time complexity, space complexity, readability, best practices."""
-                        
-                        response = llm.invoke(prompt_text)
-                        optimizations = response.content
+                        optimizations, unit_stats = analyse_code("optimize", st.session_state['current_code'], selected_model, temperature,
+                                                                 on_wait=on_wait)
                         
                         add_message(tab_key, "assistant", f"**Optimizations:**\n\n{optimizations}")
-                        st.success("Done!")
+                        st.success(f"Done! {unit_summary(unit_stats)}")
                         
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
     
+    # Compare Models
+    context = f"""Current code:
+```
+{st.session_state.get('current_code', 'Not provided')}
+```"""
+    compare_panel(tab_key, CODE_EXPLAINER_MODELS, temperature, context)
+    
     # Chat Interface
     st.markdown("---")
     # st.markdown("#### 🎓 Chat with Code Expert")
@@ -174,6 +199,9 @@ Consider: time complexity, space complexity, readability, best practices."""
     """,
     unsafe_allow_html=True)
     
+    fast_draft = st.checkbox("⚡ Fast draft first",value=False,key="code_fast_draft",
+        help=f"Show a quick draft from {SPECULATIVE_DRAFT_MODEL} while the selected model finishes its answer")
+    
     display_chat_history(tab_key)
     
     user_input = st.chat_input(
@@ -184,33 +212,17 @@ Consider: time complexity, space complexity, readability, best practices."""
     if user_input:
         add_message(tab_key, "user", user_input)
         
-        with st.spinner("Expert is analyzing..."):
-            try:
-                llm = ChatGroq(
-                    model=selected_model,
-                    temperature=temperature,
-                    groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                )
-                
-                context = f"""{SYSTEM_PROMPTS['code_explainer']}
-
-Current code:
-```
-{st.session_state.get('current_code', 'Not provided')}
-```"""
-                
-                chat_history = format_chat_history_for_llm(tab_key)
-                
-                prompt = ChatPromptTemplate.from_messages([
-                    ("system", context),
-                    *[(msg["role"], msg["content"]) for msg in chat_history]
-                ])
-                
-                response = llm.invoke(prompt.format_prompt().to_messages())
-                assistant_response = response.content
-                
-                add_message(tab_key, "assistant", assistant_response)
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+        try:
+            chat_history = format_chat_history_for_llm(tab_key)
+            messages = build_chat_messages(tab_key, context, chat_history)
+            
+            if fast_draft:
+                assistant_response = speculative_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            else:
+                assistant_response = stream_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            
+            add_message(tab_key, "assistant", assistant_response)
+            st.rerun()
+            
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
@@ -3,12 +3,70 @@ CV Analysis & Interview Preparation Tab
 """
 
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
 from utils.file_handler import validate_file, extract_text_from_file
 from utils.chat_history import initialize_chat_history, add_message, display_chat_history, get_chat_history, format_chat_history_for_llm
-from config import CV_INTERVIEW_MODELS, DEFAULT_CV_MODEL, SYSTEM_PROMPTS
-import os
+from utils.llm import stream_text, complete_text
+from utils.compare import compare_panel
+from utils.bulk_cv import bulk_screening_panel
+from utils.skill_match import skill_match_panel
+from utils.speculative import speculative_chat_turn
+from utils.streaming_markdown import stream_chat_turn, stop_controls
+from utils.prompts import build_messages, build_chat_messages
+from utils.prefetch import prefetch, take_prefetched, output_tokens
+from utils.resume_profile import resume_hash, get_resume_profile, format_profile, needs_raw_resume
+from config import CV_INTERVIEW_MODELS, DEFAULT_CV_MODEL, SPECULATIVE_DRAFT_MODEL
+
+def resume_for_prompt(include_raw=False):
+    """Resume section for prompts: the compact profile, or the raw text when needed or unavailable"""
+    resume_text = st.session_state['resume_text']
+    digest = resume_hash(resume_text)
+    if st.session_state.get('resume_profile_hash') != digest:
+        profile = None
+        try:
+            with st.spinner("Reading resume..."):
+                profile = get_resume_profile(resume_text)
+        except Exception as e:
+            st.warning(f"Could not build resume profile, using full text: {str(e)}")
+        st.session_state['resume_profile'] = format_profile(profile) if profile else None
+        st.session_state['resume_profile_hash'] = digest
+
+    return resume_section(resume_text, st.session_state['resume_profile'], include_raw)
+
+def resume_section(resume_text, profile_text, include_raw=False):
+    """Resume section from the formatted profile (None when unavailable) and the raw text"""
+    if profile_text is None:
+        return f"RESUME:\n{resume_text}"
+    if include_raw:
+        return f"RESUME PROFILE:\n{profile_text}\n\nRESUME (full text):\n{resume_text}"
+    return f"RESUME PROFILE:\n{profile_text}"
+
+def questions_content(resume, job_description):
+    """Prompt content for interview questions"""
+    if job_description:
+        return f"{resume}\n\nJOB DESCRIPTION:\n{job_description}"
+    return resume
+
+def prefetch_questions(resume_text, job_description, model, temperature):
+    """Start generating interview questions in the background, the usual next click after an upload"""
+    def job():
+        # Same prompt as the click: the (shared, cached) profile, falling back to the raw text
+        try:
+            profile = get_resume_profile(resume_text)
+        except Exception:
+            profile = None
+        content = questions_content(resume_section(resume_text, format_profile(profile) if profile else None), job_description)
+        # Streamed, so a click while it runs attaches to it (identical streams are coalesced)
+        stats = {}
+        questions = "".join(stream_text(model, temperature, build_messages("cv_interview.questions", content), stats))
+        return questions, output_tokens(questions, stats)
+
+    prefetch("cv_questions", [model, temperature, resume_text, job_description], job, st.session_state.setdefault("cv_prefetch", {}))
+
+def resume_context(job_description, include_raw=False):
+    """Chat context with the resume and job description"""
+    resume = resume_for_prompt(include_raw) if 'resume_text' in st.session_state else "RESUME: Not provided"
+    return f"""{resume}
+JOB DESCRIPTION: {job_description if job_description else 'Not provided'}"""
 
 def cv_interview_tab():
     """CV Analysis & Interview Preparation Tab"""
@@ -50,11 +108,16 @@ def cv_interview_tab():
                 is_valid, message = validate_file(uploaded_file)
                 if not is_valid:
                     st.error(message)
+                elif st.session_state.get('resume_file_id') == uploaded_file.file_id:
+                    # Already read on an earlier rerun; extraction runs in a child process
+                    st.success("File validated!")
                 else:
                     st.success("File validated!")
                     resume_text = extract_text_from_file(uploaded_file)
                     if resume_text:
                         st.session_state['resume_text'] = resume_text
+                        st.session_state['resume_file_id'] = uploaded_file.file_id
+                        resume_for_prompt()
                         # st.markdown("**Preview (First 500 chars):**")
                         # st.text(resume_text[:500] + "...")
             
@@ -77,6 +140,13 @@ def cv_interview_tab():
                 key="cv_job_description"
             )
 
+    if 'resume_text' in st.session_state:
+        prefetch_questions(st.session_state['resume_text'], job_description, selected_model, temperature)
+
+    # Instant local skill match, no LLM call
+    if 'resume_text' in st.session_state and job_description:
+        skill_match_panel(st.session_state['resume_text'], job_description)
+
     with st.expander("⚠️🚫 Temperature Guidance", expanded=False):
         st.markdown(
             """
@@ -101,29 +171,19 @@ def cv_interview_tab():
             if 'resume_text' not in st.session_state:
                 st.error("Upload resume first!")
             else:
-                with st.spinner("Generating..."):
+                with stop_controls("cv_gen_questions_stop") as on_wait, st.spinner("Generating..."):
                     try:
-                        llm = ChatGroq(
-                            model=selected_model,
-                            temperature=temperature,
-                            groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                        )
-                        
-                        prompt_text = f"""Generate 10 targeted interview questions based on this resume:
-
-RESUME:
-{st.session_state['resume_text']}
-
-{f'JOB DESCRIPTION:\\n{job_description}' if job_description else ''}
-
-Include behavioral, technical, and role-specific questions."""
-                        
-                        response = llm.invoke(prompt_text)
-                        questions = response.content
+                        inputs = [selected_model, temperature, st.session_state['resume_text'], job_description]
+                        questions = take_prefetched("cv_questions", inputs, wait=False)
+                        status = "Done! (prefetched)"
+                        if questions is None:
+                            content = questions_content(resume_for_prompt(), job_description)
+                            questions = complete_text(selected_model, temperature, build_messages("cv_interview.questions", content), on_wait=on_wait)
+                            status = "Done!"
                         
                         st.session_state['interview_questions'] = questions
                         add_message(tab_key, "assistant", f"**Interview Questions:**\n\n{questions}")
-                        st.success("Done!")
+                        st.success(status)
                         
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
@@ -133,25 +193,11 @@ Include behavioral, technical, and role-specific questions."""
             if 'resume_text' not in st.session_state:
                 st.error("Upload resume first!")
             else:
-                with st.spinner("Analyzing..."):
+                with stop_controls("cv_skill_highlights_stop", "Analyzing") as on_wait, st.spinner("Analyzing..."):
                     try:
-                        llm = ChatGroq(
-                            model=selected_model,
-                            temperature=temperature,
-                            groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                        )
-                        
-                        prompt_text = f"""Analyze this resume and provide:
-1. Top 5 strongest skills to highlight
-2. How to present each skill effectively
-3. Questions to prepare for
-4. Skills gaps to address
-
-RESUME:
-{st.session_state['resume_text']}"""
+                        content = resume_for_prompt()
                         
-                        response = llm.invoke(prompt_text)
-                        highlights = response.content
+                        highlights = complete_text(selected_model, temperature, build_messages("cv_interview.skills", content), on_wait=on_wait)
                         
                         add_message(tab_key, "assistant", f"**Skill Highlights:**\n\n{highlights}")
                         st.success("Done!")
@@ -159,6 +205,13 @@ RESUME:
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
     
+    # Compare Models
+    context = resume_context(job_description)
+    compare_panel(tab_key, CV_INTERVIEW_MODELS, temperature, context)
+    
+    # Bulk Screening
+    bulk_screening_panel(job_description, selected_model, temperature)
+    
     # Chat Interface
     st.markdown("---")
     # st.markdown("#### Chat with Career Coach")
@@ -169,6 +222,9 @@ RESUME:
     """,
     unsafe_allow_html=True)
     
+    fast_draft = st.checkbox("⚡ Fast draft first",value=False,key="cv_fast_draft",
+        help=f"Show a quick draft from {SPECULATIVE_DRAFT_MODEL} while the selected model finishes its answer")
+    
     display_chat_history(tab_key)
     
     user_input = st.chat_input(
@@ -179,31 +235,20 @@ RESUME:
     if user_input:
         add_message(tab_key, "user", user_input)
         
-        with st.spinner("Coach is thinking..."):
-            try:
-                llm = ChatGroq(
-                    model=selected_model,
-                    temperature=temperature,
-                    groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                )
-                
-                context = f"""{SYSTEM_PROMPTS['cv_interview']}
-
-RESUME: {st.session_state.get('resume_text', 'Not provided')}
-JOB DESCRIPTION: {job_description if job_description else 'Not provided'}"""
-                
-                chat_history = format_chat_history_for_llm(tab_key)
-                
-                prompt = ChatPromptTemplate.from_messages([
-                    ("system", context),
-                    *[(msg["role"], msg["content"]) for msg in chat_history]
-                ])
-                
-                response = llm.invoke(prompt.format_prompt().to_messages())
-                assistant_response = response.content
-                
-                add_message(tab_key, "assistant", assistant_response)
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+        try:
+            if needs_raw_resume(user_input):
+                context = resume_context(job_description, include_raw=True)
+            
+            chat_history = format_chat_history_for_llm(tab_key)
+            messages = build_chat_messages(tab_key, context, chat_history)
+            
+            if fast_draft:
+                assistant_response = speculative_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            else:
+                assistant_response = stream_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            
+            add_message(tab_key, "assistant", assistant_response)
+            st.rerun()
+            
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
@@ -3,11 +3,24 @@ Study Plan Generator Tab
 """
 
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
 from utils.chat_history import initialize_chat_history, add_message, display_chat_history, format_chat_history_for_llm
-from config import STUDY_PLAN_MODELS, SYSTEM_PROMPTS, STUDY_MIN_WEEKS, STUDY_MAX_WEEKS
-import os
+from utils.compare import compare_panel
+from utils.speculative import speculative_chat_turn
+from utils.streaming_markdown import stream_chat_turn, stop_button, stop_controls, TRUNCATED_NOTE
+from utils.prompts import build_chat_messages
+from utils.export import render_html, prepare_exports, export_buttons
+from utils.study_planner import (generate_plan, generate_outline, outline_weeks, week_heading, generate_weeks,
+    plan_from_outline, regenerate_week, rescale_plan, render_week, render_plan, compact_plan)
+from config import STUDY_PLAN_MODELS, STUDY_MIN_WEEKS, STUDY_MAX_WEEKS, STUDY_LONG_PLAN_WEEKS, SPECULATIVE_DRAFT_MODEL
+
+def plan_title(plan):
+    return f"Study Plan - {plan['settings']['subject']}"
+
+def store_plan(plan, note=""):
+    """Keep the structured plan and its rendered markdown, and start building its exports"""
+    st.session_state['study_plan_data'] = plan
+    st.session_state['generated_study_plan'] = render_plan(plan) + note
+    prepare_exports(plan_title(plan), st.session_state['generated_study_plan'])
 
 def study_plan_tab():
     """Study Plan Generator Tab"""
@@ -88,56 +101,110 @@ def study_plan_tab():
         if not subject:
             st.error("Enter a subject!")
         else:
-            with st.spinner("Creating study plan..."):
-                try:
-                    llm = ChatGroq(
-                        model=selected_model,
-                        temperature=temperature,
-                        groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                    )
-                    
-                    prompt_text = f"""Create comprehensive study plan:
-
-Subject: {subject}
-Duration: {duration_weeks} weeks
-Level: {knowledge_level}
-Goal: {learning_goal}
-Daily Hours: {daily_hours} hours
-Methods: {', '.join(learning_style)}
-
-Include:
-1. Overview of what will be covered
-2. Learning objectives
-3. Week-by-week schedule with topics
-4. Recommended resources
-5. Progress tracking metrics
-6. Success tips
-
-Format clearly with proper headings."""
-                    
-                    response = llm.invoke(prompt_text)
-                    study_plan = response.content
-                    
-                    st.session_state['generated_study_plan'] = study_plan
-                    st.session_state['study_subject'] = subject
-                    
-                    add_message(tab_key, "assistant", f"**Study Plan for {subject}**\n\n{study_plan}")
-                    st.success("Plan created!")
-                    
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
+            try:
+                settings = {
+                    "subject": subject,
+                    "duration_weeks": duration_weeks,
+                    "level": knowledge_level,
+                    "goal": learning_goal,
+                    "daily_hours": daily_hours,
+                    "methods": learning_style
+                }
+                
+                if duration_weeks > STUDY_LONG_PLAN_WEEKS:
+                    # Long plans: outline first, then weeks in parallel, rendered as they finish
+                    progress = st.empty()
+                    with progress.container():
+                        stop_button(f"{tab_key}_generate_stop")
+                        status = st.empty()
+                        with st.spinner("Outlining study plan..."):
+                            outline = generate_outline(settings, selected_model, temperature,
+                                                       on_wait=lambda seconds: status.caption(f"⏳ Outlining... {seconds:.0f}s"))
+                        
+                        weeks = outline_weeks(outline)
+                        # outline_weeks numbers the weeks 1..n, so each week has its own slot
+                        placeholders = {}
+                        for week in weeks:
+                            placeholders[week["week"]] = st.empty()
+                            placeholders[week["week"]].markdown(f"{week_heading(week)}\n\n_{week['focus']}_ ⏳")
+                        
+                        done = []
+                        def show_week(week):
+                            done.append(week)
+                            placeholders[week["week"]].markdown(render_week(week))
+                            status.caption(f"{len(done)} of {len(weeks)} weeks ready")
+                        
+                        def show_wait(seconds):
+                            status.caption(f"{len(done)} of {len(weeks)} weeks ready · {seconds:.0f}s")
+                        
+                        try:
+                            details = generate_weeks(settings, outline, selected_model, temperature,
+                                                     on_week=show_week, on_wait=show_wait)
+                        except BaseException:
+                            # Stopped or failed part-way: keep the weeks already written
+                            if done:
+                                store_plan(plan_from_outline(settings, outline, {week["week"]: week for week in done}), TRUNCATED_NOTE)
+                                add_message(tab_key, "assistant", f"Plan generation was stopped after {len(done)} of {len(weeks)} weeks; those weeks are kept below.")
+                            raise
+                    progress.empty()
+                    plan = plan_from_outline(settings, outline, details)
+                else:
+                    with stop_controls(f"{tab_key}_generate_stop", "Creating study plan") as on_wait:
+                        with st.spinner("Creating study plan..."):
+                            plan = generate_plan(settings, selected_model, temperature, on_wait=on_wait)
+                
+                store_plan(plan)
+                
+                add_message(tab_key, "assistant", f"**Study Plan for {subject}** is ready: {len(plan['weeks'])} weeks at {daily_hours:g} hours/day. Ask me about any week!")
+                st.success("Plan created!")
+                
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
     
     # Display Generated Plan
-    if 'generated_study_plan' in st.session_state:
+    plan = st.session_state.get('study_plan_data')
+    if plan:
         st.markdown("---")
         st.markdown("#### Your Study Plan")
         
         col1, col2 = st.columns([4, 1])
         with col1:
-            st.markdown(f"**Subject:** {st.session_state.get('study_subject', 'N/A')}")
+            st.markdown(f"**Subject:** {plan['settings']['subject']}")
+        with col2:
+            export_buttons(plan_title(plan), st.session_state['generated_study_plan'], "study")
+        
+        # Adjust Plan: rescaling is local, regenerating a week is one model call
+        with st.container(border=True):
+            plan_weeks = plan['settings']['duration_weeks']
+            plan_hours = plan['settings']['daily_hours']
+            rcol, wcol = st.columns([1, 1])
+            with rcol:
+                changed = (duration_weeks, daily_hours) != (plan_weeks, plan_hours)
+                st.caption(f"Plan: {plan_weeks} weeks at {plan_hours:g} h/day" + (f" · settings: {duration_weeks} weeks at {daily_hours:g} h/day" if changed else ""))
+                if st.button("Rescale to current settings", key="study_rescale", disabled=not changed,
+                    help="Rebalance hours and compress or stretch the timeline locally, without an AI call"):
+                    plan = rescale_plan(plan, duration_weeks, daily_hours)
+                    store_plan(plan)
+                    st.rerun()
+            with wcol:
+                week_number = st.selectbox("Week", [week['week'] for week in plan['weeks']],
+                format_func=lambda number: f"Week {number}", key="study_regen_week")
+                if st.button("Regenerate week", key="study_regen"):
+                    try:
+                        with stop_controls("study_regen_stop", f"Regenerating week {week_number}") as on_wait:
+                            with st.spinner(f"Regenerating week {week_number}..."):
+                                plan = regenerate_week(plan, week_number, selected_model, temperature, on_wait=on_wait)
+                        store_plan(plan)
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error: {str(e)}")
         
         st.markdown("---")
-        st.markdown(st.session_state['generated_study_plan'])
+        st.markdown(render_html(st.session_state['generated_study_plan']), unsafe_allow_html=True)
+    
+    # Compare Models
+    context = compact_plan(plan) if plan else "Study Plan: Not yet generated"
+    compare_panel(tab_key, STUDY_PLAN_MODELS, temperature, context)
     
     # Chat Interface
     st.markdown("---")
@@ -152,6 +219,9 @@ Format clearly with proper headings."""
     
     # st.markdown("Customize the plan or get recommendations!")
     
+    fast_draft = st.checkbox("⚡ Fast draft first",value=False,key="study_fast_draft",
+        help=f"Show a quick draft from {SPECULATIVE_DRAFT_MODEL} while the selected model finishes its answer")
+    
     display_chat_history(tab_key)
     
     user_input = st.chat_input(
@@ -162,31 +232,17 @@ Format clearly with proper headings."""
     if user_input:
         add_message(tab_key, "user", user_input)
         
-        with st.spinner("Mentor preparing response..."):
-            try:
-                llm = ChatGroq(
-                    model=selected_model,
-                    temperature=temperature,
-                    groq_api_key=os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
-                )
-                
-                context = f"""{SYSTEM_PROMPTS['study_plan']}
-
-Study Plan:
-{st.session_state.get('generated_study_plan', 'Not yet generated')}"""
-                
-                chat_history = format_chat_history_for_llm(tab_key)
-                
-                prompt = ChatPromptTemplate.from_messages([
-                    ("system", context),
-                    *[(msg["role"], msg["content"]) for msg in chat_history]
-                ])
-                
-                response = llm.invoke(prompt.format_prompt().to_messages())
-                assistant_response = response.content
-                
-                add_message(tab_key, "assistant", assistant_response)
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+        try:
+            chat_history = format_chat_history_for_llm(tab_key)
+            messages = build_chat_messages(tab_key, context, chat_history)
+            
+            if fast_draft:
+                assistant_response = speculative_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            else:
+                assistant_response = stream_chat_turn(tab_key, user_input, selected_model, temperature, messages)
+            
+            add_message(tab_key, "assistant", assistant_response)
+            st.rerun()
+            
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
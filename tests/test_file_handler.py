@@ -0,0 +1,19 @@
+from utils.file_handler import normalise_pdf_pages
+
+def test_dates_at_page_edges_are_kept():
+    pages = [
+        "Jane Doe - CV\nAcme Corp\n2019 – 2021",
+        "Jane Doe - CV\nBeta Ltd\n2015 – 2018",
+        "Jane Doe - CV\nGamma Inc\n2012 – 2014"
+    ]
+    text = normalise_pdf_pages(pages)
+    for dates in ("2019 – 2021", "2015 – 2018", "2012 – 2014"):
+        assert dates in text
+    assert text.count("Jane Doe - CV") == 1
+
+def test_only_matching_bare_numbers_are_page_numbers():
+    pages = ["12\nSkills\n1", "Page 2 of 2\n42\nMore"]
+    text = normalise_pdf_pages(pages)
+    assert "12" in text and "42" in text
+    assert "Page 2 of 2" not in text
+    assert "Skills\n1" not in text
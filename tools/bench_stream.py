@@ -0,0 +1,82 @@
+"""
+Streamed markdown rendering benchmark for articulAIte
+
+Streams a synthetic markdown article in token-sized chunks and compares
+re-rendering the whole text into one element per chunk (as before) with the
+incremental block renderer in utils/streaming_markdown.py. Reports the
+markdown characters sent to the browser and the server CPU time of the
+rendering calls (Streamlit in bare mode, so element protobufs are built but
+not sent). Characters sent grow quadratically with length for the full
+re-render and linearly for the block renderer.
+
+Usage (from the repository root):
+    python -m tools.bench_stream
+    python -m tools.bench_stream --words 500 2000 5000 --chunk 16
+"""
+
+import argparse
+import logging
+import time
+import streamlit as st
+from utils.streaming_markdown import new_renderer, render_chunk, finish_render
+
+SENTENCE = "Remote teams that write things down make decisions faster and onboard new people with less effort."
+
+def synthetic_article(words):
+    """Markdown shaped like a generated article: headings, paragraphs, lists and a code block"""
+    parts = ["# Working Remotely", ""]
+    section = 0
+    while sum(len(part.split()) for part in parts) < words:
+        section += 1
+        parts += [f"## Section {section}", "", " ".join([SENTENCE] * 4), ""]
+        parts += [f"- Point {item}: {SENTENCE}" for item in range(3)] + [""]
+        if section % 3 == 0:
+            parts += ["```python", "def standup(team):", "    return [person.update() for person in team]", "```", ""]
+    return "\n".join(parts)
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def full_rerender(pieces):
+    """Characters sent when the whole text is re-rendered per chunk"""
+    placeholder = st.empty()
+    text = ""
+    sent = 0
+    for piece in pieces:
+        text += piece
+        placeholder.markdown(text)
+        sent += len(text)
+    return sent
+
+def incremental(pieces):
+    """Characters sent by the block renderer"""
+    renderer = new_renderer()
+    for piece in pieces:
+        render_chunk(renderer, piece)
+    finish_render(renderer)
+    return renderer["sent"]
+
+def measure(render, pieces):
+    start = time.process_time()
+    sent = render(pieces)
+    return sent, (time.process_time() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs incremental rendering of streamed markdown")
+    parser.add_argument("--words", type=int, nargs="+", default=[500, 1000, 2000, 5000])
+    parser.add_argument("--chunk", type=int, default=8, help="Characters per streamed chunk (about 2 tokens)")
+    args = parser.parse_args()
+    # Bare mode warns about the missing script context on every element; the first
+    # element loads Streamlit's config (which resets log levels), then they are muted
+    st.empty()
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+    print(f"{'words':>6}{'chunks':>8}{'full chars':>14}{'incr chars':>12}{'full ms':>10}{'incr ms':>10}{'ratio':>8}")
+    for words in args.words:
+        pieces = chunks(synthetic_article(words), args.chunk)
+        full_sent, full_ms = measure(full_rerender, pieces)
+        incr_sent, incr_ms = measure(incremental, pieces)
+        print(f"{words:>6}{len(pieces):>8}{full_sent:>14}{incr_sent:>12}{full_ms:>10.0f}{incr_ms:>10.0f}{full_sent / incr_sent:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
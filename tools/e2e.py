@@ -0,0 +1,198 @@
+"""
+End-to-end run of the four tabs against LLM cassettes
+
+Drives `app.py` through streamlit.testing with a scripted flow in every tab
+(CV interview questions and coach chat, code explanation and error finding,
+article generation and chat, study plan generation and chat) and reports
+wall time per step. Record the flow once against the live API, or the stub
+backend, then replay it offline with no network. A replay must reproduce the
+recorded outputs exactly: their digest is saved next to the cassettes and
+checked on every replay, so the run doubles as a regression test. With
+--profile every thread of the run (script reruns, streams, exports) is
+profiled with cProfile and the slowest app functions are listed.
+
+Usage (from the repository root):
+    python -m tools.e2e --record                    # live Groq calls, writes the cassettes
+    python -m tools.e2e                             # offline replay without delays
+    python -m tools.e2e --speed 1 --profile e2e.prof  # replay with the recorded timing, profiled
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIGEST_FILE = "e2e-digest.json"
+
+SAMPLE_CV = (
+    "Jane Doe\nData Engineer, Acme Corp (2019 - Present)\n"
+    "- Built streaming data pipelines in Python and SQL, cut costs by 30%\n"
+    "- Led a team of 4 engineers delivering a customer analytics platform\n"
+    "Education: B.Sc. Computer Science, 2018\nSkills: Python, SQL, Spark, AWS, Docker"
+)
+SAMPLE_JD = "Senior Data Engineer: Python, SQL, Spark, Airflow and AWS. Kubernetes is a plus."
+SAMPLE_CODE = (
+    "def average(values):\n"
+    "    total = 0\n"
+    "    for value in values:\n"
+    "        total += value\n"
+    "    return total / len(values)\n"
+)
+
+# Session state holding each tab's outputs
+OUTPUT_KEYS = [
+    "cv_interview", "interview_questions", "code_explainer", "article_generator",
+    "generated_article", "study_plan", "generated_study_plan"
+]
+
+def flow(app):
+    """The scripted steps as (tab, step, action) triples"""
+    def upload_cv():
+        app.session_state["resume_text"] = SAMPLE_CV
+        app.text_area(key="cv_job_description").set_value(SAMPLE_JD).run()
+
+    return [
+        ("app", "load", app.run),
+        ("cv", "upload", upload_cv),
+        ("cv", "questions", lambda: app.button(key="cv_gen_questions").click().run()),
+        ("cv", "chat", lambda: app.chat_input(key="cv_chat_input").set_value("How should I introduce myself?").run()),
+        ("code", "paste", lambda: app.text_area(key="code_input").set_value(SAMPLE_CODE).run()),
+        ("code", "explain", lambda: app.button(key="code_explain").click().run()),
+        ("code", "debug", lambda: app.button(key="code_debug").click().run()),
+        ("article", "topic", lambda: app.text_input(key="article_topic").set_value("Remote work tips").run()),
+        ("article", "generate", lambda: app.button(key="article_generate").click().run()),
+        ("article", "chat", lambda: app.chat_input(key="article_chat_input").set_value("Make the intro shorter").run()),
+        ("study", "settings", lambda: app.text_input(key="study_subject").set_value("SQL").run()),
+        ("study", "goal", lambda: app.text_input(key="study_goal").set_value("Pass a data engineering interview").run()),
+        ("study", "generate", lambda: app.button(key="study_generate").click().run()),
+        ("study", "chat", lambda: app.chat_input(key="study_chat_input").set_value("What if I only have weekends?").run()),
+    ]
+
+def output_digest(app):
+    """Hash of every tab's outputs, ignoring timestamps"""
+    outputs = {}
+    for key in OUTPUT_KEYS:
+        if key not in app.session_state:
+            continue
+        value = app.session_state[key]
+        if isinstance(value, list):
+            value = [(message["role"], message["content"]) for message in value]
+        outputs[key] = value
+    return hashlib.sha256(json.dumps(outputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def profile_threads(profilers):
+    """Profile this thread and every thread started from now on
+
+    Each rerun executes the script in a new thread, and LLM streams and
+    exports run on worker threads, so one profiler per thread is needed.
+    """
+    import cProfile
+
+    def start_profiler(frame, event, arg):
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        profilers.append(profiler)
+        profiler.enable()
+
+    threading.setprofile(start_profiler)
+    profiler = cProfile.Profile()
+    profilers.append(profiler)
+    profiler.enable()
+
+def run_flow(timeout):
+    """Run the scripted flow once; returns (step timings, output digest, first error)"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+    timings = []
+    for tab, step, action in flow(app):
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            return timings, None, f"{tab}/{step}: {e}"
+        timings.append((tab, step, (time.perf_counter() - start) * 1000))
+        if app.exception:
+            return timings, None, f"{tab}/{step}: {app.exception[0].value}"
+        errors = [element.value for element in app.error]
+        if errors:
+            return timings, None, f"{tab}/{step}: {errors[0]}"
+    return timings, output_digest(app), None
+
+def print_profile(profilers, path, top):
+    """Save the merged profile and list the app functions with the most cumulative time"""
+    import pstats
+
+    threading.setprofile(None)
+    stats = pstats.Stats(*profilers)
+    stats.dump_stats(path)
+    rows = [
+        (cumulative, calls, f"{os.path.relpath(filename, ROOT)}:{line} {name}")
+        for (filename, line, name), (_, calls, _, cumulative, _) in stats.stats.items()
+        if filename.startswith(ROOT) and "site-packages" not in filename
+    ]
+    print(f"\nSlowest app functions (cumulative, full profile in {path}):")
+    for cumulative, calls, where in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative * 1000:>9.1f}ms {calls:>7} calls  {where}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every tab end to end against recorded LLM cassettes")
+    parser.add_argument("--record", action="store_true", help="Call the LLM backend and record cassettes")
+    parser.add_argument("--backend", default=None, help="LLM backend while recording (default: ARTICULAITE_LLM_BACKEND)")
+    parser.add_argument("--cassettes", default=None, help="Cassette directory (default: LLM_CASSETTE_DIR)")
+    parser.add_argument("--speed", type=float, default=0, help="Replay speed-up; 1 keeps the recorded timing, 0 has no delays")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-rerun timeout in seconds")
+    parser.add_argument("--profile", help="Profile the run with cProfile and save the merged stats here")
+    parser.add_argument("--top", type=int, default=20, help="Functions listed from the profile")
+    args = parser.parse_args()
+
+    # Configuration is read from the environment when the app first imports it
+    os.environ["ARTICULAITE_CASSETTE_MODE"] = "record" if args.record else "replay"
+    os.environ["ARTICULAITE_CASSETTE_SPEED"] = str(args.speed)
+    os.environ["STREAMLIT_GLOBAL_DEVELOPMENT_MODE"] = "false"
+    if args.cassettes:
+        os.environ["ARTICULAITE_CASSETTE_DIR"] = args.cassettes
+    if args.backend:
+        os.environ["ARTICULAITE_LLM_BACKEND"] = args.backend
+    sys.path.insert(0, ROOT)
+    from config import LLM_CASSETTE_DIR
+
+    profilers = []
+    if args.profile:
+        profile_threads(profilers)
+
+    timings, digest, error = run_flow(args.timeout)
+    for tab, step, ms in timings:
+        print(f"{tab:<9}{step:<12}{ms:>10.0f}ms")
+    print(f"{'total':<21}{sum(ms for _, _, ms in timings):>10.0f}ms")
+    if profilers:
+        print_profile(profilers, args.profile, args.top)
+    if error:
+        print(f"\nFailed at {error}")
+        sys.exit(1)
+
+    digest_path = os.path.join(LLM_CASSETTE_DIR, DIGEST_FILE)
+    if args.record:
+        os.makedirs(LLM_CASSETTE_DIR, exist_ok=True)
+        with open(digest_path, "w", encoding="utf-8") as f:
+            json.dump({"digest": digest, "recorded_at": time.time()}, f)
+        print(f"\nRecorded cassettes in {LLM_CASSETTE_DIR} (output digest {digest[:12]})")
+        return
+
+    try:
+        with open(digest_path, encoding="utf-8") as f:
+            expected = json.load(f)["digest"]
+    except (OSError, ValueError, KeyError):
+        print(f"\nNo recorded digest in {LLM_CASSETTE_DIR}; outputs not checked (digest {digest[:12]})")
+        return
+    if digest != expected:
+        print(f"\nReplay outputs differ from the recording ({digest[:12]} != {expected[:12]})")
+        sys.exit(1)
+    print(f"\nReplay outputs match the recording ({digest[:12]})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Cold-start import benchmark for articulAIte
+
+Imports each app module in a fresh interpreter with `python -X importtime`,
+parses the timings and reports the cumulative cost per module together with
+the heaviest packages it pulls in. Fails when a module exceeds the budget or
+eagerly imports a dependency that must only load on first use.
+
+Usage (from the repository root):
+    python -m tools.importtime
+    python -m tools.importtime --budget-ms 1500 --top 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules loaded when a Streamlit worker renders the first page
+APP_MODULES = [
+    "config",
+    "utils.bulk_cv",
+    "utils.cassette",
+    "utils.chat_history",
+    "utils.code_analysis",
+    "utils.code_units",
+    "utils.compare",
+    "utils.diagnostics",
+    "utils.export",
+    "utils.file_handler",
+    "utils.llm",
+    "utils.metrics",
+    "utils.prefetch",
+    "utils.prompts",
+    "utils.resume_profile",
+    "utils.shared_state",
+    "utils.skill_match",
+    "utils.speculative",
+    "utils.streaming_markdown",
+    "utils.stub_llm",
+    "utils.study_planner",
+    "utils.warmup",
+    "tabs.cv_interview",
+    "tabs.code_explainer",
+    "tabs.article_generator",
+    "tabs.study_plan",
+    "app",
+]
+
+# Heavy dependencies that must not be imported before first use
+LAZY_PACKAGES = ["langchain", "langchain_core", "langchain_groq", "PyPDF2", "docx", "markdown", "numpy"]
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into (package, self_us, cumulative_us, depth) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        raw_name = parts[2].rstrip()
+        package = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        rows.append((package, int(parts[0]), int(parts[1]), depth))
+    return rows
+
+def measure_module(module):
+    """Import a module in a fresh interpreter and return its parsed import timings"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    return result.returncode, parse_importtime(result.stderr)
+
+def summarize(module, rows, top):
+    """Summarize cumulative cost, heaviest packages and eager lazy imports of a module"""
+    # Children are reported before their parent, so the module's subtree is the
+    # run of deeper rows immediately preceding its own depth-0 row
+    end = max((i for i, row in enumerate(rows) if row[0] == module and row[3] == 0), default=None)
+    if end is None:
+        return None
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    subtree = rows[start:end]
+
+    heaviest = {}
+    for package, _, cumulative, _ in subtree:
+        root = package.split(".")[0]
+        if root != module.split(".")[0]:
+            heaviest[root] = max(heaviest.get(root, 0), cumulative)
+
+    imported = {package.split(".")[0] for package, _, _, _ in subtree}
+    return {
+        "module": module,
+        "cumulative_ms": rows[end][2] / 1000,
+        "heaviest": sorted(heaviest.items(), key=lambda item: item[1], reverse=True)[:top],
+        "eager_lazy_packages": [package for package in LAZY_PACKAGES if package in imported]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start import cost per module")
+    parser.add_argument("modules", nargs="*", default=APP_MODULES, help="Modules to measure")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if a module exceeds this cumulative cost")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest packages to list per module")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<28}{'cumulative':>12}  heaviest packages")
+    for module in args.modules:
+        returncode, rows = measure_module(module)
+        summary = summarize(module, rows, args.top) if returncode == 0 else None
+        if summary is None:
+            print(f"{module:<28}{'import failed':>12}")
+            failures.append(f"{module}: import failed")
+            continue
+
+        heaviest = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in summary["heaviest"])
+        print(f"{module:<28}{summary['cumulative_ms']:>10.1f}ms  {heaviest}")
+
+        if summary["eager_lazy_packages"]:
+            failures.append(f"{module}: eagerly imports {', '.join(summary['eager_lazy_packages'])}")
+        if args.budget_ms is not None and summary["cumulative_ms"] > args.budget_ms:
+            failures.append(f"{module}: {summary['cumulative_ms']:.1f}ms exceeds budget of {args.budget_ms:.1f}ms")
+
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
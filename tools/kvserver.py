@@ -0,0 +1,157 @@
+"""
+Local Redis-compatible key-value server for articulAIte
+
+Serves the subset of the Redis protocol that utils/shared_state.py uses
+(GET, SET with EX/PX/NX, INCR/INCRBY, HINCRBY, HGETALL, DEL, EXPIRE, DBSIZE,
+FLUSHDB, PING, SELECT, AUTH), backed by the in-process backend, so several
+local app replicas, load tests or offline runs can share caches, counters
+and rate limits without installing Redis. Commands run one at a time, so
+every command is atomic. State is kept in memory only.
+
+Usage (from the repository root):
+    python -m tools.kvserver --port 6390
+    ARTICULAITE_SHARED_STATE_URL=redis://localhost:6390/0 streamlit run app.py --server.port 8501
+    ARTICULAITE_SHARED_STATE_URL=redis://localhost:6390/0 streamlit run app.py --server.port 8502
+"""
+
+import argparse
+import socket
+import threading
+from utils.shared_state import memory_backend, read_reply
+
+def _ok():
+    return b"+OK\r\n"
+
+def _error(message):
+    return f"-ERR {message}\r\n".encode("utf-8")
+
+def _wrong_type():
+    return b"-WRONGTYPE Operation against a key holding the wrong kind of value\r\n"
+
+def _integer(value):
+    return b":%d\r\n" % value
+
+def _bulk(value):
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+def _ttl(options):
+    """Seconds from SET options (EX/PX), and whether NX was given"""
+    options = [option.upper() if isinstance(option, bytes) else option for option in options]
+    ttl = None
+    for name, scale in ((b"EX", 1), (b"PX", 1000)):
+        if name in options:
+            ttl = int(options[options.index(name) + 1]) / scale
+    return ttl, b"NX" in options
+
+def _holds(store, key):
+    """'hash', 'string' or None for the value under a key"""
+    if store["get_fields"](key):
+        return "hash"
+    return None if store["get"](key) is None else "string"
+
+def new_server_state(max_keys):
+    return {"store": memory_backend(max_keys), "lock": threading.Lock(), "max_keys": max_keys}
+
+def run_command(state, args):
+    """Reply bytes for one command"""
+    if not args:
+        return _error("empty command")
+    name = args[0].upper()
+    store = state["store"]
+    try:
+        with state["lock"]:
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name in (b"SELECT", b"AUTH"):
+                return _ok()
+            if name in (b"GET", b"INCR", b"INCRBY") and _holds(store, args[1]) == "hash":
+                return _wrong_type()
+            if name in (b"HINCRBY", b"HGETALL") and _holds(store, args[1]) == "string":
+                return _wrong_type()
+            if name == b"GET":
+                return _bulk(store["get"](args[1]))
+            if name == b"SET":
+                ttl, only_new = _ttl(args[3:])
+                if only_new and (store["get"](args[1]) is not None or store["get_fields"](args[1])):
+                    return _bulk(None)
+                store["set"](args[1], args[2], ttl)
+                return _ok()
+            if name in (b"INCR", b"INCRBY"):
+                amount = int(args[2]) if name == b"INCRBY" else 1
+                try:
+                    int(store["get"](args[1]) or 0)
+                except ValueError:
+                    return _error("value is not an integer or out of range")
+                return _integer(store["incr"](args[1], amount))
+            if name == b"HINCRBY":
+                return _integer(store["incr_field"](args[1], args[2].decode("utf-8"), int(args[3])))
+            if name == b"HGETALL":
+                fields = store["get_fields"](args[1])
+                reply = [b"*%d\r\n" % (len(fields) * 2)]
+                for field, value in fields.items():
+                    reply += [_bulk(field.encode("utf-8")), _bulk(str(value).encode("utf-8"))]
+                return b"".join(reply)
+            if name == b"DEL":
+                existing = [key for key in args[1:] if store["get"](key) is not None or store["get_fields"](key)]
+                for key in args[1:]:
+                    store["delete"](key)
+                return _integer(len(existing))
+            if name == b"EXPIRE":
+                value = store["get"](args[1])
+                if value is None:
+                    return _integer(0)
+                store["set"](args[1], value, int(args[2]))
+                return _integer(1)
+            if name == b"DBSIZE":
+                return _integer(store["size"]())
+            if name == b"FLUSHDB":
+                state["store"] = memory_backend(state["max_keys"])
+                return _ok()
+    except (IndexError, ValueError) as e:
+        return _error(f"bad arguments for '{name.decode('utf-8', 'replace')}': {e}")
+    except Exception as e:
+        # Never let a command kill the client's connection without a reply
+        return _error(f"'{name.decode('utf-8', 'replace')}' failed: {e}")
+    return _error(f"unknown command '{name.decode('utf-8', 'replace')}'")
+
+def _serve_client(state, sock):
+    """Answer one client's commands until it disconnects (runs in a thread per client)"""
+    with sock, sock.makefile("rb") as reader:
+        while True:
+            try:
+                args = read_reply(reader)
+            except (OSError, ValueError):
+                return
+            if not isinstance(args, list):
+                reply = _error("commands must be arrays of bulk strings")
+            else:
+                reply = run_command(state, args)
+            try:
+                sock.sendall(reply)
+            except OSError:
+                return
+
+def serve(host, port, max_keys):
+    """Accept clients until interrupted"""
+    state = new_server_state(max_keys)
+    with socket.create_server((host, port)) as listener:
+        print(f"Serving shared state on redis://{host}:{port}/0 (Ctrl+C to stop)")
+        while True:
+            sock, _ = listener.accept()
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=_serve_client, args=(state, sock), daemon=True).start()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local Redis-compatible key-value store for shared state")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--max-keys", type=int, default=100000, help="Least recently used keys are evicted beyond this")
+    args = parser.parse_args()
+
+    try:
+        serve(args.host, args.port, args.max_keys)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
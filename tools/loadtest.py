@@ -0,0 +1,249 @@
+"""
+Concurrent-session load test for articulAIte
+
+Simulates N concurrent sessions of `app.py` in one Streamlit worker process
+(via streamlit.testing) against the stub LLM backend. Each session scripts
+a realistic flow: open the app, upload a CV, generate interview questions,
+chat five turns, switch to the Article Generator and generate an article.
+Every concurrency level runs in a fresh interpreter and reports throughput,
+rerun latency percentiles, CPU per rerun and RSS growth per session; the
+levels together form a capacity curve for sizing replicas.
+
+The CV upload is simulated by setting the extracted text in session state,
+because the testing API cannot drive `st.file_uploader`. Switching tabs is
+client-side in Streamlit, so the switch step is the first rerun triggered
+from the other tab's widgets.
+
+Usage (from the repository root):
+    python -m tools.loadtest
+    python -m tools.loadtest --sessions 1 5 10 25 50 --slo-ms 1500 --csv capacity.csv
+"""
+
+import argparse
+import csv
+import gc
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from utils.diagnostics import rss_mb
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHAT_TURNS = [
+    "How should I introduce myself?",
+    "Which project should I lead with?",
+    "How do I explain a gap in my resume?",
+    "What salary questions should I expect?",
+    "Give me a closing question for the interviewer.",
+]
+
+# Steps that call the (stubbed) model; the rest are plain UI reruns
+LLM_STEPS = {"questions", "chat", "article"}
+
+def sample_cv(session):
+    return (
+        f"Candidate {session}\nSoftware Engineer, Acme Corp (2019 - Present)\n"
+        "- Built streaming data pipelines in Python and SQL, cut costs by 30%\n"
+        "- Led a team of 4 engineers delivering a customer analytics platform\n"
+        "Education: B.Sc. Computer Science, 2018\nSkills: Python, SQL, Spark, AWS, Docker"
+    )
+
+def session_flow(app, session, identical):
+    """The scripted steps of one session as (name, action) pairs"""
+    tag = 0 if identical else session
+
+    def upload_cv():
+        app.session_state["resume_text"] = sample_cv(tag)
+        app.run()
+
+    steps = [
+        ("load", app.run),
+        ("upload_cv", upload_cv),
+        ("questions", lambda: app.button(key="cv_gen_questions").click().run()),
+    ]
+    for turn in CHAT_TURNS:
+        message = turn if identical else f"{turn} (session {session})"
+        steps.append(("chat", lambda message=message: app.chat_input(key="cv_chat_input").set_value(message).run()))
+    steps += [
+        ("switch_tab", lambda: app.text_input(key="article_topic").set_value(f"Remote work tips {tag}").run()),
+        ("article", lambda: app.button(key="article_generate").click().run()),
+    ]
+    return steps
+
+def run_session(app, session, identical, think_s, start_barrier, results):
+    """Run one session's flow, recording (step, wall ms) per rerun and any failure"""
+    start_barrier.wait()
+    for name, action in session_flow(app, session, identical):
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            results["errors"].append(f"session {session} {name}: {e}")
+            return
+        results["reruns"].append((name, (time.perf_counter() - start) * 1000))
+        if app.exception:
+            results["errors"].append(f"session {session} {name}: {app.exception[0].value}")
+            return
+        time.sleep(think_s)
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 1)
+
+def share_test_runtime():
+    """Let concurrent test sessions share one mock runtime
+
+    The testing API installs a mock runtime and patches the "global.appTest"
+    option for the duration of each run and undoes both afterwards, which
+    breaks runs still executing in other threads. Set the option for the
+    whole process and fall back to one shared mock runtime whenever none is
+    installed.
+    """
+    from unittest.mock import MagicMock
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    config.set_option("global.appTest", True)
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or shared)
+
+def run_level(sessions, identical, think_ms, timeout):
+    """Run one concurrency level in this process and return its measurements"""
+    from streamlit.testing.v1 import AppTest
+
+    share_test_runtime()
+
+    # Warm imports and caches so the level measures steady-state sessions
+    AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout).run()
+    gc.collect()
+    rss_before = rss_mb()
+
+    apps = [AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout) for _ in range(sessions)]
+    results = {"reruns": [], "errors": []}
+    barrier = threading.Barrier(sessions)
+    threads = [
+        threading.Thread(target=run_session, args=(app, index, identical, think_ms / 1000, barrier, results))
+        for index, app in enumerate(apps)
+    ]
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.process_time() - cpu_start
+
+    # Sessions are still alive here, so the growth includes their state
+    gc.collect()
+    rss_after = rss_mb()
+
+    latencies = [ms for _, ms in results["reruns"]]
+    ui_latencies = [ms for name, ms in results["reruns"] if name not in LLM_STEPS]
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": len(results["errors"]),
+        "first_error": results["errors"][0] if results["errors"] else None,
+        "wall_s": round(wall_s, 2),
+        "throughput_rps": round(len(latencies) / wall_s, 2) if wall_s else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "ui_p95_ms": percentile(ui_latencies, 95),
+        "cpu_ms_per_rerun": round(cpu_s * 1000 / len(latencies), 1) if latencies else None,
+        # RSS can't be read on every platform (Windows)
+        "rss_base_mb": round(rss_before, 1) if rss_before is not None else None,
+        "rss_mb_per_session": round((rss_after - rss_before) / sessions, 2) if rss_before is not None else None
+    }
+
+def measure_level(sessions, args):
+    """Run one level in a fresh interpreter with the stub backend"""
+    env = {**os.environ, "ARTICULAITE_LLM_BACKEND": "stub", "STREAMLIT_GLOBAL_DEVELOPMENT_MODE": "false"}
+    command = [
+        sys.executable, "-m", "tools.loadtest", "--level", str(sessions),
+        "--think-ms", str(args.think_ms), "--timeout", str(args.timeout)
+    ]
+    if args.identical:
+        command.append("--identical")
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode != 0 or not lines:
+        return {"sessions": sessions, "failed": (result.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+def print_curve(rows, slo_ms, replica_memory_mb):
+    """Print the capacity curve and the sizing it implies"""
+    print(f"{'sessions':>8}{'reruns':>8}{'rerun/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'UI p95':>9}{'CPU ms':>8}{'MB/sess':>9}{'errors':>8}")
+    for row in rows:
+        if row.get("failed"):
+            print(f"{row['sessions']:>8}  failed: {row['failed']}")
+            continue
+        print(f"{row['sessions']:>8}{row['reruns']:>8}{row['throughput_rps']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+              f"{row['p99_ms']:>9}{row['ui_p95_ms']:>9}{row['cpu_ms_per_rerun']:>8}{str(row['rss_mb_per_session']):>9}"
+              f"{row['errors']:>8}")
+        if row["first_error"]:
+            print(f"{'':>8}  first error: {row['first_error']}")
+
+    measured = [row for row in rows if not row.get("failed") and not row["errors"]]
+    if not measured:
+        return
+    # Model time is stubbed, so the latency bound uses the UI reruns
+    within_slo = [row["sessions"] for row in measured if row["ui_p95_ms"] <= slo_ms]
+    print(f"\nLargest level with UI rerun p95 <= {slo_ms:.0f}ms: {max(within_slo) if within_slo else 'none'} sessions")
+
+    # The largest level amortises one-off growth (lazy imports, caches) best
+    largest = max(measured, key=lambda row: row["sessions"])
+    per_session, base = largest["rss_mb_per_session"], largest["rss_base_mb"]
+    if per_session is not None and per_session > 0:
+        print(f"Memory bound for a {replica_memory_mb:.0f}MB replica: "
+              f"~{int((replica_memory_mb - base) / per_session)} sessions "
+              f"({base:.0f}MB base + {per_session:.2f}MB per session)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test concurrent app sessions against a stub LLM")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20], help="Concurrency levels to run")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pause between a session's steps")
+    parser.add_argument("--identical", action="store_true", help="Send identical CVs and prompts from every session")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-rerun timeout in seconds")
+    parser.add_argument("--slo-ms", type=float, default=2000, help="UI rerun p95 target used for the capacity estimate")
+    parser.add_argument("--replica-memory-mb", type=float, default=1024, help="Memory available to one replica")
+    parser.add_argument("--csv", help="Write the capacity curve to this CSV file")
+    parser.add_argument("--level", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.level:
+        # Worker mode: one level in this interpreter, result printed as JSON
+        print(json.dumps(run_level(args.level, args.identical, args.think_ms, args.timeout)))
+        return
+
+    rows = []
+    for sessions in args.sessions:
+        print(f"Running {sessions} concurrent session(s)...", file=sys.stderr)
+        rows.append(measure_level(sessions, args))
+    print_curve(rows, args.slo_ms, args.replica_memory_mb)
+
+    if args.csv:
+        fields = sorted({field for row in rows for field in row})
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if any(row.get("failed") or row.get("errors") for row in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
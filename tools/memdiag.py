@@ -0,0 +1,103 @@
+"""
+Memory diagnostics report for articulAIte workers
+
+Reads the reports a worker appends to DIAGNOSTICS_PATH (start the app with
+ARTICULAITE_DIAGNOSTICS_INTERVAL=<seconds>) and prints the same views as the
+admin panel: the largest session_state keys per session and the top
+allocation growth by app call site, plus how RSS and each key's total size
+grew across the reports in the window.
+
+Usage (from the repository root):
+    python -m tools.memdiag
+    python -m tools.memdiag --since 60 --top 20 --pid 12345
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from config import DIAGNOSTICS_PATH
+
+def load_reports(path, pid=None, since_minutes=None):
+    """Reports from the JSONL log, oldest first, for one worker process"""
+    if not os.path.exists(path):
+        return []
+    reports = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                reports.append(json.loads(line))
+            except ValueError:
+                continue
+    if since_minutes is not None:
+        cutoff = time.time() - since_minutes * 60
+        reports = [report for report in reports if report["time"] >= cutoff]
+    if not reports:
+        return []
+    # Default to the most recently reporting worker
+    pid = pid or reports[-1]["pid"]
+    return [report for report in reports if report["pid"] == pid]
+
+def key_totals(report):
+    """Total bytes per session_state key across all sessions of a report"""
+    totals = {}
+    for session in report["sessions"]:
+        for key, size in session["keys"].items():
+            totals[key] = totals.get(key, 0) + size
+    return totals
+
+def format_mb(value):
+    """RSS for display; workers that can't read it (Windows) log None"""
+    return "?" if value is None else f"{value:.0f}MB"
+
+def print_sessions(report, top):
+    print(f"Sessions ({len(report['sessions'])} active)")
+    for session in report["sessions"][:top]:
+        keys = ", ".join(f"{key} {size / 1024:.1f}KB" for key, size in list(session["keys"].items())[:5])
+        print(f"  {session['session'][:8]:<10}{session['total_bytes'] / 1024:>10.1f}KB  {keys}")
+
+def print_growth(first, last, top):
+    elapsed_min = (last["time"] - first["time"]) / 60
+    print(f"\nGrowth over {elapsed_min:.1f} min ({len(first['sessions'])} -> {len(last['sessions'])} sessions): "
+          f"RSS {format_mb(first['rss_mb'])} -> {format_mb(last['rss_mb'])}")
+    before, after = key_totals(first), key_totals(last)
+    deltas = sorted(((key, after.get(key, 0) - before.get(key, 0)) for key in set(before) | set(after)),
+                    key=lambda item: abs(item[1]), reverse=True)
+    for key, delta in deltas[:top]:
+        print(f"  {key:<40}{delta / 1024:>+10.1f}KB  (now {after.get(key, 0) / 1024:.1f}KB)")
+
+def print_allocations(report, top):
+    allocations = report.get("allocations")
+    if not allocations:
+        print("\nNo allocation diff (tracemalloc needs two samples)")
+        return
+    print(f"\nTop allocation growth over the last {allocations['interval_s']}s "
+          f"(traced {report['traced_mb']}MB, peak {report['traced_peak_mb']}MB)")
+    for entry in allocations["top"][:top]:
+        via = f"  via {entry['via']}" if entry["via"] else ""
+        print(f"  {entry['size_diff_kb']:>+10.1f}KB {entry['count_diff']:>+8} blocks  {entry['site']}{via}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-session memory and allocation growth of a worker")
+    parser.add_argument("--path", default=DIAGNOSTICS_PATH, help="Diagnostics log written by the worker")
+    parser.add_argument("--pid", type=int, default=None, help="Worker process (defaults to the latest one)")
+    parser.add_argument("--since", type=float, default=None, help="Only use reports from the last N minutes")
+    parser.add_argument("--top", type=int, default=10, help="Rows per section")
+    args = parser.parse_args()
+
+    reports = load_reports(args.path, args.pid, args.since)
+    if not reports:
+        print(f"No diagnostics reports in {args.path}. Start the app with ARTICULAITE_DIAGNOSTICS_INTERVAL=<seconds>.")
+        sys.exit(1)
+
+    latest = reports[-1]
+    print(f"Worker {latest['pid']} at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(latest['time']))}: "
+          f"RSS {format_mb(latest['rss_mb'])}\n")
+    print_sessions(latest, args.top)
+    if len(reports) > 1:
+        print_growth(reports[0], latest, args.top)
+    print_allocations(latest, args.top)
+
+if __name__ == "__main__":
+    main()
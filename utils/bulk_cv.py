@@ -0,0 +1,434 @@
+"""
+Bulk CV screening for articulAIte
+
+Screens many resumes (individual files or zip archives) against one job
+description. Text extraction runs on a process pool, then every CV is
+pre-ranked by local skill match (utils/skill_match.py) and only the best
+BULK_LLM_TOP_N get the LLM analysis (fit score, summary, strengths, gaps,
+interview questions), on a bounded thread pool whose calls are paced to
+RATE_LIMIT_CALLS per RATE_LIMIT_WINDOW by a shared counter (see
+utils/shared_state.py), so the limit holds across batches and, with a shared
+state server, across replicas. A batch runs in a background thread and
+belongs to the session that started it (it is kept in its session_state);
+the results table is a fragment that refreshes itself while the batch runs,
+so the rest of the page stays usable. Every finished CV is appended to a
+JSONL state file keyed by job description, model and temperature, so an
+interrupted batch resumes where it stopped when the same job is screened
+again.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+import streamlit as st
+from utils.file_handler import extract_text_from_bytes
+from utils.llm import invoke_llm
+from utils.metrics import increment
+from utils.shared_state import rate_limit_wait
+from utils.prompts import build_messages, parse_json_reply
+from utils.skill_match import rank_resumes
+from config import (
+    ALLOWED_FILE_TYPES, MAX_FILE_SIZE, MAX_DOCX_COMPRESSION_RATIO, ERROR_MESSAGES, FILE_UPLOAD_TIMEOUT,
+    BULK_MAX_FILES, BULK_MAX_ARCHIVE_SIZE, BULK_EXTRACT_WORKERS, BULK_LLM_WORKERS,
+    BULK_MAX_RESUME_CHARS, BULK_STATE_DIR, BULK_REFRESH_INTERVAL, BULK_LLM_TOP_N, RATE_LIMIT_CALLS, RATE_LIMIT_WINDOW
+)
+
+BULK_SCHEMA_VERSION = 1
+
+STATUS_LABELS = {
+    "done": "✅ Done", "ranked": "📊 Skill match only", "failed": "❌ Failed", "queued": "⏳ Queued",
+    "analysing": "🔎 Analysing", "ranking": "📊 Ranking", "extracting": "📄 Reading", "stopped": "⏹️ Stopped"
+}
+
+_results_lock = threading.Lock()
+
+def file_hash(data):
+    """Content hash identifying a resume file"""
+    return hashlib.sha256(data).hexdigest()
+
+def results_key(job_description, model, temperature):
+    """Identity of a screening job's saved results: reusable for the same JD, model and temperature"""
+    payload = json.dumps([BULK_SCHEMA_VERSION, job_description.strip(), model, temperature])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def _state_path(key):
+    return os.path.join(BULK_STATE_DIR, f"v{BULK_SCHEMA_VERSION}-{key}.jsonl")
+
+def _expand_zip(name, data, files, skipped):
+    """Add the resumes inside a zip archive, checking sizes from the central directory first"""
+    total = 0
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            base = os.path.basename(info.filename)
+            if info.is_dir() or not base or base.startswith(".") or "__MACOSX" in info.filename:
+                continue
+            entry = f"{name}/{info.filename}"
+            if base.rsplit(".", 1)[-1].lower() not in ALLOWED_FILE_TYPES:
+                skipped.append((entry, ERROR_MESSAGES["invalid_file_type"]))
+            elif info.file_size > MAX_FILE_SIZE:
+                skipped.append((entry, ERROR_MESSAGES["file_too_large"]))
+            elif info.compress_size and info.file_size / info.compress_size > MAX_DOCX_COMPRESSION_RATIO:
+                skipped.append((entry, ERROR_MESSAGES["file_corrupt"]))
+            elif total + info.file_size > BULK_MAX_ARCHIVE_SIZE:
+                skipped.append((entry, "Archive exceeds the bulk size limit."))
+            else:
+                total += info.file_size
+                files.append((entry, archive.read(info)))
+
+def expand_uploads(uploads):
+    """Resumes to screen from (name, bytes) uploads, unpacking zip archives
+
+    Returns (files, skipped): unique files as (name, bytes, hash) up to
+    BULK_MAX_FILES, and (name, reason) for everything left out.
+    """
+    candidates, skipped = [], []
+    for name, data in uploads:
+        if name.lower().endswith(".zip"):
+            try:
+                _expand_zip(name, data, candidates, skipped)
+            except (zipfile.BadZipFile, OSError):
+                skipped.append((name, ERROR_MESSAGES["file_corrupt"]))
+        else:
+            candidates.append((name, data))
+
+    files, seen = [], {}
+    for name, data in candidates:
+        digest = file_hash(data)
+        if digest in seen:
+            skipped.append((name, f"Duplicate of {seen[digest]}."))
+        elif len(files) >= BULK_MAX_FILES:
+            skipped.append((name, f"Batch limit of {BULK_MAX_FILES} resumes reached."))
+        else:
+            seen[digest] = name
+            files.append((name, data, digest))
+    return files, skipped
+
+def load_results(key):
+    """Finished rows of a screening job from its state file, by file hash"""
+    rows = {}
+    try:
+        with open(_state_path(key), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                rows[row["hash"]] = row
+    except OSError:
+        pass
+    return rows
+
+def _save_result(batch, row):
+    """Append a finished row to the job's state file (shared by batches of the same job)"""
+    try:
+        os.makedirs(BULK_STATE_DIR, exist_ok=True)
+        with _results_lock, open(_state_path(batch["results_key"]), "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+    except OSError:
+        pass
+
+def _update_row(batch, digest, **fields):
+    with batch["lock"]:
+        batch["rows"][digest].update(fields)
+        return dict(batch["rows"][digest])
+
+def _wait_for_rate_limit(stop):
+    """Block until an LLM call fits in RATE_LIMIT_CALLS per RATE_LIMIT_WINDOW; False if the batch stopped"""
+    while not stop.is_set():
+        wait = rate_limit_wait("bulk_llm", RATE_LIMIT_CALLS, RATE_LIMIT_WINDOW)
+        if not wait:
+            return True
+        time.sleep(min(wait, 1.0))
+    return False
+
+def _as_list(value):
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+def analyse_resume(resume_text, job_description, model, temperature):
+    """Fit score, summary, strengths, gaps and interview questions for one resume"""
+    # The job description goes first so every CV of a batch shares the prompt prefix
+    content = f"JOB DESCRIPTION:\n{job_description}\n\nRESUME:\n{resume_text[:BULK_MAX_RESUME_CHARS]}"
+    response = invoke_llm(model, temperature, build_messages("cv_interview.screen", content))
+    result = parse_json_reply(response.content)
+    if result is None:
+        raise ValueError("Could not parse the screening reply.")
+    try:
+        fit_score = max(0, min(100, int(result.get("fit_score", 0))))
+    except (TypeError, ValueError):
+        fit_score = 0
+    return {
+        "candidate": str(result.get("candidate") or ""),
+        "fit_score": fit_score,
+        "summary": str(result.get("summary") or ""),
+        "strengths": _as_list(result.get("strengths")),
+        "gaps": _as_list(result.get("gaps")),
+        "questions": _as_list(result.get("questions"))
+    }
+
+def _analyse(batch, digest, resume_text):
+    """Screen one extracted resume and record the result (runs on the LLM pool)"""
+    if not _wait_for_rate_limit(batch["stop"]):
+        _update_row(batch, digest, status="stopped")
+        return
+    _update_row(batch, digest, status="analysing")
+    try:
+        result = analyse_resume(resume_text, batch["job_description"], batch["model"], batch["temperature"])
+    except Exception as e:
+        increment("bulk_cv_failed")
+        _save_result(batch, _update_row(batch, digest, status="failed", error=str(e)))
+        return
+    increment("bulk_cv_screened")
+    _save_result(batch, _update_row(batch, digest, status="done", error="", **result))
+
+def _submit_extractions(files):
+    """Submit every file to a process pool, or to threads where worker processes cannot start
+
+    Returns (pool, {future: file hash}).
+    """
+    try:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawned workers do not inherit the server's threads and locks
+        pool = ProcessPoolExecutor(max_workers=BULK_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return pool, {pool.submit(extract_text_from_bytes, name, data): digest for name, data, digest in files}
+    except (ImportError, NotImplementedError, OSError, RuntimeError):
+        pool = ThreadPoolExecutor(max_workers=BULK_EXTRACT_WORKERS, thread_name_prefix="articulaite-bulk-extract")
+        return pool, {pool.submit(extract_text_from_bytes, name, data): digest for name, data, digest in files}
+
+def _extract_all(batch, files):
+    """Extract every file in parallel; returns {file hash: text} for the readable ones"""
+    texts = {}
+    extract_pool, extractions = _submit_extractions(files)
+    # One slow or hostile file must not hold the batch forever
+    deadline = FILE_UPLOAD_TIMEOUT * max(1, -(-len(files) // BULK_EXTRACT_WORKERS)) + FILE_UPLOAD_TIMEOUT
+    try:
+        for future in as_completed(extractions, timeout=deadline):
+            digest = extractions[future]
+            if batch["stop"].is_set():
+                break
+            try:
+                text = future.result()
+            except Exception as e:
+                _save_result(batch, _update_row(batch, digest, status="failed", error=str(e)))
+                continue
+            if not (text or "").strip():
+                _save_result(batch, _update_row(batch, digest, status="failed", error="No text found in the file."))
+                continue
+            _update_row(batch, digest, status="ranking")
+            texts[digest] = text
+    except FutureTimeoutError:
+        for future, digest in extractions.items():
+            if not future.done():
+                _update_row(batch, digest, status="failed", error=ERROR_MESSAGES["extraction_timeout"])
+    extract_pool.shutdown(wait=False, cancel_futures=True)
+    return texts
+
+def _run_batch(batch, files):
+    """Extract resumes in parallel, pre-rank them locally and screen the best matches with the LLM (runs in a background thread)"""
+    llm_pool = ThreadPoolExecutor(max_workers=BULK_LLM_WORKERS, thread_name_prefix="articulaite-bulk-llm")
+    try:
+        texts = _extract_all(batch, files)
+        if batch["stop"].is_set() or not texts:
+            return
+
+        # One matrix product scores every CV; the LLM only sees the best matches, best first
+        digests = list(texts)
+        matches = rank_resumes([texts[digest] for digest in digests], batch["job_description"])
+        for digest, match in zip(digests, matches):
+            _update_row(batch, digest, status="ranked", match=match["score"], missing=match["missing"])
+        digests.sort(key=lambda digest: batch["rows"][digest]["match"], reverse=True)
+
+        with batch["lock"]:
+            budget = max(0, batch["top_n"] - sum(row["status"] == "done" for row in batch["rows"].values()))
+        analyses = []
+        for digest in digests[:budget]:
+            _update_row(batch, digest, status="queued")
+            analyses.append(llm_pool.submit(_analyse, batch, digest, texts[digest]))
+        for future in as_completed(analyses):
+            future.result()
+    finally:
+        llm_pool.shutdown(wait=False, cancel_futures=True)
+        with batch["lock"]:
+            for row in batch["rows"].values():
+                if row["status"] in ("extracting", "ranking", "queued", "analysing"):
+                    row["status"] = "stopped"
+            batch["running"] = False
+            batch["finished"] = time.time()
+
+def start_batch(files, skipped, job_description, model, temperature, top_n=BULK_LLM_TOP_N):
+    """Screen files in the background, skipping those already finished for this job; returns the batch
+
+    Only the top_n best local skill matches are analysed by the LLM, counting
+    CVs already finished for this job; screening again with a larger top_n
+    continues down the ranking. The caller keeps the batch (in its session);
+    batches of other sessions for the same job only share the saved results.
+    """
+    key = results_key(job_description, model, temperature)
+    with _results_lock:
+        finished = load_results(key)
+    rows = {}
+    pending = []
+    for name, data, digest in files:
+        if finished.get(digest, {}).get("status") == "done":
+            rows[digest] = {**finished[digest], "file": name}
+        else:
+            rows[digest] = {"hash": digest, "file": name, "status": "extracting", "error": ""}
+            pending.append((name, data, digest))
+
+    batch = {
+        "results_key": key,
+        "job_description": job_description,
+        "model": model,
+        "temperature": temperature,
+        "top_n": top_n,
+        "rows": rows,
+        "skipped": skipped,
+        "resumed": len(files) - len(pending),
+        "running": True,
+        "started": time.time(),
+        "finished": None,
+        "stop": threading.Event(),
+        "lock": threading.Lock()
+    }
+    threading.Thread(target=_run_batch, args=(batch, pending), name="articulaite-bulk", daemon=True).start()
+    return batch
+
+def stop_batch(batch):
+    """Stop a running batch; finished CVs stay saved for resuming"""
+    batch["stop"].set()
+
+def batch_rows(batch):
+    """Copies of a batch's rows: LLM-screened CVs by fit, then the rest by skill match"""
+    with batch["lock"]:
+        rows = [dict(row) for row in batch["rows"].values()]
+    return sorted(rows, key=lambda row: (row["status"] != "done", -row.get("fit_score", 0), -row.get("match", 0), row["file"]))
+
+def results_csv(rows):
+    """CSV export of finished rows, including the interview questions"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["file", "candidate", "fit_score", "skill_match", "missing_skills", "summary", "strengths", "gaps", "questions", "status", "error"])
+    for row in rows:
+        writer.writerow([
+            row["file"], row.get("candidate", ""), row.get("fit_score", ""), row.get("match", ""),
+            "; ".join(row.get("missing", [])), row.get("summary", ""),
+            "; ".join(row.get("strengths", [])), "; ".join(row.get("gaps", [])),
+            " | ".join(row.get("questions", [])), row["status"], row.get("error", "")
+        ])
+    return buffer.getvalue().encode("utf-8")
+
+def _table(rows):
+    return [
+        {
+            "File": row["file"],
+            "Candidate": row.get("candidate", ""),
+            "Fit": row.get("fit_score"),
+            "Match": row.get("match"),
+            "Status": STATUS_LABELS[row["status"]],
+            "Summary": row.get("summary") or row.get("error", ""),
+            "Strengths": "; ".join(row.get("strengths", [])),
+            "Gaps": "; ".join(row.get("gaps", [])),
+            "Missing skills": ", ".join(row.get("missing", []))
+        }
+        for row in rows
+    ]
+
+def _progress_text(batch, rows):
+    finished = sum(row["status"] in ("done", "ranked", "failed") for row in rows)
+    text = f"{finished}/{len(rows)} screened ({sum(row['status'] == 'done' for row in rows)} by the LLM)"
+    if batch["resumed"]:
+        text += f" ({batch['resumed']} from an earlier run)"
+    if not batch["running"] and batch["finished"]:
+        text += f" · finished in {batch['finished'] - batch['started']:.0f}s"
+    return finished, text
+
+def show_batch(batch, was_running):
+    """One snapshot of the results table, questions and CSV; columns sort on click
+
+    `was_running` is whether the batch was running when the page was drawn:
+    its end reruns the whole page so the Screen and Stop buttons update.
+    """
+    rows = batch_rows(batch)
+    finished, text = _progress_text(batch, rows)
+    st.progress(finished / len(rows) if rows else 1.0, text=text)
+    column_config = {
+        "Fit": st.column_config.ProgressColumn("Fit", min_value=0, max_value=100, format="%d", help="LLM fit score"),
+        "Match": st.column_config.ProgressColumn("Match", min_value=0, max_value=100, format="%d%%", help="Local skill match")
+    }
+    st.dataframe(_table(rows), column_config=column_config, hide_index=True, use_container_width=True)
+    if was_running and not batch["running"]:
+        st.rerun()
+
+    done = [row for row in rows if row["status"] == "done"]
+    if done:
+        labels = {f"{row.get('candidate') or 'Unnamed'} · {row['file']} ({row['fit_score']})": row for row in done}
+        selected = st.selectbox("Interview questions for", list(labels.keys()), key="cv_bulk_selected")
+        for question in labels[selected].get("questions", []):
+            st.markdown(f"- {question}")
+        st.download_button(
+            "⬇️ CSV",
+            data=results_csv(rows),
+            file_name="cv-screening.csv",
+            mime="text/csv",
+            key="cv_bulk_download"
+        )
+
+def bulk_screening_panel(job_description, model, temperature):
+    """Expander for screening many resumes against the job description"""
+    with st.expander("📚 Bulk CV Screening", expanded=False):
+        st.caption(
+            "Screen many resumes against the job description above with the selected model. "
+            "Finished CVs are saved, so an interrupted batch resumes when the same job is screened again."
+        )
+        uploads = st.file_uploader(
+            "Resumes (PDF, DOCX, TXT or ZIP)",
+            type=ALLOWED_FILE_TYPES + ["zip"],
+            accept_multiple_files=True,
+            key="cv_bulk_files"
+        )
+
+        top_n = st.number_input(
+            "CVs to analyse with the LLM",
+            min_value=1,
+            max_value=BULK_MAX_FILES,
+            value=BULK_LLM_TOP_N,
+            key="cv_bulk_top_n",
+            help="Every CV gets an instant local skill match; only the best matches are sent to the LLM"
+        )
+
+        batch = st.session_state.get("cv_bulk_batch")
+        running = bool(batch and batch["running"])
+        start_col, stop_col = st.columns(2)
+        with start_col:
+            if st.button("Screen CVs", key="cv_bulk_start", disabled=running):
+                if not job_description:
+                    st.error("Paste a job description first!")
+                elif not uploads:
+                    st.error("Upload resumes first!")
+                else:
+                    files, skipped = expand_uploads([(upload.name, upload.getvalue()) for upload in uploads])
+                    if not files:
+                        st.error("No resumes to screen in the uploads!")
+                    else:
+                        batch = start_batch(files, skipped, job_description, model, temperature, int(top_n))
+                        st.session_state["cv_bulk_batch"] = batch
+                        running = True
+        with stop_col:
+            if st.button("Stop", key="cv_bulk_stop", disabled=not running):
+                stop_batch(batch)
+
+        if not batch:
+            return
+        for name, reason in batch["skipped"]:
+            st.caption(f"Skipped {name}: {reason}")
+        # Refreshes on its own while the batch runs; the rest of the page is not rerun
+        st.fragment(show_batch, run_every=BULK_REFRESH_INTERVAL if running else None)(batch, running)
@@ -0,0 +1,84 @@
+"""
+Record/replay cassettes for LLM calls
+
+With ARTICULAITE_CASSETTE_MODE=record, every completed upstream call
+(invoke or stream) is saved to LLM_CASSETTE_DIR as one JSON file named by
+its request key (model, temperature and rendered messages), with the
+streamed chunks and their offsets from the start of the request. With
+ARTICULAITE_CASSETTE_MODE=replay, `get_llm` serves those files instead of
+calling Groq: chunks come back with their original timing divided by
+ARTICULAITE_CASSETTE_SPEED (0 replays without delays), and a request with
+no cassette fails loudly rather than reaching the network. Either kind of
+recording replays for either kind of call.
+"""
+
+import json
+import os
+import time
+from config import LLM_CASSETTE_DIR, LLM_CASSETTE_SPEED
+
+CASSETTE_VERSION = 1
+
+def cassette_path(key):
+    return os.path.join(LLM_CASSETTE_DIR, f"{key}.json")
+
+def record(key, model, temperature, messages, chunks, usage, kind):
+    """Save one completed call; chunks are (offset ms, text) pairs"""
+    cassette = {
+        "version": CASSETTE_VERSION,
+        "key": key,
+        "kind": kind,
+        "model": model,
+        "temperature": temperature,
+        "messages": [[message.type, message.content] for message in messages],
+        "chunks": [[round(offset_ms, 1), text] for offset_ms, text in chunks],
+        "usage": dict(usage) if usage else None,
+        "recorded_at": time.time()
+    }
+    try:
+        os.makedirs(LLM_CASSETTE_DIR, exist_ok=True)
+        # Write then rename, so a concurrent replay never reads a partial file
+        temp_path = f"{cassette_path(key)}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, ensure_ascii=False)
+        os.replace(temp_path, cassette_path(key))
+    except OSError:
+        pass
+
+def load(key):
+    """The cassette recorded for a request key, or None"""
+    try:
+        with open(cassette_path(key), encoding="utf-8") as f:
+            cassette = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cassette if cassette.get("version") == CASSETTE_VERSION else None
+
+def _replay(model, temperature, messages):
+    """Yield a recorded call as message chunks, paced by the recorded offsets"""
+    from langchain_core.messages import AIMessageChunk
+    from utils.llm import request_key
+
+    key = request_key(model, temperature, messages)
+    cassette = load(key)
+    if cassette is None:
+        raise LookupError(f"No cassette for {model} request {key[:12]} in {LLM_CASSETTE_DIR} (record it first)")
+
+    start = time.perf_counter()
+    for offset_ms, text in cassette["chunks"]:
+        if LLM_CASSETTE_SPEED > 0:
+            delay = offset_ms / 1000 / LLM_CASSETTE_SPEED - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        yield AIMessageChunk(content=text)
+    if cassette["usage"]:
+        yield AIMessageChunk(content="", usage_metadata=cassette["usage"])
+
+def get_cassette_llm(model, temperature):
+    """Runnable with the chat model's invoke/stream interface, served from cassettes"""
+    from langchain_core.runnables import RunnableLambda
+
+    def replay(messages):
+        yield from _replay(model, temperature, messages)
+
+    return RunnableLambda(replay, name=f"cassette-{model}")
@@ -0,0 +1,252 @@
+"""
+Local static pre-analysis for the Code Explainer's "Find Errors"
+
+For Python pastes this compiles and tokenizes the code, flags undefined names
+and unreachable code, and catches common mistakes, all in milliseconds. Pure
+syntax errors are answered locally without an LLM call; other diagnostics are
+sent to the model with only the relevant line windows instead of the full file.
+
+For iterative debugging rounds, the diff against the last analysed version is
+sent together with the prior findings, so only the changed hunks are reviewed.
+"""
+
+import ast
+import builtins
+import difflib
+import io
+import re
+import symtable
+import tokenize
+import warnings
+
+WINDOW_RADIUS = 3
+DIFF_CONTEXT_LINES = 3
+
+_PYTHON_HINTS = [
+    r"^\s*def \w+\(",
+    r"^\s*(from [\w.]+ )?import \w",
+    r"^\s*(if|elif|else|while|for|with|try|except|finally|class)\b.*:\s*$",
+    r"\bself\.",
+    r"^\s*print\(",
+    r"^\s*(return|pass|raise)\b[^;{]*$",
+]
+_OTHER_LANGUAGE_HINTS = [
+    r";\s*$",
+    r"^\s*[{}]\s*$",
+    r"\b(function|var|let|const|public|private|static|void)\b",
+    r"^\s*#include\b",
+]
+_MODULE_DUNDERS = {"__name__", "__file__", "__doc__", "__builtins__", "__spec__", "__loader__", "__package__"}
+_SHADOWED_BUILTINS = {"list", "dict", "str", "int", "float", "set", "tuple", "type", "id", "input", "len", "sum", "max", "min", "file"}
+
+def is_python(code):
+    """Whether pasted code is (probably) Python, even when it has syntax errors"""
+    try:
+        ast.parse(code)
+        return True
+    except (SyntaxError, ValueError):
+        pass
+    python_score = sum(len(re.findall(p, code, re.MULTILINE)) for p in _PYTHON_HINTS)
+    other_score = sum(len(re.findall(p, code, re.MULTILINE)) for p in _OTHER_LANGUAGE_HINTS)
+    return python_score >= 2 and python_score > other_score
+
+def _diagnostic(line, kind, message):
+    return {"line": line, "kind": kind, "message": message}
+
+def _check_indentation(code):
+    """Flag files that indent some lines with tabs and others with spaces"""
+    tab_line = space_line = None
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.INDENT:
+                if "\t" in token.string and tab_line is None:
+                    tab_line = token.start[0]
+                if " " in token.string and space_line is None:
+                    space_line = token.start[0]
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return []
+    if tab_line and space_line:
+        return [_diagnostic(max(tab_line, space_line), "style", "Mixed tab and space indentation")]
+    return []
+
+def _find_undefined_names(code, tree):
+    """Names that are read but never defined, imported or built in"""
+    if any(isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names) for node in ast.walk(tree)):
+        return []
+
+    module = symtable.symtable(code, "<pasted>", "exec")
+    defined = set(dir(builtins)) | _MODULE_DUNDERS
+    referenced = set()
+
+    def visit(table):
+        for symbol in table.get_symbols():
+            name = symbol.get_name()
+            if table is module or symbol.is_declared_global():
+                if symbol.is_assigned() or symbol.is_imported() or symbol.is_namespace():
+                    defined.add(name)
+            if symbol.is_referenced() and symbol.is_global():
+                referenced.add(name)
+        for child in table.get_children():
+            visit(child)
+
+    visit(module)
+    undefined = referenced - defined
+
+    diagnostics = []
+    reported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id in undefined and node.id not in reported:
+            reported.add(node.id)
+            diagnostics.append(_diagnostic(node.lineno, "error", f"Undefined name `{node.id}`"))
+    return diagnostics
+
+def _find_unreachable_code(tree):
+    """Statements that follow a return, raise, break or continue in the same block"""
+    diagnostics = []
+    for node in ast.walk(tree):
+        for field in ("body", "orelse", "finalbody"):
+            block = getattr(node, field, None)
+            if not isinstance(block, list):
+                continue
+            for index, statement in enumerate(block[:-1]):
+                if isinstance(statement, (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+                    keyword = type(statement).__name__.lower()
+                    diagnostics.append(_diagnostic(block[index + 1].lineno, "warning", f"Unreachable code after `{keyword}`"))
+                    break
+    return diagnostics
+
+def _find_common_mistakes(tree):
+    """Frequent Python pitfalls that are cheap to detect from the AST"""
+    diagnostics = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Compare):
+            for op, comparator in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.Eq, ast.NotEq)) and isinstance(comparator, ast.Constant) and (comparator.value is None or isinstance(comparator.value, bool)):
+                    diagnostics.append(_diagnostic(node.lineno, "warning", f"Comparison to `{comparator.value}` with `==`/`!=`; use `is`/`is not`"))
+
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+                if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                    diagnostics.append(_diagnostic(default.lineno, "warning", f"Mutable default argument in `{node.name}`; it is shared between calls"))
+
+        elif isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and not item.args.args and not item.args.vararg:
+                    decorators = {d.id for d in item.decorator_list if isinstance(d, ast.Name)}
+                    if "staticmethod" not in decorators:
+                        diagnostics.append(_diagnostic(item.lineno, "error", f"Method `{item.name}` has no `self` parameter"))
+
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            diagnostics.append(_diagnostic(node.lineno, "warning", "Bare `except:` also catches KeyboardInterrupt and SystemExit"))
+
+        elif isinstance(node, ast.Assert) and isinstance(node.test, ast.Tuple) and node.test.elts:
+            diagnostics.append(_diagnostic(node.lineno, "error", "`assert` on a tuple is always true"))
+
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Compare):
+            diagnostics.append(_diagnostic(node.lineno, "warning", "Comparison result is unused; did you mean `=`?"))
+
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id in _SHADOWED_BUILTINS:
+                    diagnostics.append(_diagnostic(node.lineno, "warning", f"Assignment shadows the built-in `{target.id}`"))
+    return diagnostics
+
+def pre_analyse(code):
+    """Statically analyse Python code; returns None for non-Python code
+
+    Result: {"syntax_error": {"line", "column", "message"} or None, "diagnostics": [...]}
+    """
+    if not is_python(code):
+        return None
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            compile(code, "<pasted>", "exec", flags=ast.PyCF_ONLY_AST)
+            compile(code, "<pasted>", "exec")
+        except SyntaxError as e:
+            return {
+                "syntax_error": {"line": e.lineno or 1, "column": e.offset or 1, "message": e.msg},
+                "diagnostics": []
+            }
+        except ValueError as e:
+            # Null bytes raise ValueError instead of SyntaxError on older interpreters
+            line = code.count("\n", 0, code.find("\0")) + 1 if "\0" in code else 1
+            return {"syntax_error": {"line": line, "column": 1, "message": str(e)}, "diagnostics": []}
+
+    tree = ast.parse(code)
+    diagnostics = [
+        _diagnostic(getattr(w, "lineno", 1) or 1, "warning", str(w.message))
+        for w in caught if issubclass(w.category, SyntaxWarning)
+    ]
+    diagnostics += _check_indentation(code)
+    diagnostics += _find_undefined_names(code, tree)
+    diagnostics += _find_unreachable_code(tree)
+    diagnostics += _find_common_mistakes(tree)
+
+    unique = {(d["line"], d["message"]): d for d in diagnostics}
+    return {"syntax_error": None, "diagnostics": sorted(unique.values(), key=lambda d: d["line"])}
+
+def line_windows(code, line_numbers, radius=WINDOW_RADIUS):
+    """Numbered source lines around the given line numbers, merged into windows"""
+    lines = code.splitlines()
+    wanted = set()
+    for number in line_numbers:
+        wanted.update(range(max(1, number - radius), min(len(lines), number + radius) + 1))
+
+    output = []
+    previous = None
+    for number in sorted(wanted):
+        if previous is not None and number != previous + 1:
+            output.append("...")
+        output.append(f"{number:>4} | {lines[number - 1]}")
+        previous = number
+    return "\n".join(output)
+
+def format_syntax_error(code, syntax_error):
+    """Markdown answer for a syntax error, produced locally"""
+    line = syntax_error["line"]
+    lines = code.splitlines()
+    window = line_windows(code, [min(line, len(lines))], radius=2)
+    caret = " " * (7 + max(syntax_error["column"] - 1, 0)) + "^"
+    window = window.replace(f"{line:>4} | {lines[line - 1]}", f"{line:>4} | {lines[line - 1]}\n{caret}") if line <= len(lines) else window
+    return (
+        f"**Syntax error on line {line}:** {syntax_error['message']}\n\n"
+        f"```\n{window}\n```\n\n"
+        "Python stops at the first syntax error, so fix this line (and check the line just above it, "
+        "where unclosed brackets and missing colons usually start), then run **Find Errors** again "
+        "for a full review.\n\n_Answered locally by the static pre-analysis._"
+    )
+
+def build_findings_content(code, diagnostics):
+    """Prompt content with static findings and only the relevant line windows"""
+    findings = "\n".join(f"- line {d['line']} ({d['kind']}): {d['message']}" for d in diagnostics)
+    window = line_windows(code, [d["line"] for d in diagnostics])
+    return (
+        f"STATIC ANALYSIS FINDINGS:\n{findings}\n\n"
+        f"RELEVANT CODE (line-numbered excerpts of a {len(code.splitlines())}-line Python file):\n"
+        f"```\n{window}\n```"
+    )
+
+def diff_code(previous_code, code):
+    """Unified diff between two versions and the fraction of lines that changed"""
+    previous_lines = previous_code.splitlines()
+    lines = code.splitlines()
+    diff = list(difflib.unified_diff(
+        previous_lines, lines, "previous", "current", n=DIFF_CONTEXT_LINES, lineterm=""
+    ))
+    changed = sum(1 for line in diff[2:] if line[:1] in "+-")
+    return "\n".join(diff), changed / max(len(previous_lines) + len(lines), 1)
+
+def build_diff_content(diff, previous_report, diagnostics=None):
+    """Prompt content with the prior findings and only the changed hunks"""
+    content = (
+        f"PREVIOUS FINDINGS (for the previous version of the file):\n{previous_report}\n\n"
+        f"CHANGES SINCE THEN (unified diff with {DIFF_CONTEXT_LINES} lines of context):\n"
+        f"```diff\n{diff}\n```"
+    )
+    if diagnostics:
+        findings = "\n".join(f"- line {d['line']} ({d['kind']}): {d['message']}" for d in diagnostics)
+        content += f"\n\nSTATIC ANALYSIS FINDINGS (current version):\n{findings}"
+    return content
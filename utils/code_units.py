@@ -0,0 +1,238 @@
+"""
+Code unit splitting and incremental analysis for the Code Explainer
+
+Pasted code is split into function/class units: with Python's `ast` when the
+code parses, otherwise with a language-agnostic brace/indent splitter. Units
+are analysed concurrently and each unit's result is cached as soon as it
+arrives, by its content hash and the file's structure (the units' kinds and
+names, which its prompt's outline lists), in shared state (see
+utils/shared_state.py). After an edit inside a unit only that unit goes back
+to the model and the report is reassembled from cache, on any replica, with
+line references in reused results moved to where their unit now starts. A
+unit that fails is reported in place; the others are kept.
+"""
+
+import ast
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.llm import complete_text
+from utils.prompts import build_messages
+from utils.shared_state import get_json, put_json
+from config import CODE_CHUNK_MIN_LINES, CODE_UNIT_MIN_LINES, CODE_UNIT_WORKERS, SHARED_CACHE_TTL, STREAM_WAIT_INTERVAL
+
+_STRING_OR_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|//.*$|#.*$')
+_BLOCK_CLOSERS = ("}", ")", "]", "end", "else", "elif", "except", "finally", "catch")
+# "line 12", "lines 12-15", "lines 3, 7 and 9" in an analysis
+_LINE_REFERENCE = re.compile(r"\b(lines?\s+)(\d+)((?:\s*(?:-|–|to|and|,)\s*\d+)*)", re.IGNORECASE)
+
+_pool = ThreadPoolExecutor(max_workers=CODE_UNIT_WORKERS, thread_name_prefix="articulaite-code")
+
+def _unit(lines, start, end, name, kind):
+    """Build a unit from 1-based inclusive line numbers"""
+    source = "\n".join(lines[start - 1:end])
+    return {
+        "name": name,
+        "kind": kind,
+        "start": start,
+        "end": end,
+        "source": source,
+        "hash": hashlib.sha256(source.encode("utf-8")).hexdigest()
+    }
+
+def _split_python(code, lines):
+    """Split Python code into top-level function, class and module-code units
+
+    Units cover every line: comment lines directly above a def or class
+    belong to it, and any other lines up to the next unit to the one before.
+    """
+    tree = ast.parse(code)
+    segments = []  # (start, name, kind)
+
+    for node in tree.body:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            while start > 1 and lines[start - 2].startswith("#"):
+                start -= 1
+            kind = "class" if isinstance(node, ast.ClassDef) else "function"
+            segments.append((start, node.name, kind))
+        elif not segments or segments[-1][2] != "module":
+            segments.append((start, "module code", "module"))
+
+    if not segments:
+        return [_unit(lines, 1, len(lines), "module code", "module")]
+    segments[0] = (1,) + segments[0][1:]
+    ends = [start - 1 for start, _, _ in segments[1:]] + [len(lines)]
+    return [_unit(lines, start, end, name, kind) for (start, name, kind), end in zip(segments, ends)]
+
+def _split_generic(lines):
+    """Split code at top-level block boundaries using brace depth and indentation"""
+    boundaries = [1]
+    depth = 0
+    previous_closed_block = False
+
+    for number, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        top_level = depth == 0 and not line[0].isspace()
+        if top_level and previous_closed_block and not stripped.startswith(_BLOCK_CLOSERS) and number > 1:
+            boundaries.append(number)
+
+        code = _STRING_OR_COMMENT.sub("", stripped)
+        depth = max(0, depth + code.count("{") - code.count("}"))
+        # A block just ended if we are back at depth 0 after a closer or an indented line
+        previous_closed_block = depth == 0 and (stripped.startswith("}") or line[0].isspace())
+
+    units = []
+    for index, start in enumerate(boundaries):
+        end = boundaries[index + 1] - 1 if index + 1 < len(boundaries) else len(lines)
+        header = lines[start - 1].strip()
+        units.append(_unit(lines, start, end, header[:60], "block"))
+    return units
+
+def _is_small(unit):
+    return unit["end"] - unit["start"] + 1 < CODE_UNIT_MIN_LINES
+
+def _join_units(first, second, lines):
+    return _unit(lines, first["start"], second["end"], f"{first['name']}, {second['name']}", "group")
+
+def _merge_small(units, lines):
+    """Merge units shorter than CODE_UNIT_MIN_LINES into the following unit (the last one into the previous)"""
+    merged = []
+    for unit in units:
+        if merged and _is_small(merged[-1]):
+            unit = _join_units(merged.pop(), unit, lines)
+        merged.append(unit)
+    if len(merged) > 1 and _is_small(merged[-1]):
+        last = merged.pop()
+        merged.append(_join_units(merged.pop(), last, lines))
+    return merged
+
+def split_code_units(code):
+    """Split pasted code into analysable units, in source order"""
+    lines = code.splitlines()
+    if len(lines) <= CODE_CHUNK_MIN_LINES:
+        return [_unit(lines, 1, len(lines), "code", "module")]
+
+    try:
+        units = _split_python(code, lines)
+    except (SyntaxError, ValueError):
+        units = _split_generic(lines)
+    return _merge_small([unit for unit in units if unit["source"].strip()], lines)
+
+def _cache_key(action, model, temperature, structure, unit_hash):
+    return f"code_unit:{action}:{model}:{temperature}:{structure}:{unit_hash}"
+
+def _structure_digest(units):
+    """Digest of the file's units (kinds and names, in order), which the outline in each prompt describes"""
+    structure = "\n".join(f"{unit['kind']} {unit['name']}" for unit in units)
+    return hashlib.sha256(structure.encode("utf-8")).hexdigest()[:16]
+
+def _unit_content(unit, outline):
+    """Prompt content for one unit, with the file outline for context"""
+    content = f"CODE:\n```\n{unit['source']}\n```"
+    if outline:
+        content = (
+            f"FILE OUTLINE (other parts of the same file, for context):\n{outline}\n\n"
+            f"Analyse only `{unit['name']}`:\n\n{content}"
+        )
+    return content
+
+def _analyse_unit(action, unit, outline, model, temperature, key, cancel_event):
+    """Analyse one unit with the model and cache the result as soon as it arrives (runs on the pool)
+
+    The result is stored with the unit's lines, so line references can be
+    moved when the same unit is reused at another position. Returns None,
+    caching nothing, if `cancel_event` is set first.
+    """
+    # Another caller (e.g. a prefetch) may have finished this unit while it was queued
+    cached = get_json(key)
+    if isinstance(cached, dict) and "result" in cached:
+        return cached
+    messages = build_messages(f"code_explainer.{action}", _unit_content(unit, outline))
+    result = complete_text(model, temperature, messages, cancel_event=cancel_event)
+    if result is None:
+        return None
+    entry = {"result": result, "start": unit["start"], "end": unit["end"]}
+    put_json(key, entry, SHARED_CACHE_TTL)
+    return entry
+
+def _placed(entry, unit):
+    """A result's text with references to the lines it was written for moved to the unit's current lines"""
+    offset = unit["start"] - entry["start"]
+    if not offset:
+        return entry["result"]
+
+    def move(number):
+        return str(int(number) + offset) if entry["start"] <= int(number) <= entry["end"] else number
+
+    def replace(match):
+        rest = re.sub(r"\d+", lambda digits: move(digits.group()), match.group(3))
+        return match.group(1) + move(match.group(2)) + rest
+    return _LINE_REFERENCE.sub(replace, entry["result"])
+
+def analyse_code(action, code, model, temperature, on_wait=None):
+    """Run an action (explain/debug/optimize) unit by unit; returns (report, stats)
+
+    Units that fail are reported in place and counted in stats["failed"];
+    raises only if no unit could be analysed. `on_wait(seconds since start)`
+    is called every STREAM_WAIT_INTERVAL until all units are done; if the
+    caller is interrupted there (Stop), the unit streams are closed and units
+    not yet started are dropped, while finished units stay cached.
+    """
+    units = split_code_units(code)
+    outline = ""
+    if len(units) > 1:
+        outline = "\n".join(f"- {unit['kind']} `{unit['name']}` (lines {unit['start']}–{unit['end']})" for unit in units)
+    structure = _structure_digest(units)
+
+    results = {}
+    futures = {}
+    cached_units = 0
+    cancel_event = threading.Event()
+    for unit in units:
+        # Keyed by content and structure, so edits inside other units keep this result
+        key = _cache_key(action, model, temperature, structure, unit["hash"])
+        cached = get_json(key)
+        if isinstance(cached, dict) and "result" in cached:
+            results[unit["hash"]] = cached
+            cached_units += 1
+        elif unit["hash"] not in futures:
+            futures[unit["hash"]] = _pool.submit(_analyse_unit, action, unit, outline, model, temperature, key, cancel_event)
+
+    start = time.perf_counter()
+    pending = set(futures.values())
+    try:
+        while pending:
+            finished, pending = wait(pending, timeout=STREAM_WAIT_INTERVAL if on_wait else None, return_when=FIRST_COMPLETED)
+            if not finished:
+                on_wait(time.perf_counter() - start)
+    except BaseException:
+        cancel_event.set()
+        for future in futures.values():
+            future.cancel()
+        raise
+
+    failed = {}
+    for unit_hash, future in futures.items():
+        try:
+            results[unit_hash] = future.result()
+        except Exception as e:
+            failed[unit_hash] = e
+    if not results:
+        raise next(iter(failed.values()))
+
+    if len(units) == 1:
+        report = _placed(results[units[0]["hash"]], units[0])
+    else:
+        report = "\n\n".join(
+            f"#### `{unit['name']}` (lines {unit['start']}–{unit['end']})\n\n"
+            + (_placed(results[unit["hash"]], unit) if unit["hash"] in results else f"_Analysis failed: {failed[unit['hash']]}_")
+            for unit in units
+        )
+    stats = {"units": len(units), "analysed": len(futures) - len(failed), "cached": cached_units, "failed": len(failed)}
+    return report, stats
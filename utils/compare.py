@@ -0,0 +1,136 @@
+"""
+Multi-model comparison mode for articulAIte
+
+Sends the same prompt to several models of a tab's catalog concurrently and
+streams the answers side by side with TTFT, total latency, tokens/sec and
+token counts per column. Every run is recorded in utils/metrics.py so the
+scoreboard (and the JSONL run log) can inform model-choice decisions.
+Stopping a comparison closes every model's stream; stopped runs are not
+recorded.
+"""
+
+import queue
+import threading
+import time
+import streamlit as st
+from utils.llm import stream_text
+from utils.streaming_markdown import new_renderer, render_chunk, finish_render, stop_button
+from utils.metrics import record_model_run, model_summary, coalescing_summary
+from utils.prompts import build_chat_messages
+from config import COMPARE_MAX_MODELS
+
+def _run_model(tab_key, model, temperature, messages, cancel_event, events):
+    """Stream one model's answer into the event queue until done or cancelled (runs in a worker thread)"""
+    stats = {}
+    try:
+        for text in stream_text(model, temperature, messages, stats, cancel_event):
+            events.put((model, "chunk", text))
+    except Exception as e:
+        stats["error"] = str(e)
+    if stats.get("cancelled"):
+        return
+    record_model_run(tab_key, model, stats)
+    events.put((model, "done", stats))
+
+def _format_stats(stats):
+    """One-line summary of a model run"""
+    if stats.get("error"):
+        return f"❌ {stats['error']}"
+    tokens = stats.get("output_tokens")
+    tokens = f"~{tokens}" if stats.get("tokens_estimated") else tokens
+    parts = [
+        f"TTFT {stats.get('ttft_ms', '-')} ms",
+        f"total {stats.get('total_ms', '-')} ms",
+        f"{stats.get('tokens_per_sec') or '-'} tok/s",
+        f"{tokens} out tokens",
+    ]
+    if stats.get("input_tokens") is not None:
+        parts.append(f"{stats['input_tokens']} in tokens")
+    return " · ".join(parts)
+
+def run_comparison(tab_key, models, temperature, messages):
+    """Run models concurrently, streaming each answer into its own column"""
+    stop = st.empty()
+    with stop:
+        stop_button(f"{tab_key}_compare_stop")
+    status = st.empty()
+    columns = st.columns(len(models))
+    outputs = {}
+    renderers = {}
+    stats_placeholders = {}
+    for column, (name, model) in zip(columns, models.items()):
+        with column:
+            st.markdown(f"**{name}**")
+            stats_placeholders[model] = st.empty()
+            renderers[model] = new_renderer()
+
+    events = queue.Queue()
+    cancel_event = threading.Event()
+    for model in models.values():
+        threading.Thread(
+            target=_run_model,
+            args=(tab_key, model, temperature, messages, cancel_event, events),
+            daemon=True
+        ).start()
+
+    pending = len(models)
+    results = {}
+    start = time.perf_counter()
+    try:
+        while pending:
+            try:
+                model, kind, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                # Periodic UI update: lets Streamlit interrupt this run when Stop is clicked
+                status.caption(f"Waiting for {pending} model(s)... {time.perf_counter() - start:.0f}s")
+                continue
+            if kind == "chunk":
+                render_chunk(renderers[model], payload)
+            else:
+                pending -= 1
+                outputs[model] = finish_render(renderers[model])
+                results[model] = payload
+                stats_placeholders[model].caption(_format_stats(payload))
+    except BaseException:
+        # Stopped or interrupted: the workers stop reading, which closes their upstream streams
+        cancel_event.set()
+        raise
+    stop.empty()
+    status.empty()
+    return outputs, results
+
+def compare_panel(tab_key, models, temperature, context):
+    """Expander that compares a subset of the tab's models on the same prompt"""
+    with st.expander("🔀 Compare Models", expanded=False):
+        names = list(models.keys())
+        selected = st.multiselect(
+            f"Models to compare (up to {COMPARE_MAX_MODELS})",
+            names,
+            default=names[:min(3, COMPARE_MAX_MODELS)],
+            max_selections=COMPARE_MAX_MODELS,
+            key=f"{tab_key}_compare_models"
+        )
+        prompt = st.text_area(
+            "Prompt",
+            height=100,
+            key=f"{tab_key}_compare_prompt",
+            placeholder="Ask the same question to every selected model..."
+        )
+
+        if st.button("Compare", key=f"{tab_key}_compare_run"):
+            if len(selected) < 2:
+                st.error("Select at least two models!")
+            elif not prompt:
+                st.error("Enter a prompt!")
+            else:
+                messages = build_chat_messages(tab_key, context, [{"role": "user", "content": prompt}])
+                run_comparison(tab_key, {name: models[name] for name in selected}, temperature, messages)
+
+        summary = model_summary()
+        if summary:
+            st.markdown("**Model scoreboard** (averages across all comparisons on this server)")
+            st.dataframe(summary, hide_index=True, use_container_width=True)
+
+        calls = coalescing_summary()
+        if calls["upstream"]:
+            st.caption(f"LLM calls on this server: {calls['upstream']} upstream, {calls['coalesced']} served by coalescing identical in-flight requests")
@@ -0,0 +1,264 @@
+"""
+Memory diagnostics for long-lived workers
+
+Reports the deep size of every `st.session_state` key of every active
+session and diffs tracemalloc snapshots between intervals, attributing
+allocation growth to the app's own call sites (tab code and utils/), so
+leaks can be pinned down in production. Shown in an admin-only panel
+(`?admin=<ARTICULAITE_ADMIN_TOKEN>`) and, when a sampling interval is set,
+appended periodically to a JSONL log read by `python -m tools.memdiag`.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+import streamlit as st
+from utils.shared_state import status as shared_state_status
+from utils.prefetch import prefetch_summary
+from config import (
+    DIAGNOSTICS_ADMIN_TOKEN, DIAGNOSTICS_PATH, DIAGNOSTICS_TOP,
+    DIAGNOSTICS_TRACE_FRAMES, DIAGNOSTICS_MAX_SNAPSHOTS, PREFETCH_ENABLED
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Shared code and objects, not per-session data
+_SKIP_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+_snapshots = deque(maxlen=DIAGNOSTICS_MAX_SNAPSHOTS)
+_snapshots_lock = threading.Lock()
+
+def rss_mb():
+    """Current resident set size of this process in MB, or None where it can't be read (Windows)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # `resource` is Unix-only
+        import resource
+    except ImportError:
+        return None
+    # Peak RSS where /proc is unavailable (kilobytes on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def deep_sizeof(obj, seen=None):
+    """Bytes reachable from obj, counting every object once per `seen` set"""
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIP_TYPES):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item, 0)
+
+        if isinstance(item, _ATOMIC_TYPES):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        else:
+            if hasattr(item, "__dict__"):
+                stack.append(vars(item))
+            for slot in getattr(type(item), "__slots__", ()):
+                if isinstance(slot, str) and hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return size
+
+def _session_states():
+    """(session id, user-visible state dict) for every active session of this server"""
+    try:
+        from streamlit.runtime import Runtime
+
+        sessions = Runtime.instance()._session_mgr.list_active_sessions()
+        return [(info.session.id, dict(info.session.session_state.filtered_state)) for info in sessions]
+    except Exception:
+        # Not running under a Streamlit server (or internals changed): current session only
+        try:
+            return [("current", {key: st.session_state[key] for key in st.session_state.keys()})]
+        except Exception:
+            return []
+
+def session_report():
+    """Deep size of every session_state key per session, largest sessions first"""
+    report = []
+    for session_id, state in _session_states():
+        # Shared structures are counted once per session, under the first key reaching them
+        seen = set()
+        keys = {str(key): deep_sizeof(value, seen) for key, value in state.items()}
+        report.append({
+            "session": session_id,
+            "total_bytes": sum(keys.values()),
+            "keys": dict(sorted(keys.items(), key=lambda item: item[1], reverse=True))
+        })
+    return sorted(report, key=lambda session: session["total_bytes"], reverse=True)
+
+def start_tracing():
+    """Start tracemalloc with enough frames to reach app code from library allocations"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(DIAGNOSTICS_TRACE_FRAMES)
+
+def stop_tracing():
+    tracemalloc.stop()
+    with _snapshots_lock:
+        _snapshots.clear()
+
+def take_snapshot():
+    """Record a tracemalloc snapshot; returns False when tracing is off"""
+    if not tracemalloc.is_tracing():
+        return False
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        tracemalloc.Filter(False, "<unknown>")
+    ])
+    with _snapshots_lock:
+        _snapshots.append((time.time(), snapshot))
+    return True
+
+def _is_app_frame(frame):
+    """Frames in the app's own code, excluding this module's bookkeeping"""
+    return (
+        frame.filename.startswith(ROOT)
+        and frame.filename != __file__
+        and "site-packages" not in frame.filename
+    )
+
+def _site(frame):
+    return f"{os.path.relpath(frame.filename, ROOT) if frame.filename.startswith(ROOT) else frame.filename}:{frame.lineno}"
+
+def snapshot_diff(app_only=True, limit=DIAGNOSTICS_TOP):
+    """Top allocation growth between the last two snapshots
+
+    With app_only, each allocation is attributed to the most recent frame in
+    the app's own code (tabs/, utils/, app.py), with the library frame that
+    allocated it shown as `via`.
+    """
+    with _snapshots_lock:
+        if len(_snapshots) < 2:
+            return None
+        (older_time, older), (newer_time, newer) = _snapshots[-2], _snapshots[-1]
+
+    sites = {}
+    for stat in newer.compare_to(older, "traceback"):
+        if not stat.size_diff and not stat.count_diff:
+            continue
+        frames = list(stat.traceback)  # oldest frame first
+        allocator = frames[-1]
+        owner = next((frame for frame in reversed(frames) if _is_app_frame(frame)), None)
+        if app_only and owner is None:
+            continue
+        site = _site(owner or allocator)
+        entry = sites.setdefault(site, {"site": site, "via": "", "size_diff_kb": 0.0, "size_kb": 0.0, "count_diff": 0, "largest": 0})
+        entry["size_diff_kb"] += stat.size_diff / 1024
+        entry["size_kb"] += stat.size / 1024
+        entry["count_diff"] += stat.count_diff
+        # Keep the library frame behind the largest share of this site's growth
+        if owner and owner is not allocator and abs(stat.size_diff) > entry["largest"]:
+            entry["largest"] = abs(stat.size_diff)
+            entry["via"] = _site(allocator)
+
+    top = sorted(sites.values(), key=lambda entry: abs(entry["size_diff_kb"]), reverse=True)[:limit]
+    for entry in top:
+        del entry["largest"]
+        entry["size_diff_kb"] = round(entry["size_diff_kb"], 1)
+        entry["size_kb"] = round(entry["size_kb"], 1)
+    return {"interval_s": round(newer_time - older_time, 1), "top": top}
+
+def collect_report(app_only=True):
+    """One diagnostics sample: RSS, per-session sizes and, when tracing, the latest snapshot diff"""
+    rss = rss_mb()
+    report = {
+        "time": time.time(), "pid": os.getpid(), "rss_mb": None if rss is None else round(rss, 1),
+        "sessions": session_report()
+    }
+    if take_snapshot():
+        current, peak = tracemalloc.get_traced_memory()
+        report["traced_mb"] = round(current / 2**20, 1)
+        report["traced_peak_mb"] = round(peak / 2**20, 1)
+        report["allocations"] = snapshot_diff(app_only)
+    return report
+
+def run_sampler(interval):
+    """Append a diagnostics report to DIAGNOSTICS_PATH every `interval` seconds (runs in a daemon thread)"""
+    start_tracing()
+    take_snapshot()
+    while True:
+        time.sleep(interval)
+        report = collect_report()
+        try:
+            os.makedirs(os.path.dirname(DIAGNOSTICS_PATH) or ".", exist_ok=True)
+            with open(DIAGNOSTICS_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+        except OSError:
+            pass
+
+def is_admin():
+    """Admin views are enabled by ?admin=<ARTICULAITE_ADMIN_TOKEN>"""
+    return bool(DIAGNOSTICS_ADMIN_TOKEN) and st.query_params.get("admin") == DIAGNOSTICS_ADMIN_TOKEN
+
+def diagnostics_panel():
+    """Admin-only memory diagnostics: per-session state sizes and tracemalloc diffs"""
+    with st.expander("🩺 Memory diagnostics (admin)", expanded=False):
+        sessions = session_report()
+        rss = rss_mb()
+        st.caption(f"RSS {'?' if rss is None else f'{rss:.0f}MB'} · {len(sessions)} active session(s)")
+        shared = shared_state_status()
+        st.caption(
+            f"Shared state: {shared['backend']} · {shared['keys'] if shared['keys'] is not None else '?'} keys · "
+            f"{shared['errors']} failed call(s)" + (f" (last: {shared['last_error']})" if shared["last_error"] else "")
+        )
+        if PREFETCH_ENABLED:
+            prefetched = prefetch_summary()
+            hit_rate = f"{prefetched['hit_rate']:.0%}" if prefetched["hit_rate"] is not None else "-"
+            st.caption(
+                f"Prefetch: {prefetched['used']} of {prefetched['started']} used ({hit_rate} hit rate) · "
+                f"{prefetched['failed']} failed · {prefetched['wasted_tokens']} of {prefetched['tokens']} output tokens unused"
+            )
+
+        rows = [
+            {"session": session["session"][:8], "key": key, "KB": round(size / 1024, 1)}
+            for session in sessions for key, size in session["keys"].items()
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+
+        st.markdown("**Allocation growth (tracemalloc)**")
+        tracing = tracemalloc.is_tracing()
+        start_col, snap_col, stop_col = st.columns(3)
+        with start_col:
+            if st.button("Start tracing", key="diag_start", disabled=tracing):
+                start_tracing()
+                take_snapshot()
+                st.rerun()
+        with snap_col:
+            if st.button("Take snapshot", key="diag_snapshot", disabled=not tracing):
+                take_snapshot()
+        with stop_col:
+            if st.button("Stop tracing", key="diag_stop", disabled=not tracing):
+                stop_tracing()
+                st.rerun()
+
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            st.caption(f"Traced {current / 2**20:.1f}MB (peak {peak / 2**20:.1f}MB) · {len(_snapshots)} snapshot(s)")
+            app_only = st.checkbox("App call sites only", value=True, key="diag_app_only")
+            diff = snapshot_diff(app_only)
+            if diff is None:
+                st.caption("Take another snapshot to see the growth since the previous one.")
+            else:
+                st.caption(f"Growth over the last {diff['interval_s']}s")
+                st.dataframe(diff["top"], hide_index=True, use_container_width=True)
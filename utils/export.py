@@ -0,0 +1,261 @@
+"""
+Rendering and export of generated artifacts (articles, study plans)
+
+Markdown is converted to HTML once per content hash and reused on every
+rerun. HTML and DOCX downloads are built on a small background pool as soon
+as an artifact is generated and cached by content hash, in this process and
+in shared state (see utils/shared_state.py), so repeat downloads are served
+without rebuilding, on any replica. Raw HTML in model output is escaped, never
+passed through.
+"""
+
+import hashlib
+import html
+import io
+import re
+import threading
+import streamlit as st
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.shared_state import get, put
+from config import EXPORT_CACHE_SIZE, EXPORT_WORKERS, EXPORT_TIMEOUT, SHARED_CACHE_TTL
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+EXPORT_FORMATS = {
+    "html": ("text/html", "html"),
+    "docx": (DOCX_MIME, "docx")
+}
+
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ max-width: 760px; margin: 2rem auto; padding: 0 1rem; font-family: Georgia, serif; line-height: 1.6; color: #222; }}
+pre, code {{ font-family: Consolas, monospace; background: #f4f4f4; }}
+pre {{ padding: 0.75rem; overflow-x: auto; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ccc; padding: 0.3rem 0.6rem; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+_renders = OrderedDict()
+_exports = OrderedDict()
+_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="articulaite-export")
+
+_LIST_ITEM = re.compile(r"(\s*)([-*+]|\d+[.)])\s+")
+_INLINE = re.compile(r"(\*\*[^*]+\*\*|__[^_]+__|\*[^*]+\*|_[^_\s][^_]*_|`[^`]+`|\[[^\]]+\]\([^)]+\))")
+
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _remember(cache, key, value):
+    """Store a value in a bounded LRU cache; caller holds the lock"""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > EXPORT_CACHE_SIZE:
+        cache.popitem(last=False)
+
+def _normalise_lists(markdown_text):
+    """Re-indent nested lists to four spaces per level and separate lists from a preceding paragraph
+
+    Model output follows CommonMark (two-space nesting, lists right after a
+    paragraph line), which Python-Markdown would otherwise flatten into text.
+    """
+    lines = []
+    parents = []  # indentation of the enclosing list items
+    in_code = False
+    for line in markdown_text.splitlines():
+        if line.strip().startswith("```"):
+            in_code = not in_code
+        item = None if in_code else _LIST_ITEM.match(line)
+        if not item:
+            if line.strip() and not line.startswith(" "):
+                parents = []
+            lines.append(line)
+            continue
+
+        indent = len(item.group(1).expandtabs(4))
+        while parents and indent <= parents[-1]:
+            parents.pop()
+        if not parents and lines and lines[-1].strip() and not _LIST_ITEM.match(lines[-1]):
+            lines.append("")
+        lines.append("    " * len(parents) + line.lstrip())
+        parents.append(indent)
+    return "\n".join(lines)
+
+def _to_html(markdown_text):
+    """Convert markdown to an HTML fragment with raw HTML escaped"""
+    import markdown
+
+    converter = markdown.Markdown(extensions=["extra", "sane_lists"])
+    converter.preprocessors.deregister("html_block")
+    converter.inlinePatterns.deregister("html")
+    return converter.convert(_normalise_lists(markdown_text))
+
+def render_html(markdown_text):
+    """HTML fragment for display, converted once per content hash"""
+    key = content_hash(markdown_text)
+    with _lock:
+        if key in _renders:
+            _renders.move_to_end(key)
+            return _renders[key]
+    rendered = _to_html(markdown_text)
+    with _lock:
+        _remember(_renders, key, rendered)
+    return rendered
+
+def build_html(title, markdown_text):
+    """Standalone HTML document"""
+    page = HTML_PAGE.format(title=html.escape(title), body=render_html(markdown_text))
+    return page.encode("utf-8")
+
+def _add_runs(paragraph, text):
+    """Add text to a paragraph, mapping **bold**, *italic*, `code` and links to runs"""
+    for piece in _INLINE.split(text):
+        if not piece:
+            continue
+        if piece.startswith(("**", "__")) and len(piece) > 4:
+            paragraph.add_run(piece[2:-2]).bold = True
+        elif piece.startswith("`"):
+            paragraph.add_run(piece[1:-1]).font.name = "Consolas"
+        elif piece.startswith("[") and "](" in piece:
+            label, url = piece[1:-1].split("](", 1)
+            paragraph.add_run(f"{label} ({url})")
+        elif piece.startswith(("*", "_")) and len(piece) > 2 and _INLINE.fullmatch(piece):
+            paragraph.add_run(piece[1:-1]).italic = True
+        else:
+            paragraph.add_run(piece)
+
+def _table_cells(line):
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+def build_docx(title, markdown_text):
+    """Word document built from the markdown: headings, lists, tables, code and quotes"""
+    from docx import Document
+    from docx.shared import Pt
+
+    document = Document()
+    document.core_properties.title = title
+    lines = markdown_text.splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        stripped = line.strip()
+        index += 1
+
+        if not stripped or re.fullmatch(r"(-{3,}|\*{3,}|_{3,})", stripped):
+            continue
+
+        if stripped.startswith("```"):
+            code = []
+            while index < len(lines) and not lines[index].strip().startswith("```"):
+                code.append(lines[index])
+                index += 1
+            index += 1
+            run = document.add_paragraph().add_run("\n".join(code))
+            run.font.name = "Consolas"
+            run.font.size = Pt(9)
+            continue
+
+        heading = re.match(r"(#{1,6})\s+(.*)", stripped)
+        if heading:
+            document.add_heading(heading.group(2).strip("# "), level=min(len(heading.group(1)), 4))
+            continue
+
+        if stripped.startswith("|"):
+            rows = [_table_cells(stripped)]
+            while index < len(lines) and lines[index].strip().startswith("|"):
+                rows.append(_table_cells(lines[index]))
+                index += 1
+            rows = [row for row in rows if not all(re.fullmatch(r":?-+:?", cell) for cell in row if cell)]
+            width = max(len(row) for row in rows)
+            table = document.add_table(rows=len(rows), cols=width)
+            table.style = "Table Grid"
+            for row, cells in zip(table.rows, rows):
+                for cell, text in zip(row.cells, cells):
+                    _add_runs(cell.paragraphs[0], text)
+            continue
+
+        item = _LIST_ITEM.match(line)
+        if item:
+            numbered = item.group(2)[0].isdigit()
+            level = min(len(item.group(1).expandtabs(4)) // 2, 2)
+            style = ("List Number" if numbered else "List Bullet") + (f" {level + 1}" if level else "")
+            _add_runs(document.add_paragraph(style=style), line[item.end():])
+            continue
+
+        if stripped.startswith(">"):
+            _add_runs(document.add_paragraph(style="Quote"), stripped.lstrip("> "))
+            continue
+
+        # Consecutive plain lines form one paragraph, as in markdown
+        text = [stripped]
+        while index < len(lines) and lines[index].strip() and not re.match(r"\s*(#|```|\||>|[-*+]\s|\d+[.)]\s)", lines[index]):
+            text.append(lines[index].strip())
+            index += 1
+        _add_runs(document.add_paragraph(), " ".join(text))
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+_BUILDERS = {"html": build_html, "docx": build_docx}
+
+def _build_shared(kind, digest, title, markdown_text):
+    """Build one export, unless another replica already has (runs on the export pool)"""
+    key = f"export:{kind}:{digest}"
+    data = get(key)
+    if data is None:
+        data = _BUILDERS[kind](title, markdown_text)
+        put(key, data, SHARED_CACHE_TTL)
+    return data
+
+def prepare_exports(title, markdown_text):
+    """Start building every export format in the background; returns {kind: future}"""
+    futures = {}
+    with _lock:
+        digest = content_hash(title, markdown_text)
+        for kind in _BUILDERS:
+            key = (kind, digest)
+            if key not in _exports:
+                _remember(_exports, key, _pool.submit(_build_shared, kind, digest, title, markdown_text))
+            else:
+                _exports.move_to_end(key)
+            futures[kind] = _exports[key]
+    return futures
+
+def get_export(kind, title, markdown_text):
+    """Bytes of one export format, built in the background and cached by content hash"""
+    return prepare_exports(title, markdown_text)[kind].result(timeout=EXPORT_TIMEOUT)
+
+def export_filename(title, kind):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", title).strip("-").lower() or "export"
+    return f"{slug[:60]}.{EXPORT_FORMATS[kind][1]}"
+
+def export_buttons(title, markdown_text, key_prefix):
+    """Download buttons for every export format of an artifact"""
+    for kind, (mime, _) in EXPORT_FORMATS.items():
+        try:
+            data = get_export(kind, title, markdown_text)
+        except Exception as e:
+            st.caption(f"{kind.upper()} export failed: {e}")
+            continue
+        st.download_button(
+            f"⬇️ {kind.upper()}",
+            data=data,
+            file_name=export_filename(title, kind),
+            mime=mime,
+            key=f"{key_prefix}_download_{kind}"
+        )
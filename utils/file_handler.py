@@ -1,11 +1,98 @@
 """
 File handling utilities for articulAIte
+
+Uploads go through a cheap validation pipeline before any full parse: the
+content type is sniffed from magic bytes on a zero-copy `memoryview` of the
+upload buffer, then DOCX structural limits are checked (part sizes and
+compression ratios) from the zip directory, so bogus or oversized files are
+rejected in milliseconds. PDF limits (encryption, page count) are checked
+on the reader that then extracts the text, so a PDF is parsed once.
+
+Extraction runs in a child process forked from a fork server, so a file that
+hangs the parser is killed after `FILE_UPLOAD_TIMEOUT` instead of holding a
+worker forever. The upload is written to the child over a pipe straight from
+its buffer, without a getvalue() copy or pickling. At most
+FILE_EXTRACT_WORKERS uploads are read at once; further ones are turned away
+until a slot frees up.
+
+The PDF parser is imported only when a PDF is uploaded. DOCX files are read
+directly from the zip by streaming their XML, without python-docx. PDF text
+is normalised after extraction: running headers, footers and page numbers
+are dropped, hyphenated line breaks rejoined and whitespace collapsed, with
+page boundaries kept as markers.
 """
 
+import io
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import streamlit as st
-import PyPDF2
-from docx import Document
-from config import ALLOWED_FILE_TYPES, MAX_FILE_SIZE, ERROR_MESSAGES
+from config import (
+    ALLOWED_FILE_TYPES, MAX_FILE_SIZE, ERROR_MESSAGES, FILE_UPLOAD_TIMEOUT, FILE_EXTRACT_WORKERS,
+    MAX_PDF_PAGES, MAX_DOCX_UNCOMPRESSED_SIZE, MAX_DOCX_COMPRESSION_RATIO,
+    PDF_EDGE_LINES, PDF_REPEAT_MIN_RATIO
+)
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_extraction_slots = threading.BoundedSemaphore(FILE_EXTRACT_WORKERS)
+# Only used where child processes are unavailable; a timed-out parse keeps its slot until it ends
+_extraction_pool = ThreadPoolExecutor(max_workers=FILE_EXTRACT_WORKERS, thread_name_prefix="articulaite-extract")
+
+def sniff_file_type(buffer):
+    """Detect pdf/docx/txt from the content of a bytes-like buffer, or None"""
+    head = bytes(buffer[:1024])
+    # The PDF header may be preceded by junk, readers accept it in the first 1KB
+    if b"%PDF-" in head:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    sample = bytes(buffer[:8192])
+    if b"\x00" in sample:
+        return None
+    # A multi-byte character may be cut off at the end of a partial sample
+    if len(sample) < len(buffer):
+        sample = sample[:-3]
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    return "txt"
+
+def _open_pdf(file):
+    """PDF reader after checking encryption and page count (xref and page tree only); raises ValueError"""
+    import PyPDF2
+
+    file.seek(0)
+    try:
+        reader = PyPDF2.PdfReader(file)
+        encrypted = reader.is_encrypted
+        pages = 0 if encrypted else len(reader.pages)
+    except Exception:
+        raise ValueError(ERROR_MESSAGES["file_corrupt"])
+    if encrypted:
+        raise ValueError(ERROR_MESSAGES["file_encrypted"])
+    if pages > MAX_PDF_PAGES:
+        raise ValueError(ERROR_MESSAGES["too_many_pages"])
+    return reader
+
+def _check_docx_structure(uploaded_file):
+    """Check DOCX parts from the zip central directory, without decompressing"""
+    uploaded_file.seek(0)
+    with zipfile.ZipFile(uploaded_file) as docx:
+        parts = docx.infolist()
+    if "word/document.xml" not in {part.filename for part in parts}:
+        return False, ERROR_MESSAGES["file_corrupt"]
+    if sum(part.file_size for part in parts) > MAX_DOCX_UNCOMPRESSED_SIZE:
+        return False, ERROR_MESSAGES["file_too_large"]
+    for part in parts:
+        if part.compress_size and part.file_size / part.compress_size > MAX_DOCX_COMPRESSION_RATIO:
+            return False, ERROR_MESSAGES["file_corrupt"]
+    return True, "File valid"
 
 def validate_file(uploaded_file):
     """Validate uploaded file"""
@@ -21,41 +108,309 @@ def validate_file(uploaded_file):
     if file_ext not in ALLOWED_FILE_TYPES:
         return False, ERROR_MESSAGES["invalid_file_type"]
     
+    # Check content matches the extension (magic bytes, zero-copy)
+    if sniff_file_type(uploaded_file.getbuffer()) != file_ext:
+        return False, ERROR_MESSAGES["file_content_mismatch"]
+    
+    # Cheap structural checks before any full parse; PDFs are checked by _open_pdf when read
+    try:
+        if file_ext == "docx":
+            return _check_docx_structure(uploaded_file)
+    except Exception:
+        return False, ERROR_MESSAGES["file_corrupt"]
+    
     return True, "File valid"
 
+# "Page 3", "3 of 5", "3/5": page labels wherever they are
+PAGE_LABEL = re.compile(r"^(?:page\s*\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?|\d{1,3}\s*(?:of|/)\s*\d{1,3})$", re.IGNORECASE)
+# "3", "- 3 -", "(3)": only a page number when it matches the page's position
+BARE_NUMBER = re.compile(r"^[-–—(\[]?\s*(\d{1,3})\s*[-–—)\]]?$")
+HYPHENATED_BREAK = re.compile(r"(\w*[A-Za-z])-\n([a-z])")
+# Prefixes whose hyphen belongs to the word ("self-\nservice" stays "self-service")
+HYPHEN_PREFIXES = {"self", "non", "co", "ex", "cross", "well", "full", "part", "real", "high", "low", "end"}
+
+def _join_hyphenated(match):
+    word, next_letter = match.groups()
+    hyphen = "-" if word.lower() in HYPHEN_PREFIXES else ""
+    return f"{word}{hyphen}{next_letter}"
+
+def _is_page_number(line, number):
+    """Whether an edge line is the page number of page `number` (1-based)"""
+    if PAGE_LABEL.match(line):
+        return True
+    bare = BARE_NUMBER.match(line)
+    return bool(bare) and int(bare.group(1)) == number
+
+def _edge_key(line):
+    """Key for comparing edge lines across pages, ignoring case
+
+    Numbers are ignored only in lines with letters ("Jane Doe - CV 2"), so
+    number-only lines such as dates must repeat exactly.
+    """
+    line = line.lower()
+    return re.sub(r"\d+", "#", line) if re.search(r"[^\W\d_]", line) else line
+
+def normalise_pdf_pages(pages):
+    """Clean extracted PDF page texts and join them with page markers
+
+    Lines in the top or bottom PDF_EDGE_LINES of a page that repeat on at least
+    PDF_REPEAT_MIN_RATIO of the pages are running headers/footers: only their
+    first occurrence is kept. Lines with letters match when only their numbers
+    differ; number-only lines (dates) must repeat exactly. Page labels ("Page 3",
+    "3 of 5") and bare numbers matching the page's position are dropped, words
+    hyphenated across a line break are rejoined and runs of whitespace and
+    blank lines collapsed.
+    """
+    pages = [
+        [re.sub(r"\s+", " ", line).strip() for line in (page or "").splitlines()]
+        for page in pages
+    ]
+    pages = [[line for line in page if line] for page in pages]
+
+    edge_counts = {}
+    for page in pages:
+        edges = set(page[:PDF_EDGE_LINES]) | set(page[-PDF_EDGE_LINES:])
+        for key in {_edge_key(line) for line in edges}:
+            edge_counts[key] = edge_counts.get(key, 0) + 1
+    repeated = {
+        key for key, count in edge_counts.items()
+        if len(pages) > 1 and count >= max(2, PDF_REPEAT_MIN_RATIO * len(pages))
+    }
+
+    seen_repeated = set()
+    cleaned = []
+    for number, page in enumerate(pages, start=1):
+        lines = []
+        for index, line in enumerate(page):
+            at_edge = index < PDF_EDGE_LINES or index >= len(page) - PDF_EDGE_LINES
+            if at_edge and _is_page_number(line, number):
+                continue
+            key = _edge_key(line)
+            if at_edge and key in repeated:
+                if key in seen_repeated:
+                    continue
+                seen_repeated.add(key)
+            lines.append(line)
+        cleaned.append(HYPHENATED_BREAK.sub(_join_hyphenated, "\n".join(lines)))
+
+    if len(cleaned) == 1:
+        return cleaned[0]
+    return "\n\n".join(f"[Page {number}]\n{text}" for number, text in enumerate(cleaned, start=1) if text)
+
 def extract_text_from_pdf(file):
-    """Extract text from PDF file"""
+    """Extract and normalise text from PDF file; raises ValueError if it fails the structure checks"""
+    pdf_reader = _open_pdf(file)
+    return normalise_pdf_pages(page.extract_text() for page in pdf_reader.pages)
+
+def _iter_docx_part(part):
+    """Stream text blocks (paragraphs and table rows) from one WordprocessingML part
+
+    The XML is read incrementally and finished elements are cleared, so memory
+    stays flat regardless of document size. Table cells are joined with " | ",
+    nested tables and text boxes are kept inline, and the VML fallback copies of
+    text boxes are skipped so their text is not duplicated.
+    """
+    runs = [[]]  # text pieces of the open paragraphs (text boxes nest paragraphs)
+    cells = []  # paragraph texts of the open table cells
+    rows = []  # cell texts of the open table rows
+    fallback_depth = 0
+    container = None  # w:body, w:hdr or w:ftr; emptied after every top-level block
+
+    for event, elem in ET.iterparse(part, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if container is None and tag in (W_NS + "body", W_NS + "hdr", W_NS + "ftr"):
+                container = elem
+            elif tag == W_NS + "p":
+                runs.append([])
+            elif tag == W_NS + "tc":
+                cells.append([])
+            elif tag == W_NS + "tr":
+                rows.append([])
+            elif tag == MC_FALLBACK:
+                fallback_depth += 1
+            continue
+
+        if fallback_depth:
+            if tag == MC_FALLBACK:
+                fallback_depth -= 1
+            elif tag == W_NS + "p":
+                runs.pop()
+            elif tag == W_NS + "tc":
+                cells.pop()
+            elif tag == W_NS + "tr":
+                rows.pop()
+            continue
+
+        if tag == W_NS + "t":
+            runs[-1].append(elem.text or "")
+        elif tag == W_NS + "tab" and not elem.attrib:
+            # Attribute-less w:tab is a tab character; with attributes it is a tab stop
+            runs[-1].append("\t")
+        elif tag in (W_NS + "br", W_NS + "cr"):
+            runs[-1].append("\n")
+        elif tag == W_NS + "p":
+            text = "".join(runs.pop())
+            if cells:
+                cells[-1].append(text)
+            elif text:
+                yield text
+            elem.clear()
+            if not cells and len(runs) == 1 and container is not None:
+                container.clear()
+        elif tag == W_NS + "tc":
+            rows[-1].append(" ".join(text for text in cells.pop() if text))
+        elif tag == W_NS + "tr":
+            row = " | ".join(text for text in rows.pop() if text)
+            if cells:
+                cells[-1].append(row)
+            elif row:
+                yield row
+            elem.clear()
+            if not cells and len(runs) == 1 and container is not None:
+                container.clear()
+
+def extract_text_from_docx(file):
+    """Extract text from DOCX file, including tables, text boxes, headers and footers"""
+    file.seek(0)
+    with zipfile.ZipFile(file) as docx:
+        names = docx.namelist()
+        headers = sorted(name for name in names if re.fullmatch(r"word/header\d*\.xml", name))
+        footers = sorted(name for name in names if re.fullmatch(r"word/footer\d*\.xml", name))
+
+        blocks = []
+        seen = set()
+        for name in headers + ["word/document.xml"] + footers:
+            repeated = name != "word/document.xml"
+            with docx.open(name) as part:
+                for block in _iter_docx_part(part):
+                    # Different first-page/odd/even headers often repeat the same lines
+                    if repeated:
+                        if block in seen:
+                            continue
+                        seen.add(block)
+                    blocks.append(block)
+    return "\n".join(blocks)
+
+EXTRACTORS = {"pdf": extract_text_from_pdf, "docx": extract_text_from_docx}
+
+@lru_cache(maxsize=None)
+def _extraction_context():
+    """Fork server context with this module preloaded, or None where it is unavailable"""
+    import multiprocessing
+
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        st.error(f"Error reading PDF: {str(e)}")
+        context = multiprocessing.get_context("forkserver")
+    except ValueError:
         return None
+    context.set_forkserver_preload(["utils.file_handler"])
+    return context
 
-def extract_text_from_docx(file):
-    """Extract text from DOCX file"""
+def _extract_in_child(conn, file_ext):
+    """Read the upload from conn and send back ("ok", text), ("invalid", reason) or ("error", message)
+
+    Runs in a child process.
+    """
     try:
-        doc = Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        data = conn.recv_bytes()
+        conn.send(("ok", EXTRACTORS[file_ext](io.BytesIO(data))))
+    except ValueError as e:
+        conn.send(("invalid", str(e)))
     except Exception as e:
-        st.error(f"Error reading DOCX: {str(e)}")
-        return None
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+def _extract_in_process(context, file_ext, uploaded_file):
+    """Extract in a child process, killed after FILE_UPLOAD_TIMEOUT; frees the slot when it ends
+
+    The upload is written to the pipe straight from its buffer (no getvalue()
+    copy and no pickling); the child necessarily receives its own copy.
+    """
+    conn = process = None
+    try:
+        conn, child_conn = context.Pipe()
+        child = context.Process(target=_extract_in_child, args=(child_conn, file_ext), daemon=True)
+        child.start()
+        process = child
+        child_conn.close()
+        with uploaded_file.getbuffer() as view:
+            conn.send_bytes(view)
+        if not conn.poll(FILE_UPLOAD_TIMEOUT):
+            raise TimeoutError
+        try:
+            kind, payload = conn.recv()
+        except EOFError:
+            raise RuntimeError("the reader process stopped unexpectedly")
+        process.join(1)
+    finally:
+        if conn is not None:
+            conn.close()
+        if process is not None and process.is_alive():
+            process.kill()
+            process.join()
+        _extraction_slots.release()
+    if kind == "invalid":
+        raise ValueError(payload)
+    if kind == "error":
+        raise RuntimeError(payload)
+    return payload
+
+def _extract_in_thread(file_ext, uploaded_file):
+    """Extract on the thread pool from the upload itself; a timed-out parse keeps its slot until it ends"""
+    try:
+        future = _extraction_pool.submit(EXTRACTORS[file_ext], uploaded_file)
+    except BaseException:
+        _extraction_slots.release()
+        raise
+    future.add_done_callback(lambda _: _extraction_slots.release())
+    return future.result(timeout=FILE_UPLOAD_TIMEOUT)
 
 def extract_text_from_file(uploaded_file):
     """Extract text from uploaded file based on type"""
     file_ext = uploaded_file.name.split('.')[-1].lower()
     
-    if file_ext == "pdf":
-        return extract_text_from_pdf(uploaded_file)
-    elif file_ext == "docx":
-        return extract_text_from_docx(uploaded_file)
-    elif file_ext == "txt":
-        return uploaded_file.getvalue().decode("utf-8")
+    if file_ext == "txt":
+        # Decode straight from the upload buffer, without a getvalue() copy
+        return str(uploaded_file.getbuffer(), "utf-8", errors="replace")
+    
+    if file_ext not in EXTRACTORS:
+        return None
     
+    context = _extraction_context()
+    if not _extraction_slots.acquire(blocking=False):
+        st.error(ERROR_MESSAGES["extraction_busy"])
+        return None
+    try:
+        # Each path releases the slot when its parse ends
+        if context is None:
+            return _extract_in_thread(file_ext, uploaded_file)
+        return _extract_in_process(context, file_ext, uploaded_file)
+    except TimeoutError:
+        st.error(ERROR_MESSAGES["extraction_timeout"])
+    except ValueError as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"Error reading {file_ext.upper()}: {str(e)}")
     return None
+
+def file_from_bytes(name, data):
+    """In-memory file with the attributes validation expects of an upload (name, size, getbuffer)"""
+    file = io.BytesIO(data)
+    file.name = name
+    file.size = len(data)
+    return file
+
+def extract_text_from_bytes(name, data):
+    """Validate and extract one file from raw bytes, raising ValueError when it is rejected
+
+    Makes no Streamlit calls, so it can run in a worker process (bulk screening).
+    """
+    file = file_from_bytes(name, data)
+    is_valid, message = validate_file(file)
+    if not is_valid:
+        raise ValueError(message)
+    file_ext = name.split('.')[-1].lower()
+    if file_ext == "txt":
+        return data.decode("utf-8", errors="replace")
+    return EXTRACTORS[file_ext](file)
@@ -0,0 +1,285 @@
+"""
+LLM client helpers for articulAIte
+
+LangChain and the Groq client are imported on the first LLM call rather than
+at app start, so a cold worker only pays for Streamlit before the first render.
+All chat models share one keep-alive HTTP connection pool, which the server
+warm-up (see utils/warmup.py) opens ahead of the first user.
+
+Identical requests (same model, temperature and rendered messages) that are
+in flight at the same time are coalesced: later callers attach to the
+running call and get the same result, or replay and follow the same token
+stream, instead of opening new upstream calls.
+
+Calls can be recorded to cassette files and replayed offline, with no
+network, by setting ARTICULAITE_CASSETTE_MODE (see utils/cassette.py).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+import streamlit as st
+from utils.metrics import increment
+from config import API_TIMEOUT, STREAM_WAIT_INTERVAL, LLM_BACKEND, LLM_CASSETTE_MODE
+
+_api_key = None
+_http_client = None
+_http_client_lock = threading.Lock()
+
+_inflight_lock = threading.Lock()
+_inflight_invokes = {}
+_inflight_streams = {}
+
+def is_offline():
+    """Whether LLM calls are served locally (stub backend or cassette replay)"""
+    return LLM_BACKEND == "stub" or LLM_CASSETTE_MODE == "replay"
+
+def get_api_key():
+    """Get Groq API key from environment or Streamlit secrets, resolved once"""
+    global _api_key
+    if is_offline():
+        return "offline"
+    if _api_key is None:
+        _api_key = os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY")
+    return _api_key
+
+def get_http_client():
+    """Get the process-wide keep-alive HTTP client shared by all chat models"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            import httpx
+
+            _http_client = httpx.Client(timeout=API_TIMEOUT)
+        return _http_client
+
+@lru_cache(maxsize=None)
+def _groq_client(model):
+    """Shared Groq chat model for one model id, importing LangChain on first use"""
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        model=model,
+        groq_api_key=get_api_key(),
+        http_client=get_http_client()
+    )
+
+@lru_cache(maxsize=None)
+def get_llm(model, temperature):
+    """Get a chat model at a temperature; the Groq client is built once per model and shared by every temperature"""
+    if LLM_CASSETTE_MODE == "replay":
+        from utils.cassette import get_cassette_llm
+
+        return get_cassette_llm(model, temperature)
+
+    if LLM_BACKEND == "stub":
+        from utils.stub_llm import get_stub_llm
+
+        return get_stub_llm(model, temperature)
+
+    # Call kwargs override the client's defaults, so the temperature is bound per call
+    return _groq_client(model).bind(temperature=temperature)
+
+def request_key(model, temperature, messages):
+    """Hash identifying a request by model, temperature and rendered messages"""
+    rendered = [(message.type, message.content) for message in messages]
+    payload = json.dumps([model, temperature, rendered], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def invoke_llm(model, temperature, messages):
+    """Invoke a chat model, attaching to an identical call already in flight"""
+    key = request_key(model, temperature, messages)
+    with _inflight_lock:
+        future = _inflight_invokes.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight_invokes[key] = Future()
+
+    if not leader:
+        increment("llm_invoke_coalesced")
+        return future.result()
+
+    increment("llm_invoke_upstream")
+    try:
+        start = time.perf_counter()
+        result = get_llm(model, temperature).invoke(messages)
+        if LLM_CASSETTE_MODE == "record":
+            from utils.cassette import record
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            record(key, model, temperature, messages, [(elapsed_ms, _chunk_text(result))],
+                   getattr(result, "usage_metadata", None), "invoke")
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight_invokes.pop(key, None)
+
+def _chunk_text(chunk):
+    """Text content of a streamed message chunk"""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+def _pump_stream(key, flight, model, temperature, messages):
+    """Read the upstream stream into the shared flight buffer (runs in a worker thread)"""
+    stream = None
+    timings = []  # (offset ms, text) per chunk, for cassette recording
+    try:
+        start = time.perf_counter()
+        stream = get_llm(model, temperature).stream(messages)
+        for chunk in stream:
+            if flight["cancel"].is_set():
+                break
+            text = _chunk_text(chunk)
+            with flight["cond"]:
+                if getattr(chunk, "usage_metadata", None):
+                    flight["usage"] = chunk.usage_metadata
+                if text:
+                    flight["chunks"].append(text)
+                    flight["cond"].notify_all()
+            if text:
+                timings.append(((time.perf_counter() - start) * 1000, text))
+        if LLM_CASSETTE_MODE == "record" and not flight["cancel"].is_set():
+            from utils.cassette import record
+
+            record(key, model, temperature, messages, timings, flight["usage"], "stream")
+    except Exception as e:
+        flight["error"] = e
+    finally:
+        if stream is not None:
+            stream.close()
+        with _inflight_lock:
+            if _inflight_streams.get(key) is flight:
+                del _inflight_streams[key]
+        with flight["cond"]:
+            flight["done"] = True
+            flight["cond"].notify_all()
+
+def _join_stream(model, temperature, messages):
+    """Subscribe to the in-flight stream for this request, starting one if there is none"""
+    key = request_key(model, temperature, messages)
+    with _inflight_lock:
+        flight = _inflight_streams.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight_streams[key] = {
+                "cond": threading.Condition(),
+                "cancel": threading.Event(),
+                "chunks": [],
+                "usage": None,
+                "error": None,
+                "done": False,
+                "subscribers": 0
+            }
+        flight["subscribers"] += 1
+
+    if leader:
+        increment("llm_stream_upstream")
+        threading.Thread(
+            target=_pump_stream,
+            args=(key, flight, model, temperature, messages),
+            name="articulaite-stream",
+            daemon=True
+        ).start()
+    else:
+        increment("llm_stream_coalesced")
+    return key, flight
+
+def _leave_stream(key, flight):
+    """Unsubscribe; the upstream stream is closed once nobody is reading it"""
+    with _inflight_lock:
+        flight["subscribers"] -= 1
+        if flight["subscribers"] == 0 and not flight["done"]:
+            flight["cancel"].set()
+            if _inflight_streams.get(key) is flight:
+                del _inflight_streams[key]
+
+def stream_text(model, temperature, messages, stats=None, cancel_event=None, on_wait=None):
+    """Stream a completion as text chunks, filling `stats` with latency and token counts
+
+    Setting `cancel_event` stops reading; the upstream response is closed once
+    no coalesced caller is still reading it. `on_wait(seconds since start)` is
+    called from the reading thread every STREAM_WAIT_INTERVAL without a new
+    chunk (e.g. before the first token), so a page can show progress and be
+    interrupted.
+    """
+    stats = {} if stats is None else stats
+    start = time.perf_counter()
+    output = []
+    read = 0
+    waited = start
+
+    key, flight = _join_stream(model, temperature, messages)
+    try:
+        while True:
+            with flight["cond"]:
+                while read == len(flight["chunks"]) and not flight["done"]:
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    if on_wait is not None and time.perf_counter() - waited >= STREAM_WAIT_INTERVAL:
+                        break
+                    flight["cond"].wait(0.1)
+                new_chunks = flight["chunks"][read:]
+                finished = flight["done"]
+            if cancel_event is not None and cancel_event.is_set():
+                stats["cancelled"] = True
+                break
+            if not new_chunks and not finished:
+                # Called outside the flight's lock: it may update the page, or be interrupted there
+                waited = time.perf_counter()
+                on_wait(waited - start)
+                continue
+            waited = time.perf_counter()
+            read += len(new_chunks)
+            for text in new_chunks:
+                if "ttft_ms" not in stats:
+                    stats["ttft_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                output.append(text)
+                yield text
+            if finished and read == len(flight["chunks"]):
+                break
+        if flight["error"] is not None and not stats.get("cancelled"):
+            raise flight["error"]
+    finally:
+        _leave_stream(key, flight)
+
+    total_s = time.perf_counter() - start
+    stats["total_ms"] = round(total_s * 1000, 1)
+    usage = flight["usage"]
+    if usage:
+        stats["input_tokens"] = usage.get("input_tokens")
+        stats["output_tokens"] = usage.get("output_tokens")
+    else:
+        # Rough estimate (~4 characters per token) when the provider sends no usage
+        stats["output_tokens"] = len("".join(output)) // 4
+        stats["tokens_estimated"] = True
+    generation_s = total_s - stats.get("ttft_ms", 0) / 1000
+    stats["tokens_per_sec"] = round(stats["output_tokens"] / generation_s, 1) if generation_s > 0 else None
+
+def complete_text(model, temperature, messages, stats=None, cancel_event=None, on_wait=None):
+    """Whole completion text read through the streaming path, so the call can be stopped
+
+    Returns None if `cancel_event` is set before the reply is complete (the
+    upstream stream is then closed as in `stream_text`). `on_wait(seconds
+    since start)` is called every STREAM_WAIT_INTERVAL until the reply is
+    complete, while chunks arrive too, so a page that shows nothing until the
+    end can still be interrupted (Stop).
+    """
+    stats = {} if stats is None else stats
+    start = last = time.perf_counter()
+    chunks = []
+    for text in stream_text(model, temperature, messages, stats, cancel_event, on_wait):
+        chunks.append(text)
+        if on_wait is not None and time.perf_counter() - last >= STREAM_WAIT_INTERVAL:
+            last = time.perf_counter()
+            on_wait(last - start)
+    return None if stats.get("cancelled") else "".join(chunks)
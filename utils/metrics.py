@@ -0,0 +1,65 @@
+"""
+In-process metrics for articulAIte
+
+Counters and per-model latency/token statistics. Counters are atomic
+increments in utils/shared_state.py, so with a shared state server they add
+up across replicas; model runs are kept per server process.
+"""
+
+import json
+import os
+import threading
+import time
+from utils.shared_state import incr_field, get_fields
+from config import COMPARE_LOG_PATH
+
+COUNTERS_KEY = "counters"
+
+_lock = threading.Lock()
+_model_runs = {}
+
+def increment(name, amount=1):
+    """Increment a named counter"""
+    incr_field(COUNTERS_KEY, name, amount)
+
+def get_counters():
+    """Snapshot of all counters"""
+    return get_fields(COUNTERS_KEY)
+
+def coalescing_summary():
+    """Upstream vs coalesced LLM calls (identical requests that attached to one in flight)"""
+    counters = get_counters()
+    upstream = counters.get("llm_invoke_upstream", 0) + counters.get("llm_stream_upstream", 0)
+    coalesced = counters.get("llm_invoke_coalesced", 0) + counters.get("llm_stream_coalesced", 0)
+    return {"upstream": upstream, "coalesced": coalesced}
+
+def record_model_run(tab_key, model, stats):
+    """Record latency and token stats of one completed model run"""
+    with _lock:
+        runs = _model_runs.setdefault(model, [])
+        runs.append(stats)
+        del runs[:-200]
+
+    if COMPARE_LOG_PATH:
+        entry = {"time": time.time(), "tab": tab_key, "model": model, **stats}
+        try:
+            os.makedirs(os.path.dirname(COMPARE_LOG_PATH) or ".", exist_ok=True)
+            with _lock, open(COMPARE_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+
+def model_summary():
+    """Average stats per model over its recorded runs, fastest first"""
+    with _lock:
+        snapshot = {model: list(runs) for model, runs in _model_runs.items()}
+
+    rows = []
+    for model, runs in snapshot.items():
+        ok = [run for run in runs if not run.get("error")]
+        row = {"model": model, "runs": len(runs), "errors": len(runs) - len(ok)}
+        for field in ("ttft_ms", "total_ms", "tokens_per_sec", "output_tokens"):
+            values = [run[field] for run in ok if run.get(field) is not None]
+            row[field] = round(sum(values) / len(values), 1) if values else None
+        rows.append(row)
+    return sorted(rows, key=lambda row: row["total_ms"] if row["total_ms"] is not None else float("inf"))
@@ -0,0 +1,158 @@
+"""
+Predictive prefetch of the likely next action for articulAIte
+
+Most users follow an upload or paste with the same click: "Interview
+Questions" after a CV upload, "Explain Code" after a paste, "Generate
+Article" after entering a topic. With PREFETCH_ENABLED, a tab calls
+`prefetch` on every rerun where that action's inputs are ready. Once the
+inputs have stayed unchanged for PREFETCH_DEBOUNCE seconds (so adjusting a
+slider or a setting does not start a generation per value), the action
+starts on a small background pool at lowered OS priority, keyed by its
+inputs, and its result is cached in shared state (see utils/shared_state.py)
+for PREFETCH_TTL. The click calls `take_prefetched` with the same inputs: a
+finished prefetch returns at once, and one still running is waited for
+rather than restarted; one still queued is cancelled and the click runs the
+action itself. Only the first click uses the prefetched result; clicking
+again generates afresh, and inputs already used by a click are not
+prefetched again.
+
+Counters record prefetches started, hits and the output tokens spent, so
+`prefetch_summary` can report the hit rate and the tokens spent on
+predictions nobody used.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import increment, get_counters
+from utils.shared_state import get_json, put_json, incr, get, put
+from config import PREFETCH_ENABLED, PREFETCH_WORKERS, PREFETCH_NICE, PREFETCH_MAX_PENDING, PREFETCH_TTL, PREFETCH_DEBOUNCE
+
+_running = {}
+_lock = threading.Lock()
+
+def _lower_priority():
+    """Raise this pool thread's niceness; Linux applies it per thread"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), os.getpriority(os.PRIO_PROCESS, 0) + PREFETCH_NICE)
+    except (AttributeError, OSError):
+        pass
+
+_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="articulaite-prefetch", initializer=_lower_priority)
+
+def prefetch_key(action, inputs):
+    """Key of one action on given inputs (model, temperature and everything its prompt is built from)"""
+    return hashlib.sha256(json.dumps([action, inputs], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def output_tokens(text, usage=None):
+    """Output tokens of a result: from the API's usage when known, else estimated at 4 characters each"""
+    if usage and usage.get("output_tokens") is not None:
+        return usage["output_tokens"]
+    return len(text) // 4
+
+def _run(key, job):
+    """Run a prefetch job and cache its result (runs on the prefetch pool)"""
+    try:
+        value, tokens = job()
+    except Exception:
+        increment("prefetch_failed")
+        with _lock:
+            # Not retried on every rerun; the click runs the action itself
+            put(f"prefetch_failed:{key}", 1, PREFETCH_TTL)
+            _running.pop(key, None)
+        raise
+    increment("prefetch_tokens", tokens)
+    with _lock:
+        # A click that attached while this ran has already used the result
+        if get(f"prefetch_taken:{key}") is not None:
+            increment("prefetch_used_tokens", tokens)
+        put_json(f"prefetch:{key}", {"value": value, "tokens": tokens}, PREFETCH_TTL)
+        _running.pop(key, None)
+    return value
+
+def prefetch(action, inputs, job, slot):
+    """Start `job` in the background once these inputs have been stable for PREFETCH_DEBOUNCE seconds
+
+    `job` takes no arguments and returns (result, output tokens); the result
+    must be JSON-serialisable. `slot` is a dict kept in the caller's
+    session_state; a call with other inputs replaces the pending start. Does
+    nothing unless PREFETCH_ENABLED.
+    """
+    if not PREFETCH_ENABLED:
+        return
+    key = prefetch_key(action, inputs)
+    if slot.get("key") == key:
+        return
+    if slot.get("timer") is not None:
+        slot["timer"].cancel()
+    slot["key"] = key
+    slot["timer"] = threading.Timer(PREFETCH_DEBOUNCE, _start, args=(action, key, job))
+    slot["timer"].daemon = True
+    slot["timer"].start()
+
+def _start(action, key, job):
+    """Submit a debounced prefetch unless its result exists, is running or was already used (runs on a timer thread)"""
+    with _lock:
+        if key in _running or len(_running) >= PREFETCH_MAX_PENDING:
+            return
+        if any(get(f"{prefix}:{key}") is not None for prefix in ("prefetch", "prefetch_taken", "prefetch_failed")):
+            return
+        _running[key] = _pool.submit(_run, key, job)
+    increment("prefetch_started")
+    increment(f"prefetch_started_{action}")
+
+def take_prefetched(action, inputs, wait=True):
+    """The prefetched result of an action on these inputs, or None to run it normally
+
+    A prefetch still running is waited for when `wait` is set; otherwise the
+    caller is expected to attach to its in-flight LLM stream (identical
+    streams are coalesced in utils/llm.py) and None is returned. One still
+    queued is cancelled and counts as a miss.
+    """
+    if not PREFETCH_ENABLED:
+        return None
+    key = prefetch_key(action, inputs)
+    with _lock:
+        cached = get_json(f"prefetch:{key}")
+        future = _running.get(key)
+        if cached is None and future is not None and future.cancel():
+            _running.pop(key, None)
+            future = None
+        if cached is None and future is None:
+            increment("prefetch_misses")
+            # The click runs the action itself: these inputs are not prefetched afterwards
+            put(f"prefetch_taken:{key}", 1, PREFETCH_TTL)
+            return None
+        if incr(f"prefetch_taken:{key}", 1, ttl=PREFETCH_TTL) not in (1, None):
+            # Already used by an earlier click: this one asks for a fresh result
+            return None
+        if cached is not None:
+            increment("prefetch_hits")
+            increment(f"prefetch_hits_{action}")
+            increment("prefetch_used_tokens", cached["tokens"])
+            return cached["value"]
+    increment("prefetch_attached")
+    increment(f"prefetch_hits_{action}")
+    if not wait:
+        return None
+    try:
+        return future.result()
+    except Exception:
+        return None
+
+def prefetch_summary():
+    """Prefetches started, used (finished or attached), hit rate and tokens spent on unused results"""
+    counters = get_counters()
+    started = counters.get("prefetch_started", 0)
+    used = counters.get("prefetch_hits", 0) + counters.get("prefetch_attached", 0)
+    tokens = counters.get("prefetch_tokens", 0)
+    return {
+        "started": started,
+        "used": used,
+        "hit_rate": round(used / started, 3) if started else None,
+        "failed": counters.get("prefetch_failed", 0),
+        "tokens": tokens,
+        "wasted_tokens": tokens - counters.get("prefetch_used_tokens", 0)
+    }
@@ -0,0 +1,187 @@
+"""
+Prompt template registry for articulAIte
+
+Templates are compiled once, on first use, so LangChain is only imported when
+the first LLM call happens. Every template starts with the static
+system prompt of its tab so the message prefix stays byte-identical across
+turns and users, which lets provider-side prompt caching hit. Per-session
+content (resume, code, article, plan) and chat history are passed as
+messages through placeholders, so user text is never parsed as template
+syntax and may safely contain `{` or `}`.
+"""
+
+import json
+import re
+from functools import lru_cache
+from config import SYSTEM_PROMPTS
+
+def _chat_template(tab_key):
+    """Compile the chat template for a tab: static prefix, session context, history"""
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+    return ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPTS[tab_key]),
+        MessagesPlaceholder("context"),
+        MessagesPlaceholder("history")
+    ])
+
+def _action_template(tab_key, instructions):
+    """Compile a one-shot action template: static prefix and instructions, then user content"""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    return ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPTS[tab_key]),
+        ("human", instructions + "\n\n{content}")
+    ])
+
+PROMPT_SPECS = {
+    # Chat turns
+    "cv_interview.chat": ("cv_interview", None),
+    "code_explainer.chat": ("code_explainer", None),
+    "article_generator.chat": ("article_generator", None),
+    "study_plan.chat": ("study_plan", None),
+
+    # CV & Interview actions
+    "cv_interview.questions": (
+        "cv_interview",
+        "Generate 10 targeted interview questions based on the resume below.\n"
+        "Include behavioral, technical, and role-specific questions."
+    ),
+    "cv_interview.skills": (
+        "cv_interview",
+        "Analyze the resume below and provide:\n"
+        "1. Top 5 strongest skills to highlight\n"
+        "2. How to present each skill effectively\n"
+        "3. Questions to prepare for\n"
+        "4. Skills gaps to address"
+    ),
+    "cv_interview.profile": (
+        "cv_interview",
+        "Extract a compact structured profile from the resume below. Reply with JSON only, "
+        "no prose and no code fences, using exactly these keys:\n"
+        '{{"name": str, "headline": str, '
+        '"roles": [{{"title": str, "company": str, "start": str, "end": str, "highlights": [str], "metrics": [str]}}], '
+        '"skills": [str], '
+        '"projects": [{{"name": str, "summary": str, "technologies": [str]}}], '
+        '"education": [{{"degree": str, "institution": str, "year": str}}], '
+        '"certifications": [str]}}\n'
+        "Keep highlights short, keep every number in metrics, and do not invent anything."
+    ),
+    "cv_interview.screen": (
+        "cv_interview",
+        "Screen the resume below against the job description. Reply with JSON only, "
+        "no prose and no code fences, using exactly these keys:\n"
+        '{{"candidate": str, "fit_score": int, "summary": str, '
+        '"strengths": [str], "gaps": [str], "questions": [str]}}\n'
+        "fit_score is 0-100 for how well the resume matches the role. Keep the summary to two "
+        "sentences, list up to 3 strengths and 3 gaps against the job's requirements, and write "
+        "5 interview questions that probe the gaps and verify the strengths."
+    ),
+
+    # Code Explainer actions
+    "code_explainer.explain": (
+        "code_explainer",
+        "Provide detailed line-by-line explanation of the code below.\n"
+        "Explain what each part does and why it's written that way."
+    ),
+    "code_explainer.debug": (
+        "code_explainer",
+        "Find errors and issues in the code below.\n"
+        "For each issue: identify it, explain why, provide fix, explain the fix."
+    ),
+    "code_explainer.debug_findings": (
+        "code_explainer",
+        "A local static analyser reported the findings below for a Python file; only the relevant "
+        "line windows are shown. For each finding: confirm whether it is a real bug, explain why, and "
+        "provide the fix. Also point out any other problems visible in the shown lines."
+    ),
+    "code_explainer.debug_diff": (
+        "code_explainer",
+        "The code below was already reviewed; the previous findings and the changes made since "
+        "then are shown. Review only the changed hunks: say which previous findings are now fixed, "
+        "which still apply, and report any new issues introduced by the changes (identify it, explain "
+        "why, provide fix). End with the complete updated list of open issues."
+    ),
+    "code_explainer.optimize": (
+        "code_explainer",
+        "Provide optimization suggestions for the code below.\n"
+        "Consider: time complexity, space complexity, readability, best practices."
+    ),
+
+    # Long study plans: compact outline first, then each week in parallel
+    "study_plan.outline": (
+        "study_plan",
+        "Create a compact outline for a study plan using the settings below. Reply with JSON only, "
+        "no prose and no code fences, using exactly these keys:\n"
+        '{{"overview": str, "objectives": [str], '
+        '"phases": [{{"name": str, "weeks": [{{"week": int, "title": str, "focus": str}}]}}], '
+        '"resources": [str], "metrics": [str], "tips": [str]}}\n'
+        "Cover every week exactly once, numbered from 1, and keep each focus to one sentence."
+    ),
+    "study_plan.week": (
+        "study_plan",
+        "Write the detailed plan for one week of the study plan below. Reply with JSON only, "
+        "no prose and no code fences, using exactly these keys:\n"
+        '{{"topics": [{{"name": str, "hours": number, "resources": [str]}}], "checkpoint": str}}\n'
+        "List the topics and hands-on practice in study order with realistic hour estimates that add "
+        "up to the weekly study hours, name concrete resources for each topic, and make the checkpoint "
+        "a short task that verifies progress."
+    ),
+
+    # Article Generator actions
+    "article_generator.generate": (
+        "article_generator",
+        "Write a comprehensive article using the settings below.\n\n"
+        "Requirements:\n"
+        "- Well-researched and accurate\n"
+        "- Engaging and well-structured\n"
+        "- Clear headings\n"
+        "- Professional formatting\n"
+        "- Publication-ready"
+    ),
+
+    # Study Plan actions
+    "study_plan.generate": (
+        "study_plan",
+        "Create a comprehensive study plan using the settings below. Reply with JSON only, "
+        "no prose and no code fences, using exactly these keys:\n"
+        '{{"overview": str, "objectives": [str], '
+        '"weeks": [{{"week": int, "title": str, "phase": str, "focus": str, '
+        '"topics": [{{"name": str, "hours": number, "resources": [str]}}], "checkpoint": str}}], '
+        '"resources": [str], "metrics": [str], "tips": [str]}}\n'
+        "Cover every week exactly once, numbered from 1. Give each topic a realistic hour estimate so "
+        "each week adds up to the weekly study hours, and name concrete resources for each topic."
+    ),
+}
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """Compile a registered template once and reuse it afterwards"""
+    tab_key, instructions = PROMPT_SPECS[name]
+    if instructions is None:
+        return _chat_template(tab_key)
+    return _action_template(tab_key, instructions)
+
+def build_messages(name, content):
+    """Render a one-shot action template with user content"""
+    return get_template(name).format_messages(content=content)
+
+def build_chat_messages(tab_key, context, history):
+    """Render a chat turn: static system prompt, session context, then history"""
+    from langchain_core.messages import SystemMessage
+
+    return get_template(f"{tab_key}.chat").format_messages(
+        context=[SystemMessage(content=context)],
+        history=[(msg["role"], msg["content"]) for msg in history]
+    )
+
+def parse_json_reply(response_text):
+    """Parse a JSON object from a model reply, tolerating code fences and surrounding prose"""
+    match = re.search(r"\{.*\}", response_text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        value = json.loads(match.group(0))
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
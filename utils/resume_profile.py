@@ -0,0 +1,121 @@
+"""
+Structured resume profile for articulAIte
+
+One extraction pass turns the raw resume into a compact structured profile
+(roles, dates, skills, projects, metrics). Profiles are cached by content
+hash in shared state (see utils/shared_state.py) and on disk, so they are
+shared across sessions and replicas and reused by
+every CV action; downstream prompts send the small profile instead of the
+raw resume and pull the raw text only when a question needs it.
+"""
+
+import hashlib
+import json
+import os
+import re
+from utils.llm import invoke_llm
+from utils.prompts import build_messages, parse_json_reply
+from utils.shared_state import get_json, put_json
+from config import RESUME_PROFILE_MODEL, RESUME_PROFILE_CACHE_DIR, SHARED_CACHE_TTL
+
+PROFILE_SCHEMA_VERSION = 1
+
+# Questions that need the resume's exact wording rather than the profile
+RAW_RESUME_KEYWORDS = [
+    "exact", "verbatim", "word", "wording", "phrase", "phrasing", "rewrite", "reword",
+    "proofread", "typo", "grammar", "format", "layout", "bullet", "line", "section",
+    "summary section", "objective", "quote",
+]
+
+def resume_hash(resume_text):
+    """Content hash identifying a resume"""
+    return hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+
+def _cache_path(digest):
+    return os.path.join(RESUME_PROFILE_CACHE_DIR, f"v{PROFILE_SCHEMA_VERSION}-{digest}.json")
+
+def _shared_key(digest):
+    return f"resume_profile:v{PROFILE_SCHEMA_VERSION}:{digest}"
+
+def _load_cached(digest):
+    """Look up a profile in shared state, then on disk"""
+    profile = get_json(_shared_key(digest))
+    if profile is not None:
+        return profile
+    try:
+        with open(_cache_path(digest), encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    put_json(_shared_key(digest), profile, SHARED_CACHE_TTL)
+    return profile
+
+def _store(digest, profile):
+    """Store a profile in shared state and on disk"""
+    put_json(_shared_key(digest), profile, SHARED_CACHE_TTL)
+    try:
+        os.makedirs(RESUME_PROFILE_CACHE_DIR, exist_ok=True)
+        with open(_cache_path(digest), "w", encoding="utf-8") as f:
+            json.dump(profile, f)
+    except OSError:
+        pass
+
+def get_resume_profile(resume_text):
+    """Get the structured profile of a resume, extracting it once per content hash"""
+    digest = resume_hash(resume_text)
+    profile = _load_cached(digest)
+    if profile is not None:
+        return profile
+
+    response = invoke_llm(
+        RESUME_PROFILE_MODEL, 0.0,
+        build_messages("cv_interview.profile", f"RESUME:\n{resume_text}")
+    )
+    profile = parse_json_reply(response.content)
+    if profile is not None:
+        _store(digest, profile)
+    return profile
+
+def format_profile(profile):
+    """Render a profile as compact prompt text"""
+    lines = []
+    if profile.get("name") or profile.get("headline"):
+        lines.append(" - ".join(part for part in (profile.get("name"), profile.get("headline")) if part))
+
+    roles = profile.get("roles") or []
+    if roles:
+        lines.append("ROLES:")
+        for role in roles:
+            dates = "–".join(part for part in (role.get("start"), role.get("end")) if part)
+            header = f"- {role.get('title', '')} @ {role.get('company', '')}"
+            lines.append(f"{header} ({dates})" if dates else header)
+            for item in (role.get("highlights") or []) + (role.get("metrics") or []):
+                lines.append(f"  • {item}")
+
+    if profile.get("skills"):
+        lines.append(f"SKILLS: {', '.join(profile['skills'])}")
+
+    projects = profile.get("projects") or []
+    if projects:
+        lines.append("PROJECTS:")
+        for project in projects:
+            tech = ", ".join(project.get("technologies") or [])
+            line = f"- {project.get('name', '')}: {project.get('summary', '')}"
+            lines.append(f"{line} [{tech}]" if tech else line)
+
+    education = profile.get("education") or []
+    if education:
+        lines.append("EDUCATION:")
+        for entry in education:
+            parts = (entry.get("degree"), entry.get("institution"), entry.get("year"))
+            lines.append(f"- {', '.join(part for part in parts if part)}")
+
+    if profile.get("certifications"):
+        lines.append(f"CERTIFICATIONS: {', '.join(profile['certifications'])}")
+
+    return "\n".join(lines)
+
+def needs_raw_resume(question):
+    """Whether a question is about the resume's exact text rather than its content"""
+    question = question.lower()
+    return any(re.search(rf"\b{re.escape(keyword)}", question) for keyword in RAW_RESUME_KEYWORDS)
@@ -0,0 +1,282 @@
+"""
+Shared state backend for articulAIte
+
+Caches, counters and rate limits that should be global across Streamlit
+replicas go through this module instead of module-level dicts. With
+SHARED_STATE_URL empty they live in this process (a bounded LRU dict with
+per-key expiry); with `redis://[:password@]host:port/db` they live in Redis
+or any server speaking its protocol (`python -m tools.kvserver` serves one
+locally), over one socket per thread.
+
+Both backends offer the same operations: values (bytes, str, or JSON via the
+helpers) with a TTL, atomic counters, and hashes of integer counters. A
+networked backend that stops answering degrades to cache misses and an open
+rate limit, never to a failed request, and is left alone for
+SHARED_STATE_RETRY_AFTER seconds so a hung server does not stall every call;
+failures are counted in `status()`.
+"""
+
+import json
+import socket
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import urlparse
+from config import (
+    SHARED_STATE_URL, SHARED_STATE_PREFIX, SHARED_STATE_TIMEOUT, SHARED_STATE_RETRY_AFTER, SHARED_STATE_MEMORY_MAX_KEYS
+)
+
+_errors = {"count": 0, "last": None, "retry_at": 0.0}
+
+def _as_bytes(value):
+    return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+def memory_backend(max_keys=SHARED_STATE_MEMORY_MAX_KEYS):
+    """In-process backend: an LRU dict of key -> (value, expiry), safe across threads"""
+    store = OrderedDict()
+    lock = threading.Lock()
+
+    def live(key):
+        """The unexpired entry of a key, marked recently used; caller holds the lock"""
+        entry = store.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del store[key]
+            return None
+        store.move_to_end(key)
+        return entry
+
+    def put(key, value, expires):
+        store[key] = (value, expires)
+        store.move_to_end(key)
+        while len(store) > max_keys:
+            store.popitem(last=False)
+
+    def expiry(ttl):
+        return time.monotonic() + ttl if ttl else None
+
+    def get(key):
+        with lock:
+            entry = live(key)
+        return None if entry is None or isinstance(entry[0], dict) else entry[0]
+
+    def set(key, value, ttl=None):
+        with lock:
+            put(key, _as_bytes(value), expiry(ttl))
+
+    def incr(key, amount=1, ttl=None):
+        with lock:
+            entry = live(key)
+            value, expires = (0, expiry(ttl)) if entry is None else (int(entry[0]), entry[1])
+            value += amount
+            put(key, _as_bytes(value), expires)
+        return value
+
+    def incr_field(key, field, amount=1):
+        with lock:
+            entry = live(key)
+            fields = entry[0] if entry is not None and isinstance(entry[0], dict) else {}
+            fields[field] = fields.get(field, 0) + amount
+            put(key, fields, None if entry is None else entry[1])
+            return fields[field]
+
+    def get_fields(key):
+        with lock:
+            entry = live(key)
+            return dict(entry[0]) if entry is not None and isinstance(entry[0], dict) else {}
+
+    def delete(key):
+        with lock:
+            store.pop(key, None)
+
+    def size():
+        with lock:
+            return len(store)
+
+    return {
+        "name": "memory", "get": get, "set": set, "incr": incr,
+        "incr_field": incr_field, "get_fields": get_fields, "delete": delete, "size": size
+    }
+
+def _encode_command(args):
+    """One command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = _as_bytes(arg)
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+def read_reply(reader):
+    """Read one RESP reply; a server error is returned as a RuntimeError, not raised"""
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Shared state server closed the connection")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        return RuntimeError(rest.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        return None if length < 0 else reader.read(length + 2)[:-2]
+    if kind == b"*":
+        length = int(rest)
+        return None if length < 0 else [read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from shared state server: {line[:40]!r}")
+
+def redis_backend(url):
+    """Networked backend speaking the Redis protocol, with one connection per thread"""
+    parsed = urlparse(url)
+    host, port = parsed.hostname or "localhost", parsed.port or 6379
+    database = int(parsed.path.lstrip("/") or 0)
+    local = threading.local()
+
+    def connect():
+        sock = socket.create_connection((host, port), timeout=SHARED_STATE_TIMEOUT)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        local.sock, local.reader = sock, sock.makefile("rb")
+        setup = []
+        if parsed.password:
+            setup.append(["AUTH", parsed.password] if not parsed.username else ["AUTH", parsed.username, parsed.password])
+        if database:
+            setup.append(["SELECT", database])
+        if setup:
+            sock.sendall(b"".join(_encode_command(command) for command in setup))
+            for reply in [read_reply(local.reader) for _ in setup]:
+                if isinstance(reply, RuntimeError):
+                    sock.close()
+                    local.sock = None
+                    raise reply
+
+    def execute(*commands):
+        """Send commands in one round trip (pipelined); returns their replies"""
+        if getattr(local, "sock", None) is None:
+            connect()
+        try:
+            local.sock.sendall(b"".join(_encode_command(command) for command in commands))
+            replies = [read_reply(local.reader) for _ in commands]
+        except OSError:
+            # The connection state is unknown after a failure: drop it, the next call reconnects
+            local.sock.close()
+            local.sock = None
+            raise
+        for reply in replies:
+            if isinstance(reply, RuntimeError):
+                raise reply
+        return replies
+
+    def get(key):
+        return execute(["GET", key])[0]
+
+    def set(key, value, ttl=None):
+        command = ["SET", key, value]
+        if ttl:
+            command += ["PX", int(ttl * 1000)]
+        execute(command)
+
+    def incr(key, amount=1, ttl=None):
+        if not ttl:
+            return execute(["INCRBY", key, amount])[0]
+        # Creating the key with its expiry first keeps the TTL from the first increment only
+        return execute(["SET", key, 0, "PX", int(ttl * 1000), "NX"], ["INCRBY", key, amount])[1]
+
+    def incr_field(key, field, amount=1):
+        return execute(["HINCRBY", key, field, amount])[0]
+
+    def get_fields(key):
+        flat = execute(["HGETALL", key])[0] or []
+        return {flat[i].decode("utf-8"): int(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    def delete(key):
+        execute(["DEL", key])
+
+    def size():
+        return execute(["DBSIZE"])[0]
+
+    return {
+        "name": f"redis://{host}:{port}/{database}", "get": get, "set": set, "incr": incr,
+        "incr_field": incr_field, "get_fields": get_fields, "delete": delete, "size": size
+    }
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """The backend selected by SHARED_STATE_URL, created once per process"""
+    if SHARED_STATE_URL:
+        return redis_backend(SHARED_STATE_URL)
+    return memory_backend()
+
+def _call(operation, key, *args, default=None):
+    """Run one backend operation on a prefixed key, degrading to `default` if the backend fails"""
+    if time.monotonic() < _errors["retry_at"]:
+        return default
+    try:
+        return get_backend()[operation](f"{SHARED_STATE_PREFIX}{key}", *args)
+    except (OSError, RuntimeError, ValueError) as e:
+        _errors["count"] += 1
+        _errors["last"] = f"{operation}: {e}"
+        if isinstance(e, OSError):
+            _errors["retry_at"] = time.monotonic() + SHARED_STATE_RETRY_AFTER
+        return default
+
+def get(key):
+    """Bytes stored under a key, or None"""
+    return _call("get", key)
+
+def put(key, value, ttl=None):
+    """Store bytes or text under a key, expiring after `ttl` seconds"""
+    _call("set", key, value, ttl)
+
+def get_json(key):
+    """JSON value stored under a key, or None"""
+    data = get(key)
+    if data is None:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+def put_json(key, value, ttl=None):
+    put(key, json.dumps(value, ensure_ascii=False), ttl)
+
+def incr(key, amount=1, ttl=None):
+    """Atomically add to a counter; a new counter expires after `ttl` seconds. None if unavailable"""
+    return _call("incr", key, amount, ttl)
+
+def incr_field(key, field, amount=1):
+    """Atomically add to one integer field of a hash"""
+    return _call("incr_field", key, field, amount)
+
+def get_fields(key):
+    """All integer fields of a hash"""
+    return _call("get_fields", key, default={})
+
+def delete(key):
+    _call("delete", key)
+
+def rate_limit_wait(name, limit, window):
+    """Take a slot of `limit` calls per `window` seconds; returns 0, or the seconds to wait before retrying
+
+    A fixed-window counter: one atomic increment per attempt, shared by every
+    replica using the same backend. If the backend is unavailable, the call
+    is allowed.
+    """
+    now = time.time()
+    window_id = int(now // window)
+    count = incr(f"rate:{name}:{window_id}", 1, ttl=window * 2)
+    if count is None or count <= limit:
+        return 0
+    return (window_id + 1) * window - now
+
+def status():
+    """Backend name, key count and failures so far, for diagnostics"""
+    backend = get_backend()
+    try:
+        keys = backend["size"]()
+    except (OSError, RuntimeError):
+        keys = None
+    return {"backend": backend["name"], "keys": keys, "errors": _errors["count"], "last_error": _errors["last"]}
@@ -0,0 +1,206 @@
+"""
+Local CV-to-JD skill matching for articulAIte
+
+Scores how well resumes cover a job description without an LLM call. Texts
+are tokenised into skill-aware terms (keeping tokens like `c++`, `node.js`
+and `ci/cd`, and two-word phrases like `machine learning`), the job
+description's keywords are weighted by TF-IDF with known skills boosted, and
+coverage is the weighted share of those keywords a resume contains. Many
+resumes are scored at once with NumPy matrix products, which bulk screening
+uses to pre-rank CVs so only the best matches are sent to the LLM.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+import streamlit as st
+from config import SKILL_MATCH_KEYWORDS, SKILL_MATCH_SKILL_BOOST
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+STOPWORDS = set("""
+a about above across after all also an and any are as at be been being both but by can could
+did do does doing each either etc for from had has have having he her here his how i if in into
+is it its just may me more most much must my no nor not of on one or other our out over own per
+same she should so some such than that the their them then there these they this those through
+to too under until up upon us very was we well were what when where which while who whom why will
+with within without would you your
+ability able across activities apply based benefits best candidate candidates career company
+competitive culture day demonstrated description desired develop developing deliver environment
+equivalent excellent experience experienced familiarity fast good great help ideal including
+join knowledge least level like looking make new opportunity paced plus position preferred
+proficiency proficient proven related required requirements responsibilities responsible role
+seeking self skill skills solid strong successful support team teams understanding using various
+want way work working world year years
+build building built create deliver delivering drive end ensure exposure hands
+manage managing own owning provide reliable senior junior mid minimum
+""".split())
+
+# Common spellings mapped to one term, so "k8s" in a resume matches "Kubernetes" in the JD
+ALIASES = {
+    "js": "javascript", "ts": "typescript", "k8s": "kubernetes", "golang": "go", "postgres": "postgresql",
+    "py": "python", "ml": "machine learning", "ai": "artificial intelligence", "nlp": "natural language processing",
+    "gcp": "google cloud", "reactjs": "react", "react.js": "react", "nodejs": "node.js", "node": "node.js",
+    "cicd": "ci/cd", "sklearn": "scikit-learn", "powerbi": "power bi"
+}
+
+# Known skills weigh more than other job description terms
+SKILL_TERMS = {
+    # Languages
+    "python", "java", "javascript", "typescript", "go", "rust", "c", "c++", "c#", "ruby", "php", "scala",
+    "kotlin", "swift", "r", "matlab", "sql", "bash", "html", "css",
+    # Frameworks and libraries
+    "react", "angular", "vue", "node.js", "django", "flask", "fastapi", "spring", "rails",
+    "pandas", "numpy", "pytorch", "tensorflow", "scikit-learn", "spark", "hadoop", "airflow", "kafka",
+    "dbt", "langchain", "graphql", "rest",
+    # Data and infrastructure
+    "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "snowflake", "bigquery", "databricks",
+    "aws", "azure", "google cloud", "docker", "kubernetes", "terraform", "ansible", "jenkins", "git",
+    "linux", "ci/cd", "microservices", "devops", "mlops", "etl",
+    # Practices and domains
+    "machine learning", "deep learning", "data science", "data engineering", "data analysis",
+    "data pipeline", "data modeling", "data visualization", "statistics", "natural language processing",
+    "computer vision", "artificial intelligence", "distributed systems", "system design", "cloud",
+    "security", "testing", "unit testing", "automation", "agile", "scrum", "product management",
+    "project management", "stakeholder management", "leadership", "mentoring", "communication",
+    "excel", "tableau", "power bi", "figma", "salesforce", "seo", "marketing", "accounting", "finance"
+}
+
+def _normalise(token):
+    """Map aliases and fold simple plurals ("pipelines" -> "pipeline"), leaving known skills alone"""
+    if token in ALIASES:
+        return ALIASES[token]
+    if token in SKILL_TERMS:
+        return token
+    if len(token) > 4 and token.endswith("s") and not token.endswith(("ss", "us", "is", "ics")):
+        token = token[:-1]
+    return ALIASES.get(token, token)
+
+@lru_cache(maxsize=256)
+def extract_terms(text):
+    """Term counts of a text: single words and two-word phrases, without stopwords"""
+    counts = Counter()
+    previous = None
+    for raw in TOKEN_PATTERN.findall(text.lower()):
+        if raw in STOPWORDS or not any(ch.isalpha() for ch in raw):
+            previous = None
+            continue
+        token = _normalise(raw)
+        counts[token] += 1
+        if previous:
+            phrase = ALIASES.get(f"{previous} {raw}", f"{previous} {token}")
+            counts[phrase] += 1
+        previous = token
+    return counts
+
+def _is_phrase(term):
+    return " " in term
+
+def _idf(document_frequency, documents):
+    """Smoothed inverse document frequency"""
+    return math.log((1 + documents) / (1 + document_frequency)) + 1
+
+def jd_keywords(jd_terms, document_frequency, documents):
+    """The job description's keywords with their weights, heaviest first
+
+    Candidates are single words plus the phrases that are known skills or
+    repeat in the job description; words already covered by a chosen phrase
+    are dropped unless they are skills themselves.
+    """
+    weights = {}
+    for term, count in jd_terms.items():
+        skill = term in SKILL_TERMS
+        if _is_phrase(term) and not skill and count < 2:
+            continue
+        weight = (1 + math.log(count)) * _idf(document_frequency.get(term, 0), documents)
+        weights[term] = weight * (SKILL_MATCH_SKILL_BOOST if skill else 1)
+
+    ranked = sorted(weights.items(), key=lambda item: item[1], reverse=True)
+    phrases = [term for term, _ in ranked[:SKILL_MATCH_KEYWORDS] if _is_phrase(term)]
+    covered = {word for phrase in phrases for word in phrase.split()} - SKILL_TERMS
+    keywords = [(term, weight) for term, weight in ranked if term not in covered]
+    return keywords[:SKILL_MATCH_KEYWORDS]
+
+def rank_resumes(resume_texts, job_description):
+    """Skill match of many resumes against one job description
+
+    Returns one dict per resume, in input order, with the coverage score
+    (0-100), the TF-IDF cosine similarity and the matched and missing
+    keywords. Coverage for all resumes is one product of the resume-by-keyword
+    presence matrix with the keyword weights.
+    """
+    import numpy as np
+
+    jd_terms = extract_terms(job_description)
+    resume_terms = [extract_terms(text) for text in resume_texts]
+    documents = len(resume_terms) + 1
+    document_frequency = Counter(jd_terms.keys())
+    for terms in resume_terms:
+        document_frequency.update(term for term in terms if term in jd_terms)
+
+    keywords = jd_keywords(jd_terms, document_frequency, documents)
+    if not keywords or not resume_terms:
+        return [{"score": 0, "similarity": 0.0, "matched": [], "missing": [term for term, _ in keywords]} for _ in resume_terms]
+
+    # Only terms shared with the JD affect the dot product; norms use every term of a resume
+    vocabulary = {term: index for index, term in enumerate(jd_terms)}
+    idf = np.array([_idf(document_frequency[term], documents) for term in vocabulary])
+    counts = np.zeros((len(resume_terms), len(vocabulary)), dtype=np.float32)
+    norms = np.zeros(len(resume_terms), dtype=np.float32)
+    for row, terms in enumerate(resume_terms):
+        for term, count in terms.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                counts[row, column] = count
+        # Terms outside the JD vocabulary appear in this resume only: their idf is the maximum
+        outside_idf = _idf(1, documents)
+        norms[row] = math.sqrt(sum(
+            ((1 + math.log(count)) * (idf[vocabulary[term]] if term in vocabulary else outside_idf)) ** 2
+            for term, count in terms.items()
+        )) or 1.0
+
+    tfidf = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0) * idf
+    query = np.array([(1 + math.log(jd_terms[term])) for term in vocabulary]) * idf
+    similarity = (tfidf @ query) / norms / (np.linalg.norm(query) or 1.0)
+
+    keyword_columns = np.array([vocabulary[term] for term, _ in keywords])
+    keyword_weights = np.array([weight for _, weight in keywords])
+    present = counts[:, keyword_columns] > 0
+    coverage = present @ keyword_weights / keyword_weights.sum() * 100
+
+    results = []
+    for row in range(len(resume_terms)):
+        results.append({
+            "score": int(round(coverage[row])),
+            "similarity": round(float(similarity[row]), 3),
+            "matched": [term for (term, _), hit in zip(keywords, present[row]) if hit],
+            "missing": [term for (term, _), hit in zip(keywords, present[row]) if not hit]
+        })
+    return results
+
+def match_resume(resume_text, job_description):
+    """Skill match of one resume, with the time it took in ms"""
+    start = time.perf_counter()
+    result = rank_resumes([resume_text], job_description)[0]
+    result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+def _terms(terms):
+    return ", ".join(f"`{term}`" for term in terms) or "none"
+
+def skill_match_panel(resume_text, job_description):
+    """Instant keyword coverage of the job description by the resume, computed locally"""
+    result = match_resume(resume_text, job_description)
+    with st.container(border=True):
+        score_col, terms_col = st.columns([1, 4])
+        with score_col:
+            st.metric(
+                "Skill match", f"{result['score']}%",
+                help=f"Weighted share of the job description's keywords found in the resume (TF-IDF, known skills weigh {SKILL_MATCH_SKILL_BOOST:g}x)"
+            )
+            st.caption(f"Local match · {result['ms']} ms")
+        with terms_col:
+            st.markdown(f"**Matched:** {_terms(result['matched'])}")
+            st.markdown(f"**Missing:** {_terms(result['missing'])}")
@@ -0,0 +1,123 @@
+"""
+Two-tier speculative chat answers for articulAIte
+
+A chat turn is sent to a fast draft model and to the selected model at the
+same time. The draft is shown as soon as it arrives and replaced in place by
+the selected model's answer when that finishes, so perceived latency drops to
+the fast model's without giving up final quality. If the selected model
+starts answering before the draft arrives, its stream is shown directly
+(rendered block by block) and the draft is ignored. Sending another message
+or clicking Stop cancels the slower call and keeps what was shown: the
+partial streamed answer, or the draft, marked as such.
+"""
+
+import queue
+import threading
+import time
+import streamlit as st
+from utils.chat_history import add_message
+from utils.llm import invoke_llm, stream_text
+from utils.streaming_markdown import new_renderer, render_chunk, finish_render, stop_button, TRUNCATED_NOTE
+from config import SPECULATIVE_DRAFT_MODEL
+
+def _run_draft(model, temperature, messages, events):
+    """Fetch the fast draft (runs in a worker thread)"""
+    try:
+        events.put(("draft", invoke_llm(model, temperature, messages).content))
+    except Exception:
+        events.put(("draft", None))
+
+def _run_final(model, temperature, messages, cancel_event, events):
+    """Stream the selected model's answer until done or cancelled (runs in a worker thread)"""
+    try:
+        chunks = []
+        for text in stream_text(model, temperature, messages, cancel_event=cancel_event):
+            chunks.append(text)
+            events.put(("chunk", text))
+        if not cancel_event.is_set():
+            events.put(("final", "".join(chunks)))
+    except Exception as e:
+        events.put(("final_error", str(e)))
+
+def speculative_chat_turn(tab_key, user_input, model, temperature, messages):
+    """Answer a chat turn with a fast draft first, upgraded in place; returns the answer"""
+    if model == SPECULATIVE_DRAFT_MODEL:
+        return invoke_llm(model, temperature, messages).content
+
+    # A new turn supersedes any turn of this tab that is still refining
+    inflight_key = f"{tab_key}_inflight_cancel"
+    previous = st.session_state.get(inflight_key)
+    if previous is not None:
+        previous.set()
+    cancel_event = threading.Event()
+    st.session_state[inflight_key] = cancel_event
+
+    with st.chat_message("user"):
+        st.write(user_input)
+    with st.chat_message("assistant"):
+        stop = st.empty()
+        status = st.empty()
+        answer = st.empty()
+    with stop:
+        stop_button(f"{tab_key}_stop")
+
+    events = queue.Queue()
+    threading.Thread(target=_run_draft, args=(SPECULATIVE_DRAFT_MODEL, temperature, messages, events), daemon=True).start()
+    threading.Thread(target=_run_final, args=(model, temperature, messages, cancel_event, events), daemon=True).start()
+
+    draft = None
+    renderer = None
+    start = time.perf_counter()
+    status.caption("Thinking...")
+    try:
+        while True:
+            try:
+                kind, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                # Periodic UI update: lets Streamlit interrupt this run if a new message arrives
+                elapsed = time.perf_counter() - start
+                if renderer is not None:
+                    continue
+                if draft:
+                    status.caption(f"⚡ Fast draft — refining with {model}... {elapsed:.0f}s")
+                else:
+                    status.caption(f"Thinking... {elapsed:.0f}s")
+                continue
+
+            if kind == "chunk":
+                # Without a draft on screen the selected model's answer is shown as it streams
+                if draft is None:
+                    if renderer is None:
+                        status.empty()
+                        renderer = new_renderer(answer)
+                    render_chunk(renderer, payload)
+            elif kind == "draft" and payload and renderer is None:
+                draft = payload
+                answer.markdown(draft)
+                status.caption(f"⚡ Fast draft — refining with {model}...")
+            elif kind == "final":
+                stop.empty()
+                status.empty()
+                if renderer is not None:
+                    finish_render(renderer)
+                else:
+                    answer.markdown(payload)
+                return payload
+            elif kind == "final_error":
+                if draft:
+                    stop.empty()
+                    return draft
+                raise RuntimeError(payload)
+    except BaseException:
+        # Interrupted (Stop, or another message): keep what was on screen as the answer
+        if not cancel_event.is_set():
+            partial = "".join(renderer["chunks"]) if renderer is not None else ""
+            if partial:
+                add_message(tab_key, "assistant", partial + TRUNCATED_NOTE)
+            elif draft:
+                add_message(tab_key, "assistant", f"{draft}\n\n_(fast draft — refinement cancelled)_")
+        raise
+    finally:
+        cancel_event.set()
+        if st.session_state.get(inflight_key) is cancel_event:
+            del st.session_state[inflight_key]
@@ -0,0 +1,217 @@
+"""
+Incremental markdown rendering of streamed LLM output for articulAIte
+
+Re-rendering a whole growing answer on every chunk re-sends (and the
+browser re-parses) the full document each time, which is quadratic in its
+length. Here the stream is split into markdown blocks (paragraphs, headings,
+lists, tables and code fences) as it arrives: a finished block is written
+once into its own element and never touched again, and only the trailing
+open block is re-rendered per chunk, so the work grows linearly with the
+output.
+
+Every stream shows a Stop button. Clicking it (or any other widget) reruns
+the script, which interrupts this run at its next element update (while no
+output arrives, e.g. before the first token, a waiting status is updated
+every STREAM_WAIT_INTERVAL so that happens promptly): the stream is then
+closed, so the upstream response is dropped as soon as no
+other caller shares it, and the partial output is handed to `on_stop` to
+be kept, marked with TRUNCATED_NOTE. Actions whose output is only shown
+once complete (parsed plans, per-unit code reports) read their replies
+through the same streams with `stop_controls`, so Stop closes them too.
+"""
+
+import re
+from contextlib import contextmanager
+import streamlit as st
+from utils.chat_history import add_message
+from utils.llm import stream_text
+from utils.metrics import increment
+
+FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+HEADING = re.compile(r"^ {0,3}#{1,6}(\s|$)")
+LIST_ITEM = re.compile(r"^ {0,3}([-*+]|\d{1,9}[.)])(\s|$)")
+
+TRUNCATED_NOTE = "\n\n_(stopped — output truncated)_"
+
+def new_blocks():
+    """Block splitter state for one stream"""
+    return {"lines": [], "partial": "", "fence": None, "blank": False, "list": False}
+
+def _close(state, blocks):
+    """Freeze the open block"""
+    if state["lines"]:
+        blocks.append("\n".join(state["lines"]))
+    state["lines"] = []
+    state["blank"] = False
+    state["list"] = False
+
+def _closes_fence(fence, line):
+    """Whether a line closes a code fence: the same character, at least as many, nothing else"""
+    marker = line.strip()
+    return len(marker) >= len(fence) and marker == fence[0] * len(marker)
+
+def _add_line(state, line, blocks):
+    """Place one complete line, freezing blocks it ends"""
+    if state["fence"]:
+        state["lines"].append(line)
+        if _closes_fence(state["fence"], line):
+            state["fence"] = None
+            _close(state, blocks)
+        return
+
+    if not line.strip():
+        # A blank line ends a paragraph; a list stays open in case the next line continues it
+        if state["list"]:
+            state["blank"] = True
+        else:
+            _close(state, blocks)
+        return
+
+    if state["blank"]:
+        if LIST_ITEM.match(line) or line.startswith(("  ", "\t")):
+            state["lines"].append("")
+            state["blank"] = False
+        else:
+            _close(state, blocks)
+
+    opening = FENCE.match(line)
+    if opening:
+        _close(state, blocks)
+        state["fence"] = opening.group(1)
+        state["lines"].append(line)
+    elif HEADING.match(line):
+        _close(state, blocks)
+        state["lines"].append(line)
+        _close(state, blocks)
+    else:
+        if LIST_ITEM.match(line) and not state["lines"]:
+            state["list"] = True
+        state["lines"].append(line)
+
+def feed_blocks(state, text):
+    """Add streamed text; returns the blocks it completed, in order"""
+    blocks = []
+    *lines, state["partial"] = (state["partial"] + text).split("\n")
+    for line in lines:
+        _add_line(state, line, blocks)
+    return blocks
+
+def open_block(state):
+    """Markdown of the block still being streamed"""
+    lines = state["lines"] + ([state["partial"]] if state["partial"] else [])
+    return "\n".join(lines)
+
+def new_renderer(parent=None):
+    """Renderer writing into a new container (of `parent`, or the current position)"""
+    container = (parent or st).container()
+    return {"blocks": new_blocks(), "container": container, "tail": container.empty(), "chunks": [], "sent": 0}
+
+def _freeze(renderer, blocks):
+    """Write finished blocks; each takes over the tail element and a fresh tail goes after it"""
+    for block in blocks:
+        renderer["tail"].markdown(block)
+        renderer["sent"] += len(block)
+        renderer["tail"] = renderer["container"].empty()
+
+def render_chunk(renderer, text):
+    """Render one streamed chunk: new finished blocks once, then the open block"""
+    renderer["chunks"].append(text)
+    _freeze(renderer, feed_blocks(renderer["blocks"], text))
+    tail = open_block(renderer["blocks"])
+    if tail:
+        renderer["tail"].markdown(tail)
+        renderer["sent"] += len(tail)
+
+def finish_render(renderer):
+    """Flush the last block; returns the full streamed text"""
+    state = renderer["blocks"]
+    blocks = []
+    if state["partial"]:
+        _add_line(state, state["partial"], blocks)
+        state["partial"] = ""
+    _close(state, blocks)
+    _freeze(renderer, blocks)
+    increment("markdown_stream_chars_sent", renderer["sent"])
+    return "".join(renderer["chunks"])
+
+def stop_button(key):
+    """Stop control for output being generated in this run; clicking it interrupts the run"""
+    st.button("⏹️ Stop", key=key, help="Stop generating; the output so far is kept, marked as truncated")
+
+@contextmanager
+def stop_controls(key, label="Generating"):
+    """Stop button and progress caption for output that is only shown once complete
+
+    Yields `on_wait(seconds)` for the generating call, which updates the
+    caption every STREAM_WAIT_INTERVAL so Stop can interrupt the run. Both
+    are removed when the block ends, unless the run was interrupted.
+    """
+    stop = st.empty()
+    with stop:
+        stop_button(key)
+    status = st.empty()
+
+    def on_wait(seconds):
+        status.caption(f"⏳ {label}... {seconds:.0f}s")
+
+    def clear():
+        stop.empty()
+        status.empty()
+
+    try:
+        yield on_wait
+    except Exception:
+        clear()
+        raise
+    clear()
+
+def stream_markdown(model, temperature, messages, stats=None, cancel_event=None, parent=None, on_stop=None):
+    """Stream a completion into the page as incrementally rendered markdown; returns the text
+
+    If the run is interrupted (Stop) or the stream fails, the upstream stream
+    is closed and `on_stop` gets the partial text, if any, before the
+    exception propagates.
+    """
+    renderer = new_renderer(parent)
+    waiting = (parent or st).empty()
+    shown = []
+
+    def show_wait(seconds):
+        waiting.caption(f"⏳ Waiting for {model}... {seconds:.0f}s")
+        shown.append(seconds)
+
+    stream = stream_text(model, temperature, messages, stats, cancel_event, on_wait=show_wait)
+    try:
+        for text in stream:
+            if shown:
+                waiting.empty()
+                shown.clear()
+            render_chunk(renderer, text)
+    except BaseException:
+        stream.close()
+        increment("llm_stream_stopped")
+        partial = "".join(renderer["chunks"])
+        if on_stop is not None and partial:
+            on_stop(partial)
+        raise
+    if shown:
+        waiting.empty()
+    return finish_render(renderer)
+
+def stream_chat_turn(tab_key, user_input, model, temperature, messages):
+    """Show the user's message and stream the assistant's answer below it; returns the answer
+
+    A stopped answer is kept in the chat history, marked as truncated.
+    """
+    with st.chat_message("user"):
+        st.write(user_input)
+    with st.chat_message("assistant"):
+        stop = st.empty()
+        with stop:
+            stop_button(f"{tab_key}_stop")
+        answer = stream_markdown(
+            model, temperature, messages,
+            on_stop=lambda partial: add_message(tab_key, "assistant", partial + TRUNCATED_NOTE)
+        )
+        stop.empty()
+        return answer
@@ -0,0 +1,93 @@
+"""
+Stub chat model backend for load tests and offline runs
+
+Selected with ARTICULAITE_LLM_BACKEND=stub. Replies are canned but shaped
+like the real ones (JSON for profile and study plan prompts, markdown of
+the requested length otherwise) and streamed with a configurable
+time-to-first-token and token rate, so the app runs its real code paths
+without network access or API usage.
+"""
+
+import hashlib
+import json
+import re
+import time
+from config import STUB_LLM_TTFT_MS, STUB_LLM_TOKENS_PER_SEC
+
+FILLER = (
+    "This section explains the key ideas with a short example, the trade-offs to keep in mind "
+    "and a practical next step you can take today."
+).split()
+
+def _words(count):
+    """Markdown paragraphs of roughly `count` words"""
+    words = [FILLER[i % len(FILLER)] for i in range(max(count, 1))]
+    paragraphs = [" ".join(words[i:i + 60]) for i in range(0, len(words), 60)]
+    return "\n\n".join(f"## Section {i + 1}\n\n{paragraph}" for i, paragraph in enumerate(paragraphs))
+
+def _weeks(prompt):
+    match = re.search(r"Duration: (\d+) weeks", prompt)
+    return int(match.group(1)) if match else 4
+
+def _week_detail(number):
+    return {
+        "topics": [
+            {"name": f"Core concepts {number}", "hours": 6, "resources": ["Official documentation"]},
+            {"name": f"Hands-on practice {number}", "hours": 8, "resources": ["Exercises"]}
+        ],
+        "checkpoint": f"Finish the week {number} exercise set"
+    }
+
+def stub_reply(prompt):
+    """Canned reply shaped like the real reply to this prompt"""
+    if '"roles"' in prompt:
+        return json.dumps({
+            "name": "Sample Candidate", "headline": "Software Engineer",
+            "roles": [{"title": "Engineer", "company": "Acme", "start": "2020", "end": "Present",
+                       "highlights": ["Built data pipelines"], "metrics": ["cut costs by 20%"]}],
+            "skills": ["Python", "SQL"], "projects": [], "education": [], "certifications": []
+        })
+    if '"fit_score"' in prompt:
+        score = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % 101
+        return json.dumps({
+            "candidate": "Sample Candidate", "fit_score": score,
+            "summary": "Solid engineering background. Partial match for the role's requirements.",
+            "strengths": ["Python", "Data pipelines"], "gaps": ["Cloud certification"],
+            "questions": [f"Walk me through a project that used {skill}." for skill in ("Python", "SQL", "Spark", "AWS", "Docker")]
+        })
+    if '"phases"' in prompt:
+        weeks = [{"week": n, "title": f"Module {n}", "focus": "Learn and practise"} for n in range(1, _weeks(prompt) + 1)]
+        return json.dumps({"overview": "A structured plan.", "objectives": ["Build fluency"],
+                           "phases": [{"name": "Core", "weeks": weeks}], "resources": [], "metrics": [], "tips": []})
+    if '"weeks"' in prompt:
+        weeks = [{"week": n, "title": f"Module {n}", "phase": "Core", "focus": "Learn and practise", **_week_detail(n)}
+                 for n in range(1, _weeks(prompt) + 1)]
+        return json.dumps({"overview": "A structured plan.", "objectives": ["Build fluency"], "weeks": weeks,
+                           "resources": [], "metrics": [], "tips": []})
+    if '"topics"' in prompt:
+        match = re.search(r"WEEK TO DETAIL: Week (\d+)", prompt)
+        return json.dumps(_week_detail(int(match.group(1)) if match else 1))
+
+    match = re.search(r"Word Count: (\d+) words", prompt)
+    return _words(int(match.group(1)) if match else 150)
+
+def _stream_reply(messages):
+    """Yield the canned reply as message chunks at the configured pace"""
+    from langchain_core.messages import AIMessageChunk
+
+    prompt = "\n".join(str(message.content) for message in messages)
+    tokens = re.findall(r"\S+\s*", stub_reply(prompt))
+    time.sleep(STUB_LLM_TTFT_MS / 1000)
+    for index in range(0, len(tokens), 8):
+        time.sleep(8 / STUB_LLM_TOKENS_PER_SEC)
+        yield AIMessageChunk(content="".join(tokens[index:index + 8]))
+    input_tokens = len(prompt) // 4
+    yield AIMessageChunk(content="", usage_metadata={
+        "input_tokens": input_tokens, "output_tokens": len(tokens), "total_tokens": input_tokens + len(tokens)
+    })
+
+def get_stub_llm(model, temperature):
+    """Runnable with the chat model's invoke/stream interface"""
+    from langchain_core.runnables import RunnableLambda
+
+    return RunnableLambda(_stream_reply, name=f"stub-{model}")
@@ -0,0 +1,444 @@
+"""
+Study plan generation and editing for articulAIte
+
+Plans are kept as structured data (weeks -> topics -> resources -> hour
+estimates) and rendered to markdown locally, so rebalancing hours or
+compressing/stretching the timeline needs no model call and a single week
+can be regenerated on its own. Long plans are generated outline-first: one
+call produces a compact phase/week outline, then the weeks are generated
+concurrently on a bounded pool and reported as they finish, so latency stays
+roughly flat as the duration grows.
+"""
+
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.llm import complete_text
+from utils.prompts import build_messages, parse_json_reply
+from config import STUDY_WEEK_WORKERS, STUDY_DAYS_PER_WEEK, STUDY_HOURS_STEP, STREAM_WAIT_INTERVAL
+
+PART_SUFFIX = re.compile(r"\s*\(part (\d+)/(\d+)\)$")
+
+def format_settings(settings):
+    """Render the plan settings as the prompt content shared by every plan call"""
+    return (
+        f"Subject: {settings['subject']}\n"
+        f"Duration: {settings['duration_weeks']} weeks\n"
+        f"Level: {settings['level']}\n"
+        f"Goal: {settings['goal']}\n"
+        f"Daily Hours: {settings['daily_hours']} hours\n"
+        f"Methods: {', '.join(settings['methods'])}"
+    )
+
+def weekly_hours(daily_hours):
+    return daily_hours * STUDY_DAYS_PER_WEEK
+
+def _as_items(value):
+    return value if isinstance(value, list) else []
+
+def _as_list(value):
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+def _parse_topics(raw_topics):
+    """Coerce model-provided topics into {"name", "hours", "resources"} dicts"""
+    topics = []
+    for topic in raw_topics if isinstance(raw_topics, list) else []:
+        if not isinstance(topic, dict) or not topic.get("name"):
+            continue
+        try:
+            hours = float(topic.get("hours") or 0)
+        except (TypeError, ValueError):
+            hours = 0
+        topics.append({"name": str(topic["name"]), "hours": hours, "resources": _as_list(topic.get("resources"))})
+    return topics
+
+def _merge_smallest(topics, limit):
+    """Merge the smallest topic into its smaller neighbour until at most `limit` remain, keeping their order"""
+    topics = list(topics)
+    while len(topics) > limit:
+        index = min(range(len(topics)), key=lambda index: topics[index]["hours"])
+        neighbours = [other for other in (index - 1, index + 1) if 0 <= other < len(topics)]
+        into = min(neighbours, key=lambda other: topics[other]["hours"])
+        first, second = sorted((index, into))
+        a, b = topics[first], topics[second]
+        merged = {
+            **a,
+            "name": f"{a['name']} & {b['name']}",
+            "hours": a["hours"] + b["hours"],
+            "resources": a["resources"] + [item for item in b["resources"] if item not in a["resources"]]
+        }
+        notes = "\n".join(topic["notes"] for topic in (a, b) if topic.get("notes"))
+        if notes:
+            merged["notes"] = notes
+        topics[first:second + 1] = [merged]
+    return topics
+
+def _fit_hours(topics, budget):
+    """Scale topic hours proportionally so they add up to the weekly budget, in whole steps
+
+    Every topic gets at least one step; when there are more topics than
+    steps, the smallest are merged into a neighbour so the budget holds.
+    """
+    steps = max(round(budget / STUDY_HOURS_STEP), 1)
+    topics = _merge_smallest(topics, steps)
+    total = sum(topic["hours"] for topic in topics)
+    shares = [topic["hours"] / total * steps if total > 0 else steps / len(topics) for topic in topics]
+
+    # Largest remainder rounding keeps the week total exact
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(topics)), key=lambda index: shares[index] - counts[index], reverse=True)
+    for index in by_remainder[:max(steps - sum(counts), 0)]:
+        counts[index] += 1
+    # Steps given to topics raised to the minimum are taken back from the largest
+    counts = [max(count, 1) for count in counts]
+    while sum(counts) > steps:
+        counts[counts.index(max(counts))] -= 1
+    for topic, count in zip(topics, counts):
+        topic["hours"] = count * STUDY_HOURS_STEP
+    return topics
+
+def _week_from_reply(week, reply, daily_hours):
+    """Build a structured week from a model reply, keeping unparsable text as a single topic"""
+    data = parse_json_reply(reply) or {}
+    topics = _parse_topics(data.get("topics"))
+    if not topics:
+        topics = [{"name": week.get("title") or f"Week {week.get('week')}", "hours": 0, "resources": [], "notes": reply.strip()}]
+    return {
+        "week": week.get("week"),
+        "title": week.get("title", ""),
+        "phase": week.get("phase", ""),
+        "focus": week.get("focus", ""),
+        "topics": _fit_hours(topics, weekly_hours(daily_hours)),
+        "checkpoint": str(data.get("checkpoint") or week.get("checkpoint") or "")
+    }
+
+def _new_plan(settings, source, weeks):
+    """Assemble a plan dict from the settings, the plan-level fields of source and the weeks"""
+    return {
+        "settings": dict(settings),
+        "overview": str(source.get("overview") or ""),
+        "objectives": _as_list(source.get("objectives")),
+        "weeks": sorted(weeks, key=lambda week: week.get("week") or 0),
+        "resources": _as_list(source.get("resources")),
+        "metrics": _as_list(source.get("metrics")),
+        "tips": _as_list(source.get("tips"))
+    }
+
+def generate_plan(settings, model, temperature, on_wait=None):
+    """Generate a whole plan in one call; returns the structured plan or raises"""
+    reply = complete_text(model, temperature, build_messages("study_plan.generate", format_settings(settings)), on_wait=on_wait)
+    data = parse_json_reply(reply)
+    data = data if isinstance(data, dict) else {}
+    raw_weeks = [week for week in _as_items(data.get("weeks")) if isinstance(week, dict)]
+    if not raw_weeks:
+        raise ValueError("The model did not return a usable study plan. Please try again.")
+
+    weeks = []
+    for number, week in enumerate(raw_weeks, start=1):
+        topics = _parse_topics(week.get("topics"))
+        if not topics:
+            topics = [{"name": str(week.get("title") or f"Week {number}"), "hours": 0, "resources": []}]
+        weeks.append({
+            "week": number,
+            "title": str(week.get("title") or ""),
+            "phase": str(week.get("phase") or ""),
+            "focus": str(week.get("focus") or ""),
+            "topics": _fit_hours(topics, weekly_hours(settings["daily_hours"])),
+            "checkpoint": str(week.get("checkpoint") or "")
+        })
+    plan = _new_plan(settings, data, weeks)
+    # A reply with too few or too many weeks is stretched or compressed locally
+    if len(weeks) != settings["duration_weeks"]:
+        plan = rescale_plan(plan, settings["duration_weeks"], settings["daily_hours"])
+    return plan
+
+def _week_number(week):
+    try:
+        return int(week.get("week"))
+    except (TypeError, ValueError):
+        return None
+
+def outline_weeks(outline):
+    """Flatten the outline into a list of weeks, each tagged with its phase and numbered 1..n in order
+
+    Weeks without a usable number keep their position among the others, and
+    duplicate numbers are renumbered, so every week has its own number.
+    """
+    weeks = []
+    for phase in _as_items(outline.get("phases") if isinstance(outline, dict) else None):
+        if not isinstance(phase, dict):
+            continue
+        for week in _as_items(phase.get("weeks")):
+            if isinstance(week, dict):
+                weeks.append({**week, "phase": str(phase.get("name") or "")})
+    order = sorted(
+        range(len(weeks)),
+        key=lambda index: (_week_number(weeks[index]) if _week_number(weeks[index]) is not None else index + 1, index)
+    )
+    return [
+        {
+            **weeks[index], "week": number, "title": str(weeks[index].get("title") or ""),
+            "focus": str(weeks[index].get("focus") or "")
+        }
+        for number, index in enumerate(order, start=1)
+    ]
+
+def _fit_outline(outline, duration_weeks):
+    """The outline with its weeks numbered 1..duration_weeks, trimming extra weeks or padding with review weeks"""
+    weeks = outline_weeks(outline)[:duration_weeks]
+    for number in range(len(weeks) + 1, duration_weeks + 1):
+        weeks.append({
+            "week": number, "title": "Review and practice", "phase": weeks[-1]["phase"],
+            "focus": "Consolidate the earlier weeks with revision and practice"
+        })
+    phases = []
+    for week in weeks:
+        if not phases or phases[-1]["name"] != week["phase"]:
+            phases.append({"name": week["phase"], "weeks": []})
+        phases[-1]["weeks"].append({key: value for key, value in week.items() if key != "phase"})
+    return {**outline, "phases": phases}
+
+def generate_outline(settings, model, temperature, on_wait=None):
+    """Generate the compact phase/week outline with exactly duration_weeks weeks; returns it or raises"""
+    reply = complete_text(model, temperature, build_messages("study_plan.outline", format_settings(settings)), on_wait=on_wait)
+    outline = parse_json_reply(reply)
+    if not outline_weeks(outline):
+        raise ValueError("The model did not return a usable study plan outline. Please try again.")
+    return _fit_outline(outline, settings["duration_weeks"])
+
+def _weeks_summary(weeks):
+    """One line per week, given to every week call for context"""
+    return "\n".join(
+        f"- Week {week.get('week')}: {week.get('title', '')} ({week.get('phase', '')})"
+        for week in weeks
+    )
+
+def generate_week(settings, weeks, week, model, temperature, current_topics=None, cancel_event=None, on_wait=None):
+    """Generate the structured topics and checkpoint for one week, or None if `cancel_event` is set first"""
+    content = (
+        f"{format_settings(settings)}\n\nPLAN OUTLINE:\n{_weeks_summary(weeks)}\n\n"
+        f"WEEK TO DETAIL: Week {week.get('week')}: {week.get('title', '')}\n"
+        f"Focus: {week.get('focus', '')}"
+    )
+    if current_topics:
+        content += "\nCurrent topics (replace with a better plan): " + ", ".join(topic["name"] for topic in current_topics)
+    reply = complete_text(model, temperature, build_messages("study_plan.week", content), cancel_event=cancel_event, on_wait=on_wait)
+    if reply is None:
+        return None
+    return _week_from_reply(week, reply, settings["daily_hours"])
+
+def generate_weeks(settings, outline, model, temperature, on_week=None, on_wait=None):
+    """Generate all outline weeks concurrently; calls on_week(week) as each finishes
+
+    on_wait(seconds since start) is called every STREAM_WAIT_INTERVAL while
+    no week finishes. If the caller is interrupted there (e.g. Stop) or a
+    week fails, the week streams are closed and weeks not yet started are
+    dropped instead of being waited for.
+    """
+    weeks = outline_weeks(outline)
+    details = {}
+    start = time.perf_counter()
+    cancel_event = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=STUDY_WEEK_WORKERS, thread_name_prefix="articulaite-study")
+    try:
+        pending = {
+            pool.submit(generate_week, settings, weeks, week, model, temperature, cancel_event=cancel_event)
+            for week in weeks
+        }
+        while pending:
+            finished, pending = wait(pending, timeout=STREAM_WAIT_INTERVAL if on_wait else None, return_when=FIRST_COMPLETED)
+            if not finished:
+                on_wait(time.perf_counter() - start)
+            for future in finished:
+                week = future.result()
+                details[week["week"]] = week
+                if on_week:
+                    on_week(week)
+    except BaseException:
+        cancel_event.set()
+        raise
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return details
+
+def plan_from_outline(settings, outline, details):
+    """Assemble the outline and the generated weeks into a structured plan"""
+    return _new_plan(settings, outline, list(details.values()))
+
+def regenerate_week(plan, week_number, model, temperature, on_wait=None):
+    """Return a copy of the plan with one week regenerated by a single model call"""
+    weeks = plan["weeks"]
+    week = next(week for week in weeks if week["week"] == week_number)
+    new_week = generate_week(plan["settings"], weeks, week, model, temperature, current_topics=week["topics"], on_wait=on_wait)
+    return {**plan, "weeks": [new_week if item["week"] == week_number else item for item in weeks]}
+
+def _merge_parts(weeks):
+    """Flatten the plan's topics in order, rejoining parts of topics split by an earlier rescale
+
+    Only consecutive parts of one split ("part 2/3" right after "part 1/3" of
+    the same name) are rejoined; other topics sharing a name stay separate.
+    """
+    topics = []
+    for week in weeks:
+        for topic in week["topics"]:
+            split = PART_SUFFIX.search(topic["name"])
+            name = PART_SUFFIX.sub("", topic["name"])
+            part = (int(split.group(1)), int(split.group(2))) if split else None
+            previous = topics[-1] if topics else None
+            if (part and previous and previous["name"] == name and previous.get("part")
+                    and previous["part"] == (part[0] - 1, part[1])):
+                previous["hours"] += topic["hours"]
+                previous["resources"] += [item for item in topic["resources"] if item not in previous["resources"]]
+                previous["part"] = part
+                continue
+            topics.append({**topic, "name": name, "resources": list(topic["resources"]), "source": week, "part": part})
+    return topics
+
+def rescale_plan(plan, duration_weeks, daily_hours):
+    """Rebalance hours and compress or stretch the timeline locally, without a model call"""
+    settings = {**plan["settings"], "duration_weeks": duration_weeks, "daily_hours": daily_hours}
+    budget = weekly_hours(daily_hours)
+
+    # Same number of weeks: keep the schedule and only rebalance the hours
+    if duration_weeks == len(plan["weeks"]):
+        weeks = [
+            {**week, "topics": _fit_hours([dict(topic) for topic in week["topics"]], budget)}
+            for week in plan["weeks"]
+        ]
+        return _new_plan(settings, plan, weeks)
+
+    # Otherwise lay the topics end to end and cut the sequence into equal slices
+    topics = _merge_parts(plan["weeks"])
+    if not any(topic["hours"] > 0 for topic in topics):
+        for topic in topics:
+            topic["hours"] = 1
+    total = sum(topic["hours"] for topic in topics)
+    span = total / duration_weeks
+    slices = [{"topics": [], "sources": {}, "checkpoints": []} for _ in range(duration_weeks)]
+
+    cursor = 0
+    for topic in topics:
+        start, end = cursor, cursor + topic["hours"]
+        cursor = end
+        first = min(int(start / span), duration_weeks - 1)
+        last = min(max(math.ceil(end / span) - 1, first), duration_weeks - 1)
+        # Drop slivers under 5% of a week so topics are not split for rounding noise
+        pieces = [
+            (index, min(end, (index + 1) * span) - max(start, index * span))
+            for index in range(first, last + 1)
+        ]
+        pieces = [piece for piece in pieces if piece[1] >= 0.05 * span] or [max(pieces, key=lambda piece: piece[1])]
+        for part, (index, hours) in enumerate(pieces, start=1):
+            name = topic["name"] if len(pieces) == 1 else f"{topic['name']} (part {part}/{len(pieces)})"
+            item = {"name": name, "hours": hours, "resources": topic["resources"] if part == 1 else []}
+            if topic.get("notes"):
+                item["notes"] = topic["notes"]
+            slices[index]["topics"].append(item)
+            source = topic["source"]["week"]
+            slices[index]["sources"][source] = slices[index]["sources"].get(source, 0) + hours
+
+    # Each original checkpoint moves to the week where that week's material now ends
+    cursor = 0
+    for week in plan["weeks"]:
+        cursor += sum(topic["hours"] for topic in week["topics"])
+        if week.get("checkpoint"):
+            index = min(int(cursor / span - 1e-9), duration_weeks - 1)
+            slices[max(index, 0)]["checkpoints"].append(week["checkpoint"])
+
+    originals = {week["week"]: week for week in plan["weeks"]}
+    weeks = []
+    for number, item in enumerate(slices, start=1):
+        sources = sorted(item["sources"], key=lambda source: item["sources"][source], reverse=True)
+        main = originals[sources[0]] if sources else {}
+        titles = []
+        for source in sorted(sources[:2]):
+            for title in (originals[source].get("title") or "").split(" & "):
+                if title and title not in titles:
+                    titles.append(title)
+        weeks.append({
+            "week": number,
+            "title": " & ".join(titles[:2]),
+            "phase": main.get("phase", ""),
+            "focus": main.get("focus", "") if len(sources) == 1 else "",
+            "topics": _fit_hours(item["topics"], budget) if item["topics"] else [],
+            "checkpoint": " ".join(item["checkpoints"])
+        })
+    return _new_plan(settings, plan, weeks)
+
+def plan_hours(plan):
+    return sum(topic["hours"] for week in plan["weeks"] for topic in week["topics"])
+
+def _format_hours(hours):
+    return f"{hours:g}h"
+
+def week_heading(week):
+    return f"#### Week {week.get('week')}: {week.get('title', '')}"
+
+def render_week(week):
+    """Render one structured week to markdown"""
+    hours = sum(topic["hours"] for topic in week.get("topics") or [])
+    lines = [f"{week_heading(week)} ({_format_hours(hours)})"]
+    if week.get("focus"):
+        lines.append(f"_{week['focus']}_")
+
+    items = []
+    for topic in week.get("topics") or []:
+        items.append(f"- **{topic['name']}** — {_format_hours(topic['hours'])}")
+        if topic.get("resources"):
+            items.append("  - Resources: " + "; ".join(topic["resources"]))
+        if topic.get("notes"):
+            items.append("\n".join(f"  {line}" for line in topic["notes"].splitlines()))
+    if items:
+        lines.append("\n".join(items))
+
+    if week.get("checkpoint"):
+        lines.append(f"**Checkpoint:** {week['checkpoint']}")
+    return "\n\n".join(lines)
+
+def render_plan(plan):
+    """Render a structured plan to the final markdown"""
+    settings = plan["settings"]
+    sections = [
+        f"_{settings['duration_weeks']} weeks · {settings['daily_hours']:g} hours/day · "
+        f"{_format_hours(plan_hours(plan))} total_"
+    ]
+    if plan.get("overview"):
+        sections.append(f"## Overview\n\n{plan['overview']}")
+    if plan.get("objectives"):
+        sections.append("## Learning Objectives\n\n" + "\n".join(f"- {item}" for item in plan["objectives"]))
+
+    schedule = ["## Week-by-Week Schedule"]
+    current_phase = None
+    for week in plan["weeks"]:
+        if week.get("phase") and week["phase"] != current_phase:
+            current_phase = week["phase"]
+            schedule.append(f"### {current_phase}")
+        schedule.append(render_week(week))
+    sections.append("\n\n".join(schedule))
+
+    for key, title in (("resources", "Recommended Resources"), ("metrics", "Progress Tracking Metrics"), ("tips", "Success Tips")):
+        if plan.get(key):
+            sections.append(f"## {title}\n\n" + "\n".join(f"- {item}" for item in plan[key]))
+
+    return f"# Study Plan: {settings['subject']}\n\n" + "\n\n".join(sections)
+
+def compact_plan(plan):
+    """Compact plan summary sent to the mentor chat instead of the full markdown"""
+    settings = plan["settings"]
+    lines = [
+        f"Study Plan: {settings['subject']} ({settings['duration_weeks']} weeks, "
+        f"{settings['daily_hours']:g} hours/day, level {settings['level']}, goal: {settings['goal']})"
+    ]
+    if plan.get("objectives"):
+        lines.append("Objectives: " + "; ".join(plan["objectives"]))
+    for week in plan["weeks"]:
+        topics = ", ".join(f"{topic['name']} ({_format_hours(topic['hours'])})" for topic in week["topics"])
+        line = f"Week {week['week']} [{week.get('phase', '')}] {week.get('title', '')}: {topics}"
+        if week.get("checkpoint"):
+            line += f" | Checkpoint: {week['checkpoint']}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+"""
+Server warm-up for articulAIte
+
+Pays the cold-start costs once per server process instead of on the first
+user's request: imports the tab modules and LangChain, resolves the API key,
+builds the shared client for every model in the config catalogs, opens the
+keep-alive connection to the Groq endpoint and optionally sends a tiny probe
+call per model.
+
+Usage (from the repository root, e.g. in a deploy or health-check step):
+    python -m utils.warmup
+    python -m utils.warmup --probe
+"""
+
+import argparse
+import importlib
+import logging
+import time
+from config import (
+    CV_INTERVIEW_MODELS, CODE_EXPLAINER_MODELS, ARTICLE_GENERATOR_MODELS, STUDY_PLAN_MODELS,
+    GROQ_API_BASE_URL
+)
+
+logger = logging.getLogger(__name__)
+
+TAB_MODULES = [
+    "tabs.cv_interview",
+    "tabs.code_explainer",
+    "tabs.article_generator",
+    "tabs.study_plan",
+]
+
+def catalog_models():
+    """All distinct model ids across the tab catalogs, in catalog order"""
+    models = []
+    for catalog in (CV_INTERVIEW_MODELS, CODE_EXPLAINER_MODELS, ARTICLE_GENERATOR_MODELS, STUDY_PLAN_MODELS):
+        for model in catalog.values():
+            if model not in models:
+                models.append(model)
+    return models
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+def warm_up(probe=False):
+    """Warm imports, config, clients and connections; return a readiness report"""
+    from utils.llm import get_api_key, get_http_client, get_llm, is_offline
+    from utils.prompts import PROMPT_SPECS, get_template
+
+    report = {"steps": {}, "models": []}
+
+    # Import tab modules and LangChain, and compile the prompt registry
+    start = time.perf_counter()
+    for module in TAB_MODULES:
+        importlib.import_module(module)
+    for name in PROMPT_SPECS:
+        get_template(name)
+    report["steps"]["imports_ms"] = _elapsed_ms(start)
+
+    # Resolve the API key once
+    start = time.perf_counter()
+    api_key = get_api_key()
+    report["steps"]["api_key_ms"] = _elapsed_ms(start)
+    if not api_key:
+        report["error"] = "GROQ_API_KEY not found"
+        return report
+
+    # Open the keep-alive connection (DNS + TLS) and fetch the available models
+    # (skipped with the stub backend or cassette replay, which need no network)
+    available = None
+    if not is_offline():
+        start = time.perf_counter()
+        try:
+            response = get_http_client().get(
+                f"{GROQ_API_BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"}
+            )
+            response.raise_for_status()
+            available = {model["id"] for model in response.json().get("data", [])}
+        except Exception as e:
+            report["error"] = f"Connection failed: {str(e)}"
+        report["steps"]["connect_ms"] = _elapsed_ms(start)
+
+    # Build the shared client per model (every temperature the tabs use binds to it) and optionally probe it
+    for model in catalog_models():
+        status = {"model": model, "ready": False}
+        start = time.perf_counter()
+        try:
+            llm = get_llm(model, 0.0)
+            status["client_ms"] = _elapsed_ms(start)
+            status["ready"] = available is None or model in available
+            if not status["ready"]:
+                status["error"] = "Model not available for this API key"
+            elif probe:
+                start = time.perf_counter()
+                llm.invoke("ping", max_tokens=1)
+                status["probe_ms"] = _elapsed_ms(start)
+        except Exception as e:
+            status["ready"] = False
+            status["error"] = str(e)
+        report["models"].append(status)
+
+    return report
+
+def format_report(report):
+    """Format a warm-up report as a plain-text table"""
+    steps = ", ".join(f"{name} {value}ms" for name, value in report["steps"].items())
+    lines = [f"Warm-up: {steps}"]
+    if report.get("error"):
+        lines.append(f"Error: {report['error']}")
+    for status in report["models"]:
+        latency = f"client {status.get('client_ms', '-')}ms"
+        if "probe_ms" in status:
+            latency += f", probe {status['probe_ms']}ms"
+        state = "ready" if status["ready"] else f"NOT READY ({status.get('error', 'unknown')})"
+        lines.append(f"  {status['model']:<42} {state:<10} {latency}")
+    return "\n".join(lines)
+
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Warm up articulAIte and report per-model readiness")
+    parser.add_argument("--probe", action="store_true", help="Send a 1-token probe call per model")
+    args = parser.parse_args()
+
+    load_dotenv()
+    report = warm_up(probe=args.probe)
+    print(format_report(report))
+    if report.get("error") or not all(status["ready"] for status in report["models"]):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()